@@ -6,7 +6,7 @@ Panel ejecutivo para directivos universitarios
 import streamlit as st
 from pathlib import Path
 
-from config import APP_TITLE, APP_ICON, PAGE_LAYOUT, DATABASE_PATH
+from config import APP_TITLE, APP_ICON, PAGE_LAYOUT
 import data_access as data
 from components import (
     render_kpi_cards,
@@ -40,9 +40,10 @@ if css_path.exists():
 
 def check_database_connection() -> bool:
     """Verify database connectivity"""
-    if not DATABASE_PATH.exists():
+    database_path = data.get_database_path()
+    if not database_path.exists():
         st.error(
-            f"Base de datos no encontrada en: {DATABASE_PATH}\n\n"
+            f"Base de datos no encontrada en: {database_path}\n\n"
             "Ejecute el pipeline DWH para generar los datos:\n"
             "```\npython -m dwh.main\n```"
         )
@@ -9,6 +9,8 @@ from pathlib import Path
 # Database configuration
 DEFAULT_DB_PATH = Path(__file__).parent.parent / "dwh" / "data" / "warehouse.duckdb"
 DATABASE_PATH = Path(os.environ.get("DWH_DATABASE_PATH", DEFAULT_DB_PATH))
+# Snapshots published by the pipeline (dwh/pipelines/publish.py); CURRENT names the live one
+PUBLISH_DIR = Path(os.environ.get("DWH_PUBLISH_DIR", DEFAULT_DB_PATH.parent / "published"))
 
 # Application settings
 APP_TITLE = "Sistema de Análisis de Retención Estudiantil"
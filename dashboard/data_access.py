@@ -3,14 +3,31 @@ Data Access Layer
 Database queries and data retrieval for dashboard
 """
 
+import os
+from pathlib import Path
+
 import duckdb
 import pandas as pd
-from config import DATABASE_PATH
+from config import DATABASE_PATH, PUBLISH_DIR
+
+
+def get_database_path() -> Path:
+    """Published snapshot named by PUBLISH_DIR/CURRENT, else DATABASE_PATH.
+
+    Read on every connection, so a new publish is picked up by the next query.
+    An explicit DWH_DATABASE_PATH always wins.
+    """
+    pointer = PUBLISH_DIR / "CURRENT"
+    if "DWH_DATABASE_PATH" not in os.environ and pointer.exists():
+        snapshot = PUBLISH_DIR / pointer.read_text(encoding="utf-8").strip()
+        if snapshot.exists():
+            return snapshot
+    return DATABASE_PATH
 
 
 def get_connection():
     """Get DuckDB connection"""
-    return duckdb.connect(str(DATABASE_PATH), read_only=True)
+    return duckdb.connect(str(get_database_path()), read_only=True)
 
 
 # ============================================================================
@@ -47,6 +64,38 @@ def _append_cohort_filters(
     return query
 
 
+# ============================================================================
+# COHORT CUBE - gold.mart_cohort_cube holds additive sums and counts for every
+# combination of cohort, program and faculty, rolled-up dimensions being NULL.
+# Each query reads only the cells of the level it needs (the dimensions it
+# groups or filters by) and adds them up, so it never re-aggregates students.
+# ============================================================================
+
+_CUBE_DIMENSIONS = ("cohorte", "propuesta_nombre", "facultad_nombre")
+
+
+def _cube_level(
+    group_by: list,
+    cohort_min: int = None,
+    cohort_max: int = None,
+    programs: list = None,
+    faculties: list = None,
+) -> int:
+    """grouping_id of the cube cells keeping `group_by` and the filtered dimensions."""
+    kept = set(group_by)
+    if cohort_min is not None or cohort_max is not None:
+        kept.add("cohorte")
+    if programs:
+        kept.add("propuesta_nombre")
+    if faculties:
+        kept.add("facultad_nombre")
+    return sum(
+        1 << (len(_CUBE_DIMENSIONS) - 1 - i)
+        for i, dim in enumerate(_CUBE_DIMENSIONS)
+        if dim not in kept
+    )
+
+
 # ============================================================================
 # FILTER OPTIONS
 # ============================================================================
@@ -54,39 +103,39 @@ def _append_cohort_filters(
 def get_available_cohorts() -> list:
     """Get list of available cohort years for filtering"""
     query = """
-    SELECT DISTINCT cohorte 
-    FROM gold.mart_cohort_analysis 
-    WHERE cohorte IS NOT NULL 
+    SELECT cohorte 
+    FROM gold.mart_cohort_cube 
+    WHERE grouping_id = ? AND cohorte IS NOT NULL 
     ORDER BY cohorte DESC
     """
     with get_connection() as conn:
-        result = conn.execute(query).df()
+        result = conn.execute(query, [_cube_level(["cohorte"])]).df()
     return result["cohorte"].tolist()
 
 
 def get_available_programs() -> list:
     """Get list of available programs for filtering"""
     query = """
-    SELECT DISTINCT propuesta_nombre 
-    FROM gold.mart_cohort_analysis 
-    WHERE propuesta_nombre IS NOT NULL 
+    SELECT propuesta_nombre 
+    FROM gold.mart_cohort_cube 
+    WHERE grouping_id = ? AND propuesta_nombre IS NOT NULL 
     ORDER BY propuesta_nombre
     """
     with get_connection() as conn:
-        result = conn.execute(query).df()
+        result = conn.execute(query, [_cube_level(["propuesta_nombre"])]).df()
     return result["propuesta_nombre"].tolist()
 
 
 def get_available_faculties() -> list:
     """Get list of available faculties for filtering"""
     query = """
-    SELECT DISTINCT facultad_nombre 
-    FROM gold.mart_cohort_analysis 
-    WHERE facultad_nombre IS NOT NULL 
+    SELECT facultad_nombre 
+    FROM gold.mart_cohort_cube 
+    WHERE grouping_id = ? AND facultad_nombre IS NOT NULL 
     ORDER BY facultad_nombre
     """
     with get_connection() as conn:
-        result = conn.execute(query).df()
+        result = conn.execute(query, [_cube_level(["facultad_nombre"])]).df()
     return result["facultad_nombre"].tolist()
 
 
@@ -108,12 +157,12 @@ def get_overall_kpis(
         SUM(total_retenidos) AS total_retenidos,
         ROUND(SUM(total_desertores)::FLOAT / NULLIF(SUM(total_estudiantes), 0) * 100, 1) AS tasa_desercion_global,
         ROUND(SUM(total_retenidos)::FLOAT / NULLIF(SUM(total_estudiantes), 0) * 100, 1) AS tasa_retencion_global,
-        ROUND(AVG(promedio_notas_cohorte), 2) AS promedio_notas_global,
-        ROUND(AVG(tasa_aprobacion_cohorte_pct), 1) AS tasa_aprobacion_global
-    FROM gold.mart_cohort_analysis
-    WHERE cohorte IS NOT NULL
+        ROUND(SUM(suma_promedio_notas) / NULLIF(SUM(n_promedio_notas), 0), 2) AS promedio_notas_global,
+        ROUND(SUM(total_aprobadas)::FLOAT / NULLIF(SUM(total_aprobadas) + SUM(total_reprobadas), 0) * 100, 1) AS tasa_aprobacion_global
+    FROM gold.mart_cohort_cube
+    WHERE grouping_id = ?
     """
-    params: list = []
+    params: list = [_cube_level([], cohort_min, cohort_max, programs, faculties)]
     query = _append_cohort_filters(query, params, cohort_min, cohort_max, programs, faculties)
     with get_connection() as conn:
         result = conn.execute(query, params).df()
@@ -137,15 +186,15 @@ def get_cohort_summary(
         total_estudiantes,
         total_desertores,
         total_retenidos,
-        tasa_desercion_pct,
-        tasa_retencion_pct,
-        promedio_anios_hasta_dropout,
-        promedio_notas_cohorte,
-        tasa_aprobacion_cohorte_pct
-    FROM gold.mart_cohort_analysis
-    WHERE cohorte IS NOT NULL
+        ROUND(total_desertores::FLOAT / NULLIF(total_estudiantes, 0) * 100, 2) AS tasa_desercion_pct,
+        ROUND(total_retenidos::FLOAT / NULLIF(total_estudiantes, 0) * 100, 2) AS tasa_retencion_pct,
+        suma_anios_hasta_dropout / NULLIF(n_anios_hasta_dropout, 0) AS promedio_anios_hasta_dropout,
+        suma_promedio_notas / NULLIF(n_promedio_notas, 0) AS promedio_notas_cohorte,
+        ROUND(total_aprobadas::FLOAT / NULLIF(total_aprobadas + total_reprobadas, 0) * 100, 2) AS tasa_aprobacion_cohorte_pct
+    FROM gold.mart_cohort_cube
+    WHERE grouping_id = ?
     """
-    params: list = []
+    params: list = [_cube_level(list(_CUBE_DIMENSIONS))]
     query = _append_cohort_filters(query, params, cohort_min, cohort_max, programs, faculties)
     query += " ORDER BY cohorte DESC, total_estudiantes DESC"
     with get_connection() as conn:
@@ -167,10 +216,10 @@ def get_cohort_trend(
         SUM(total_retenidos) AS total_retenidos,
         ROUND(SUM(total_desertores)::FLOAT / NULLIF(SUM(total_estudiantes), 0) * 100, 1) AS tasa_desercion,
         ROUND(SUM(total_retenidos)::FLOAT / NULLIF(SUM(total_estudiantes), 0) * 100, 1) AS tasa_retencion
-    FROM gold.mart_cohort_analysis
-    WHERE cohorte IS NOT NULL
+    FROM gold.mart_cohort_cube
+    WHERE grouping_id = ?
     """
-    params: list = []
+    params: list = [_cube_level(["cohorte"], cohort_min, cohort_max, programs, faculties)]
     query = _append_cohort_filters(query, params, cohort_min, cohort_max, programs, faculties)
     query += " GROUP BY cohorte ORDER BY cohorte"
     with get_connection() as conn:
@@ -189,12 +238,12 @@ def get_program_comparison(
         propuesta_nombre AS programa,
         SUM(total_estudiantes) AS total_estudiantes,
         ROUND(SUM(total_desertores)::FLOAT / NULLIF(SUM(total_estudiantes), 0) * 100, 1) AS tasa_desercion,
-        ROUND(AVG(promedio_notas_cohorte), 2) AS promedio_notas,
-        ROUND(AVG(tasa_aprobacion_cohorte_pct), 1) AS tasa_aprobacion
-    FROM gold.mart_cohort_analysis
-    WHERE cohorte IS NOT NULL AND propuesta_nombre IS NOT NULL
+        ROUND(SUM(suma_promedio_notas) / NULLIF(SUM(n_promedio_notas), 0), 2) AS promedio_notas,
+        ROUND(SUM(total_aprobadas)::FLOAT / NULLIF(SUM(total_aprobadas) + SUM(total_reprobadas), 0) * 100, 1) AS tasa_aprobacion
+    FROM gold.mart_cohort_cube
+    WHERE grouping_id = ? AND propuesta_nombre IS NOT NULL
     """
-    params: list = []
+    params: list = [_cube_level(["propuesta_nombre"], cohort_min, cohort_max, programs, faculties)]
     query = _append_cohort_filters(query, params, cohort_min, cohort_max, programs, faculties)
     query += " GROUP BY propuesta_nombre HAVING SUM(total_estudiantes) >= 10 ORDER BY tasa_desercion DESC"
     with get_connection() as conn:
@@ -218,12 +267,12 @@ def get_faculty_comparison(
         SUM(total_desertores) AS total_desertores,
         ROUND(SUM(total_desertores)::FLOAT / NULLIF(SUM(total_estudiantes), 0) * 100, 1) AS tasa_desercion,
         ROUND(SUM(total_retenidos)::FLOAT / NULLIF(SUM(total_estudiantes), 0) * 100, 1) AS tasa_retencion,
-        ROUND(AVG(promedio_notas_cohorte), 2) AS promedio_notas,
-        ROUND(AVG(tasa_aprobacion_cohorte_pct), 1) AS tasa_aprobacion
-    FROM gold.mart_cohort_analysis
-    WHERE cohorte IS NOT NULL AND facultad_nombre IS NOT NULL
+        ROUND(SUM(suma_promedio_notas) / NULLIF(SUM(n_promedio_notas), 0), 2) AS promedio_notas,
+        ROUND(SUM(total_aprobadas)::FLOAT / NULLIF(SUM(total_aprobadas) + SUM(total_reprobadas), 0) * 100, 1) AS tasa_aprobacion
+    FROM gold.mart_cohort_cube
+    WHERE grouping_id = ? AND facultad_nombre IS NOT NULL
     """
-    params: list = []
+    params: list = [_cube_level(["facultad_nombre"], cohort_min, cohort_max, programs)]
     query = _append_cohort_filters(query, params, cohort_min, cohort_max, programs, faculties=None)
     query += " GROUP BY facultad_nombre ORDER BY total_estudiantes DESC"
     with get_connection() as conn:
@@ -241,10 +290,10 @@ def get_faculty_trend(
         facultad_nombre AS sede,
         SUM(total_estudiantes) AS total_estudiantes,
         ROUND(SUM(total_desertores)::FLOAT / NULLIF(SUM(total_estudiantes), 0) * 100, 1) AS tasa_desercion
-    FROM gold.mart_cohort_analysis
-    WHERE cohorte IS NOT NULL AND facultad_nombre IS NOT NULL
+    FROM gold.mart_cohort_cube
+    WHERE grouping_id = ? AND facultad_nombre IS NOT NULL
     """
-    params: list = []
+    params: list = [_cube_level(["cohorte", "facultad_nombre"])]
     query = _append_cohort_filters(query, params, cohort_min, cohort_max, programs=None, faculties=None)
     query += " GROUP BY cohorte, facultad_nombre ORDER BY cohorte, facultad_nombre"
     with get_connection() as conn:
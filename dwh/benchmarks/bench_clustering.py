@@ -0,0 +1,193 @@
+"""Benchmark: join and filtered-scan latency with and without model clustering.
+
+Builds the same synthetic warehouse twice through `run_sql_dir`: once as plain
+CTAS (rows in the scattered order a GROUP BY leaves them) and once with the
+`-- dwh:cluster_by` / `-- dwh:index` lines the real models declare. Then times
+the dashboard's mart-to-`dim_student` join, per-student and per-batch TFT
+reads, the latest-year risk filter and a student lookup on both, and checks
+that both layouts return the same rows.
+
+Student ids grow with the enrollment year, as in the source system, so a
+cohort filter on `dim_student` narrows the join to a range of `alumno_id`.
+
+Usage:
+	python -m dwh.benchmarks.bench_clustering --students 200000
+"""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+import random
+import shutil
+import statistics
+import tempfile
+import time
+
+import duckdb
+
+from dwh.pipelines._sql_runner import _model_layout, run_sql_dir
+
+
+SQL_DIR = Path(__file__).resolve().parents[1] / "sql"
+
+# (layer, file of the real model, table, SELECT over the synthetic data)
+MODELS = [
+	("silver", "10_dim_student.sql", "silver.dim_student", "SELECT * FROM synthetic.students"),
+	(
+		"gold",
+		"01_mart_student_academic_summary.sql",
+		"gold.mart_student_academic_summary",
+		"SELECT alumno_id, anio_academico, promedio_notas, tasa_aprobacion, tasa_ausentismo FROM synthetic.student_years",
+	),
+	(
+		"gold",
+		"03_mart_student_risk_features.sql",
+		"gold.mart_student_risk_features",
+		"SELECT y.alumno_id, y.anio_academico, y.tasa_aprobacion, y.promedio_asistencia, s.facultad_nombre "
+		"FROM synthetic.student_years y JOIN synthetic.students s USING (alumno_id)",
+	),
+	("gold", "13_gold_tft_training_dataset.sql", "gold.gold_tft_training_dataset", "SELECT * FROM synthetic.student_years"),
+]
+
+QUERIES = {
+	"cohort join": (
+		"SELECT sas.anio_academico, COUNT(DISTINCT sas.alumno_id), ROUND(AVG(sas.promedio_notas), 2) "
+		"FROM gold.mart_student_academic_summary sas "
+		"JOIN silver.dim_student ds ON sas.alumno_id = ds.alumno_id "
+		"WHERE ds.anio_ingreso = ? GROUP BY ALL ORDER BY ALL"
+	),
+	"student sequence": "SELECT * FROM gold.gold_tft_training_dataset WHERE alumno_id = ? ORDER BY anio_academico",
+	"student batch": (
+		"SELECT alumno_id, count(*), round(avg(promedio_notas), 6) FROM gold.gold_tft_training_dataset "
+		"WHERE alumno_id BETWEEN ? AND ? + 999 GROUP BY ALL ORDER BY ALL"
+	),
+	"latest year risk": (
+		"SELECT facultad_nombre, count(*) FROM gold.mart_student_risk_features "
+		"WHERE anio_academico = (SELECT max(anio_academico) FROM gold.mart_student_risk_features) "
+		"AND tasa_aprobacion < ? GROUP BY ALL ORDER BY ALL"
+	),
+	"student lookup": "SELECT * FROM silver.dim_student WHERE alumno_id = ?",
+}
+
+
+def _synthetic(con: duckdb.DuckDBPyConnection, students: int, first_year: int = 2010, years: int = 15) -> None:
+	# `ORDER BY hash(...)` scatters rows the way aggregations and joins leave them.
+	con.execute("CREATE SCHEMA IF NOT EXISTS synthetic")
+	con.execute(
+		f"""
+		CREATE TABLE synthetic.students AS
+		SELECT
+			range + 1 AS alumno_id,
+			{first_year} + range * {years} // {students} AS anio_ingreso,
+			'Propuesta ' || hash(range, 'p') % 60 AS propuesta_nombre,
+			'Facultad ' || hash(range, 'f') % 8 AS facultad_nombre,
+			CASE WHEN hash(range, 's') % 2 = 0 THEN 'F' ELSE 'M' END AS sexo
+		FROM range({students})
+		ORDER BY hash(range)
+		"""
+	)
+	con.execute(
+		f"""
+		CREATE TABLE synthetic.student_years AS
+		SELECT
+			s.alumno_id,
+			s.anio_ingreso + t.range AS anio_academico,
+			t.range + 1 AS time_step,
+			(hash(s.alumno_id, t.range, 'n') % 1000) / 100.0 AS promedio_notas,
+			(hash(s.alumno_id, t.range, 'a') % 100) / 100.0 AS tasa_aprobacion,
+			(hash(s.alumno_id, t.range, 'x') % 40) / 100.0 AS tasa_ausentismo,
+			(hash(s.alumno_id, t.range, 'c') % 100)::DOUBLE AS promedio_asistencia,
+			(hash(s.alumno_id, t.range, 'd') % 10 = 0)::INTEGER AS dropout_next_year
+		FROM synthetic.students s, range(8) t
+		WHERE t.range <= hash(s.alumno_id, 'len') % 8
+		  AND s.anio_ingreso + t.range < {first_year + years}
+		ORDER BY hash(s.alumno_id, t.range)
+		"""
+	)
+
+
+def _build(workdir: Path, db: Path, clustered: bool) -> None:
+	for layer in ("silver", "gold"):
+		sql_dir = workdir / f"sql_{db.stem}" / layer
+		sql_dir.mkdir(parents=True, exist_ok=True)
+		for model_layer, file_name, table, select in MODELS:
+			if model_layer != layer:
+				continue
+			lines = []
+			if clustered:
+				cluster_by, indexes = _model_layout((SQL_DIR / layer / file_name).read_text(encoding="utf-8"))
+				lines += [f"-- dwh:cluster_by {', '.join(cluster_by)}"] if cluster_by else []
+				lines += [f"-- dwh:index {', '.join(columns)}" for columns in indexes]
+			lines.append(f"CREATE OR REPLACE TABLE {table} AS\n{select};")
+			(sql_dir / file_name).write_text("\n".join(lines) + "\n", encoding="utf-8")
+		run_sql_dir(duckdb_path=db, sql_dir=sql_dir, schema=layer)
+
+
+def _params(name: str, rnd: random.Random, students: int) -> list:
+	if name == "cohort join":
+		return [rnd.randint(2010, 2024)]
+	if name == "student batch":
+		return [rnd.randint(1, max(1, students - 1000))] * 2
+	if name == "latest year risk":
+		return [rnd.choice([0.3, 0.5, 0.7])]
+	return [rnd.randint(1, students)]
+
+
+def _time(con: duckdb.DuckDBPyConnection, sql: str, params: list[list]) -> tuple[float, list]:
+	con.execute(sql, params[0]).fetchall()  # warm-up
+	timings = []
+	results = []
+	for p in params:
+		started = time.perf_counter()
+		results.append(con.execute(sql, p).fetchall())
+		timings.append(time.perf_counter() - started)
+	return statistics.median(timings), results
+
+
+def run(students: int, repeat: int, workdir: Path) -> None:
+	print(f"[Bench] Generating {students:,} synthetic students...")
+	plain = workdir / "unclustered.duckdb"
+	with duckdb.connect(str(plain)) as con:
+		_synthetic(con, students)
+		rows = con.execute("SELECT count(*) FROM synthetic.student_years").fetchone()[0]
+	clustered = workdir / "clustered.duckdb"
+	shutil.copy(plain, clustered)
+	print(f"[Bench] {rows:,} student-years")
+	_build(workdir, plain, clustered=False)
+	_build(workdir, clustered, clustered=True)
+
+	rnd = random.Random(7)
+	mismatches = 0
+	print(f"[Bench] {'query':<18} {'unclustered':>12} {'clustered':>12} {'speedup':>8}")
+	with duckdb.connect(str(plain), read_only=True) as before, duckdb.connect(str(clustered), read_only=True) as after:
+		for name, sql in QUERIES.items():
+			params = [_params(name, rnd, students) for _ in range(repeat)]
+			before_s, before_rows = _time(before, sql, params)
+			after_s, after_rows = _time(after, sql, params)
+			mismatches += sum(1 for a, b in zip(before_rows, after_rows) if sorted(a) != sorted(b))
+			print(
+				f"[Bench] {name:<18} {before_s * 1000:>9.2f} ms {after_s * 1000:>9.2f} ms "
+				f"{before_s / max(after_s, 1e-9):>7.1f}x"
+			)
+	print(f"[Bench] identical results: {mismatches == 0} ({mismatches} mismatches)")
+	if mismatches:
+		raise SystemExit(1)
+
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument("--students", type=int, default=200_000)
+	parser.add_argument("--repeat", type=int, default=20)
+	parser.add_argument("--workdir", type=Path, help="keep the two databases here (default: a temp dir)")
+	args = parser.parse_args()
+	if args.workdir:
+		args.workdir.mkdir(parents=True, exist_ok=True)
+		run(args.students, args.repeat, args.workdir)
+	else:
+		with tempfile.TemporaryDirectory(prefix="bench_clustering_") as tmp:
+			run(args.students, args.repeat, Path(tmp))
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,129 @@
+"""Microbenchmark: row-wise vs. vectorized `dwh_pk` hashing.
+
+Builds a synthetic `historia_academica`-like batch and compares the row-by-row
+key (`_dwh_pk` over dicts, as the row path does) with the per-batch columnar key
+(`_rows_to_record_batch(..., add_dwh_pk=True)`). Both must produce identical keys.
+The key-only time is measured on its own, over columns converted beforehand.
+`nota` mixes text and integers, so it exercises the text fallback.
+
+Usage:
+	python -m dwh.benchmarks.bench_dwh_pk --rows 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+from datetime import date, timedelta
+from decimal import Decimal
+import random
+import time
+
+from dwh.sources.sql_sources import _DWH_PK_FIELDS, _arrow_column, _dwh_pk, _dwh_pk_array, _rows_to_record_batch
+
+
+COLUMNS = [
+	"persona",
+	"alumno",
+	"elemento",
+	"elemento_revision",
+	"instancia",
+	"fecha",
+	"id_acta",
+	"folio",
+	"renglon",
+	"evaluacion",
+	"comision",
+	"actividad_codigo",
+	"nota",
+	"resultado",
+	"creditos",
+	"pct_asistencia",
+]
+
+
+def _synthetic_rows(n: int, seed: int = 7) -> list[tuple]:
+	rnd = random.Random(seed)
+	base = date(2005, 3, 1)
+	rows = []
+	for i in range(n):
+		rows.append(
+			(
+				rnd.randint(1, 200_000),
+				rnd.randint(1, 250_000),
+				rnd.randint(1, 5_000),
+				rnd.choice([None, 0, 1, 2]),
+				rnd.randint(1, 6),
+				base + timedelta(days=rnd.randint(0, 7_000)),
+				rnd.choice([None, rnd.randint(1, 900_000)]),
+				rnd.randint(0, 400),
+				rnd.randint(1, 40),
+				rnd.choice([None, rnd.randint(1, 3_000_000)]),
+				rnd.randint(1, 80_000),
+				rnd.choice([None, "", f"ACT{i % 97}"]),
+				rnd.choice([None, "A", "4", "7", "10", 0, 8]),
+				rnd.choice(["A", "R", "P", "U", None]),
+				rnd.choice([None, Decimal("0"), Decimal("4.50"), Decimal("6")]),
+				rnd.choice([None, 0.0, 75.5, 100.0]),
+			)
+		)
+	return rows
+
+
+def run(rows: int, batch_size: int) -> None:
+	print(f"[Bench] Generating {rows:,} synthetic rows...")
+	data = _synthetic_rows(rows)
+	source = "guarani_bench"
+
+	started = time.perf_counter()
+	rowwise = [_dwh_pk(dict(zip(COLUMNS, row)), source) for row in data]
+	rowwise_s = time.perf_counter() - started
+
+	# Warm-up: imports DuckDB and opens the hashing connection once.
+	_rows_to_record_batch(COLUMNS, data[:10], source, add_dwh_pk=True)
+	started = time.perf_counter()
+	vectorized: list[str] = []
+	for i in range(0, rows, batch_size):
+		batch = _rows_to_record_batch(COLUMNS, data[i : i + batch_size], source, add_dwh_pk=True)
+		vectorized.extend(batch.column(batch.schema.get_field_index("dwh_pk")).to_pylist())
+	vectorized_s = time.perf_counter() - started
+
+	started = time.perf_counter()
+	for i in range(0, rows, batch_size):
+		_rows_to_record_batch(COLUMNS, data[i : i + batch_size], source)
+	batch_only_s = time.perf_counter() - started
+
+	# Key only: the key columns are converted first, outside the timing.
+	inputs = []
+	for i in range(0, rows, batch_size):
+		chunk = data[i : i + batch_size]
+		columns = {
+			name: (_arrow_column(name, values, None), values)
+			for name, values in zip(COLUMNS, zip(*chunk))
+			if name in _DWH_PK_FIELDS
+		}
+		inputs.append((columns, len(chunk)))
+	started = time.perf_counter()
+	for columns, num_rows in inputs:
+		_dwh_pk_array(columns, num_rows, source)
+	key_s = time.perf_counter() - started
+
+	mismatches = sum(1 for a, b in zip(rowwise, vectorized) if a != b)
+	print(f"[Bench] row-wise   : {rows / rowwise_s:>12,.0f} rows/s ({rowwise_s:.2f} s)")
+	print(f"[Bench] vectorized : {rows / vectorized_s:>12,.0f} rows/s ({vectorized_s:.2f} s, incl. batch build)")
+	print(f"[Bench] batch only : {rows / batch_only_s:>12,.0f} rows/s ({batch_only_s:.2f} s, no key)")
+	print(f"[Bench] vectorized : {rows / key_s:>12,.0f} rows/s ({key_s:.2f} s, key only)")
+	print(f"[Bench] identical keys: {mismatches == 0} ({mismatches} mismatches)")
+	if mismatches:
+		raise SystemExit(1)
+
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument("--rows", type=int, default=1_000_000)
+	parser.add_argument("--batch-size", type=int, default=50_000)
+	args = parser.parse_args()
+	run(args.rows, args.batch_size)
+
+
+if __name__ == "__main__":
+	main()
@@ -1,16 +1,34 @@
 from __future__ import annotations
 
+import os
+
 from dwh.pipelines.bronze_ingest import run_bronze
 from dwh.pipelines.gold_aggregates import run_gold
+from dwh.pipelines.ml_export import export_ml_tables
+from dwh.pipelines.publish import publish_warehouse
+from dwh.pipelines.risk_scoring import score_risk
 from dwh.pipelines.silver_transform import run_silver
 
 
+def _enabled(name: str) -> bool:
+	return os.getenv(name, "1").strip().lower() not in {"0", "false", "no", "off"}
+
+
 def main() -> None:
 	from dwh import config
 
 	run_bronze(source_dbs=config.SOURCE_DATABASES)
 	run_silver()
 	run_gold()
+	# DWH_RISK_SCORING=0 skips batch risk scoring (it is also skipped without a model artifact).
+	if _enabled("DWH_RISK_SCORING"):
+		score_risk()
+	# DWH_ML_EXPORT=0 skips the Parquet export of the Gold ML tables.
+	if _enabled("DWH_ML_EXPORT"):
+		export_ml_tables()
+	# DWH_PUBLISH=0 leaves readers on the build database (no snapshot).
+	if _enabled("DWH_PUBLISH"):
+		publish_warehouse()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,358 @@
+"""Streaming sequence loader for `gold.gold_tft_training_dataset`.
+
+Rows are streamed from DuckDB ordered by `alumno_id, time_step` in Arrow record
+batches and assembled into fixed-size mini-batches of students. Besides DuckDB's
+sort (capped by `memory_limit`, spilling beyond it), memory is one record batch
+plus `batch_size * max_len` steps, however many students there are. Each
+mini-batch holds right-padded NumPy blocks:
+
+	static               (B, S)     float32  numeric static covariates (first time step)
+	static_categorical   (B, C)     int64    vocabulary codes, 0 = NULL/unseen
+	known                (B, T, K)  float32  known-future inputs
+	observed             (B, T, O)  float32  time-varying observed inputs
+	target               (B, T)     float32  target per time step, NaN where it is NULL
+	mask                 (B, T)     bool     True for real time steps
+	target_mask          (B, T)     bool     True for real time steps with a known target
+	lengths              (B,)       int32    time steps per student (<= max_len)
+	alumno_id            (B,)
+
+Students are assigned to `shard` by `hash(alumno_id) % num_shards`, so several
+worker processes can each build their own loader and read disjoint students:
+
+	loader = TFTSequenceLoader(batch_size=256, shard=worker_id, num_shards=num_workers)
+	for batch in loader:
+		...
+
+The source is a DuckDB file (opened read-only) or the `manifest.json` of the
+Parquet export (`dwh.pipelines.ml_export`), which needs no DuckDB lock.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+import json
+from pathlib import Path
+from typing import Any, Iterator
+
+import duckdb
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from dwh.pipelines._sql_runner import default_duckdb_path
+from dwh.pipelines.ml_export import MANIFEST_NAME, default_export_dir
+
+
+TABLE = "gold_tft_training_dataset"
+
+# Feature blocks, following the sections of 13_gold_tft_training_dataset.sql.
+# `edad_al_anio` changes with the year, so it is a known-future input here.
+STATIC_COLUMNS = (
+	"sexo",
+	"nacionalidad",
+	"propuesta_id",
+	"modalidad",
+	"tipo_ingreso",
+	"anio_ingreso",
+	"sede_provincia",
+	"sede_localidad",
+	"residencia_departamento",
+	"residencia_localidad",
+	"origen_departamento",
+	"origen_localidad",
+	"estado_civil",
+	"cantidad_hijos",
+	"vive_con",
+	"cobertura_salud",
+	"tipo_vivienda",
+	"trabajo_existe",
+	"trabajo_hora_sem",
+	"beca",
+	"costeos_estudios_familiar",
+	"costeos_estudios_trabajo",
+	"costeos_estudios_beca",
+	"tecnologia_int_casa",
+	"tecnologia_pc_casa",
+	"tecnologia_int_movil",
+	"disc_auditiva",
+	"disc_visual",
+	"disc_motora",
+	"nivel_estudio_previo",
+	"colegio_secundario_desc",
+)
+KNOWN_COLUMNS = ("time_step", "edad_al_anio", "mes_inicio", "trimestre_inicio", "post_pandemia")
+OBSERVED_COLUMNS = (
+	"anios_desde_ingreso",
+	"total_evaluaciones",
+	"materias_cursadas",
+	"cursadas_intentadas",
+	"examenes_intentados",
+	"promedio_notas",
+	"nota_minima",
+	"nota_maxima",
+	"desviacion_notas",
+	"materias_aprobadas",
+	"materias_reprobadas",
+	"materias_ausente",
+	"tasa_aprobacion",
+	"tasa_reprobacion",
+	"tasa_ausentismo",
+	"creditos_obtenidos",
+	"promedio_asistencia",
+	"total_inasistencias",
+	"periodos_riesgo_asistencia",
+	"inscripciones_cursada",
+	"materias_inscriptas",
+	"examenes_inscriptos",
+	"materias_examen_inscriptas",
+	"tuvo_reinscripcion",
+	"reinscripciones",
+	"cambios_estado_anio",
+	"materias_aprobadas_acum",
+	"materias_reprobadas_acum",
+	"creditos_acum",
+	"promedio_historico",
+	"tasa_aprobacion_historica",
+	"promedio_notas_anterior",
+	"tasa_aprobacion_anterior",
+	"tuvo_reinscripcion_anterior",
+	"variacion_promedio",
+	"variacion_tasa_aprobacion",
+	"variacion_materias",
+)
+TARGET_COLUMN = "dropout_next_year"
+
+_TEXT_TYPES = {"VARCHAR", "UUID"}
+
+
+def _is_text(column_type: str) -> bool:
+	# DESCRIBE spells enums out with their values: ENUM('a', 'b').
+	return column_type in _TEXT_TYPES or column_type.startswith("ENUM")
+
+
+@dataclass
+class TFTBatch:
+	alumno_id: np.ndarray
+	lengths: np.ndarray
+	mask: np.ndarray
+	target_mask: np.ndarray
+	static: np.ndarray
+	static_categorical: np.ndarray
+	known: np.ndarray
+	observed: np.ndarray
+	target: np.ndarray
+
+	def __len__(self) -> int:
+		return len(self.alumno_id)
+
+
+def _literal(value: str) -> str:
+	return "'" + value.replace("'", "''") + "'"
+
+
+def _ident(value: str) -> str:
+	return '"' + value.replace('"', '""') + '"'
+
+
+def _default_source() -> Path:
+	manifest = default_export_dir() / MANIFEST_NAME
+	return manifest if manifest.exists() else default_duckdb_path()
+
+
+class TFTSequenceLoader:
+	"""Iterable of `TFTBatch` over one shard of the TFT training dataset.
+
+	`max_len` defaults to the longest sequence in the table; longer sequences keep
+	their last `max_len` steps. NULL features become `fill_value`; NULL targets stay
+	NaN and are left out of `target_mask`, which is what a loss should be masked by. The loader holds
+	no open connection between iterations, so it can be pickled into workers.
+	"""
+
+	def __init__(
+		self,
+		*,
+		source: Path | str | None = None,
+		batch_size: int = 256,
+		max_len: int | None = None,
+		shard: int = 0,
+		num_shards: int = 1,
+		static_columns: tuple[str, ...] = STATIC_COLUMNS,
+		known_columns: tuple[str, ...] = KNOWN_COLUMNS,
+		observed_columns: tuple[str, ...] = OBSERVED_COLUMNS,
+		target_column: str = TARGET_COLUMN,
+		fill_value: float = 0.0,
+		drop_last: bool = False,
+		rows_per_read: int = 65_536,
+		memory_limit: str | None = None,
+	) -> None:
+		if not 0 <= shard < num_shards:
+			raise ValueError(f"shard must be in [0, {num_shards}), got {shard}")
+		self.source = Path(source) if source is not None else _default_source()
+		self.batch_size = batch_size
+		self.shard = shard
+		self.num_shards = num_shards
+		self.known_columns = tuple(known_columns)
+		self.observed_columns = tuple(observed_columns)
+		self.target_column = target_column
+		self.fill_value = fill_value
+		self.drop_last = drop_last
+		self.rows_per_read = rows_per_read
+		self.memory_limit = memory_limit
+		# Resolved once: a newer export switching the manifest does not change a running epoch.
+		self.relation = self._resolve_relation()
+
+		with self._connect() as con:
+			types = dict(
+				con.execute(f"SELECT column_name, column_type FROM (DESCRIBE SELECT * FROM {self.relation})").fetchall()
+			)
+			wanted = ["alumno_id", *static_columns, *known_columns, *observed_columns, target_column]
+			missing = [c for c in wanted if c not in types]
+			if missing:
+				raise ValueError(f"{self.source}: columns not in {TABLE}: {', '.join(missing)}")
+			text = [c for c in (*known_columns, *observed_columns, target_column) if _is_text(types[c])]
+			if text:
+				raise ValueError(f"Time-varying features must be numeric: {', '.join(text)}")
+			self.static_columns = tuple(c for c in static_columns if not _is_text(types[c]))
+			self.categorical_columns = tuple(c for c in static_columns if _is_text(types[c]))
+			# Vocabularies come from the whole table, so every shard encodes alike.
+			self.vocabularies: dict[str, dict[str, int]] = {}
+			for column in self.categorical_columns:
+				values = con.execute(
+					f"SELECT DISTINCT {_ident(column)} FROM {self.relation} "
+					f"WHERE {_ident(column)} IS NOT NULL ORDER BY 1"
+				).fetchall()
+				self.vocabularies[column] = {v[0]: i + 1 for i, v in enumerate(values)}
+			if max_len is None:
+				max_len = con.execute(
+					f"SELECT coalesce(max(n), 1) FROM (SELECT count(*) AS n FROM {self.relation} GROUP BY alumno_id)"
+				).fetchone()[0]
+		self.max_len = int(max_len)
+
+	def _resolve_relation(self) -> str:
+		if self.source.suffix == ".json":
+			manifest = json.loads(self.source.read_text(encoding="utf-8"))
+			entry = manifest["tables"][TABLE]
+			files = self.source.parent / entry["path"] / "**" / "*.parquet"
+			return f"read_parquet({_literal(str(files))}, hive_partitioning = true)"
+		return f"gold.{TABLE}"
+
+	def _connect(self) -> duckdb.DuckDBPyConnection:
+		if self.source.suffix == ".json":
+			con = duckdb.connect()
+		else:
+			con = duckdb.connect(str(self.source), read_only=True)
+		if self.memory_limit:
+			con.execute(f"SET memory_limit = {_literal(self.memory_limit)}")
+		return con
+
+	def _query(self) -> str:
+		columns = ["alumno_id", *self.static_columns, *self.categorical_columns, *self.known_columns]
+		columns += [*self.observed_columns, self.target_column]
+		where = f"WHERE hash(alumno_id) % {self.num_shards} = {self.shard}" if self.num_shards > 1 else ""
+		return (
+			f"SELECT {', '.join(_ident(c) for c in columns)} FROM {self.relation} {where} "
+			"ORDER BY alumno_id, time_step"
+		)
+
+	def _matrix(self, batch: pa.RecordBatch, columns: tuple[str, ...], *, fill: bool = True) -> np.ndarray:
+		out = np.empty((batch.num_rows, len(columns)), dtype=np.float32)
+		for i, column in enumerate(columns):
+			values = pc.cast(batch.column(column), pa.float32(), safe=False)
+			out[:, i] = values.to_numpy(zero_copy_only=False)
+		if fill:
+			np.nan_to_num(out, copy=False, nan=self.fill_value)
+		return out
+
+	def _codes(self, batch: pa.RecordBatch, value_sets: dict[str, pa.Array]) -> np.ndarray:
+		out = np.zeros((batch.num_rows, len(self.categorical_columns)), dtype=np.int64)
+		for i, column in enumerate(self.categorical_columns):
+			# Vocabularies are sorted, so position + 1 is the code; NULL/unseen stay 0.
+			index = pc.index_in(pc.cast(batch.column(column), pa.string()), value_set=value_sets[column])
+			out[:, i] = pc.fill_null(pc.add(index, 1), 0).to_numpy(zero_copy_only=False)
+		return out
+
+	def __iter__(self) -> Iterator[TFTBatch]:
+		builder = _BatchBuilder(self)
+		tail: dict[str, Any] | None = None
+		value_sets = {c: pa.array(list(v), type=pa.string()) for c, v in self.vocabularies.items()}
+		with self._connect() as con:
+			reader = con.execute(self._query()).fetch_record_batch(self.rows_per_read)
+			for batch in reader:
+				if batch.num_rows == 0:
+					continue
+				rows = {
+					"ids": batch.column("alumno_id").to_numpy(zero_copy_only=False),
+					"static": self._matrix(batch, self.static_columns),
+					"categorical": self._codes(batch, value_sets),
+					"known": self._matrix(batch, self.known_columns),
+					"observed": self._matrix(batch, self.observed_columns),
+					# A NULL target (the last observed year has no next year) is not a label.
+					"target": self._matrix(batch, (self.target_column,), fill=False)[:, 0],
+				}
+				if tail is not None:
+					rows = {k: np.concatenate([tail[k], rows[k]]) for k in rows}
+				ids = rows["ids"]
+				starts = np.concatenate([[0], np.flatnonzero(ids[1:] != ids[:-1]) + 1])
+				# The last student may continue in the next record batch.
+				for start, end in zip(starts[:-1], starts[1:]):
+					if builder.add(rows, start, end):
+						yield builder.flush()
+				tail = {k: v[starts[-1] :] for k, v in rows.items()}
+		if tail is not None and builder.add(tail, 0, len(tail["ids"])):
+			yield builder.flush()
+		if builder.size and not self.drop_last:
+			yield builder.flush()
+
+
+class _BatchBuilder:
+	def __init__(self, loader: TFTSequenceLoader) -> None:
+		self.loader = loader
+		self.size = 0
+		self._reset()
+
+	def _reset(self) -> None:
+		b, t = self.loader.batch_size, self.loader.max_len
+		fill = self.loader.fill_value
+		self.ids: list[Any] = []
+		self.lengths = np.zeros(b, dtype=np.int32)
+		self.mask = np.zeros((b, t), dtype=bool)
+		self.target_mask = np.zeros((b, t), dtype=bool)
+		self.static = np.full((b, len(self.loader.static_columns)), fill, dtype=np.float32)
+		self.categorical = np.zeros((b, len(self.loader.categorical_columns)), dtype=np.int64)
+		self.known = np.full((b, t, len(self.loader.known_columns)), fill, dtype=np.float32)
+		self.observed = np.full((b, t, len(self.loader.observed_columns)), fill, dtype=np.float32)
+		self.target = np.full((b, t), fill, dtype=np.float32)
+
+	def add(self, rows: dict[str, np.ndarray], start: int, end: int) -> bool:
+		"""Add one student's rows; True when the batch is full."""
+		i = self.size
+		first = max(start, end - self.loader.max_len)
+		n = end - first
+		self.ids.append(rows["ids"][start])
+		self.lengths[i] = n
+		self.mask[i, :n] = True
+		self.static[i] = rows["static"][start]
+		self.categorical[i] = rows["categorical"][start]
+		self.known[i, :n] = rows["known"][first:end]
+		self.observed[i, :n] = rows["observed"][first:end]
+		self.target[i, :n] = rows["target"][first:end]
+		self.target_mask[i, :n] = ~np.isnan(rows["target"][first:end])
+		self.size += 1
+		return self.size == self.loader.batch_size
+
+	def flush(self) -> TFTBatch:
+		n = self.size
+		batch = TFTBatch(
+			alumno_id=np.asarray(self.ids),
+			lengths=self.lengths[:n],
+			mask=self.mask[:n],
+			target_mask=self.target_mask[:n],
+			static=self.static[:n],
+			static_categorical=self.categorical[:n],
+			known=self.known[:n],
+			observed=self.observed[:n],
+			target=self.target[:n],
+		)
+		self.size = 0
+		self._reset()
+		return batch
@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+import duckdb
+import sqlalchemy as sa
+
+from dwh.sources._engines import get_engine
+
+
+# Postgres type OIDs -> DuckDB types for the `COPY ... TO STDOUT` path. NUMERIC
+# matches dlt's default decimal so both loaders produce the same column types.
+_PG_TYPES = {
+	16: "BOOLEAN",
+	20: "BIGINT",
+	21: "SMALLINT",
+	23: "INTEGER",
+	700: "REAL",
+	701: "DOUBLE",
+	1700: "DECIMAL(38,9)",
+	1082: "DATE",
+	1083: "TIME",
+	1114: "TIMESTAMP",
+	1184: "TIMESTAMPTZ",
+}
+
+
+def _literal(value: str) -> str:
+	return "'" + value.replace("'", "''") + "'"
+
+
+def _ident(value: str) -> str:
+	return '"' + value.replace('"', '""') + '"'
+
+
+def _libpq_dsn(conn_string: str) -> str:
+	# SQLAlchemy URLs may carry a driver (`postgresql+psycopg2://`); libpq does not.
+	url = sa.engine.make_url(conn_string).set(drivername="postgresql")
+	return url.render_as_string(hide_password=False)
+
+
+def _load_postgres_extension(con: duckdb.DuckDBPyConnection) -> bool:
+	# DWH_BRONZE_COPY_METHOD=auto (scanner, else COPY) | scanner | copy
+	method = os.getenv("DWH_BRONZE_COPY_METHOD", "auto").strip().lower()
+	if method == "copy":
+		return False
+	try:
+		con.execute("INSTALL postgres")
+		con.execute("LOAD postgres")
+		return True
+	except Exception as exc:  # noqa: BLE001
+		if method == "scanner":
+			raise
+		print(f"[Bronze][WARN] DuckDB postgres extension unavailable; using COPY TO STDOUT ({exc})")
+		return False
+
+
+def _copy_to_csv(conn_string: str, sql: str, path: Path) -> dict[str, str]:
+	"""Spool `COPY (sql) TO STDOUT` into a CSV file; return its column types."""
+	query = sql.strip().rstrip(";")
+	raw = get_engine(conn_string).raw_connection()
+	try:
+		cur = raw.cursor()
+		cur.execute("SET client_encoding TO 'UTF8'")
+		cur.execute(f"SELECT * FROM (\n{query}\n) AS q LIMIT 0")
+		columns = {d.name: _PG_TYPES.get(d.type_code, "VARCHAR") for d in cur.description}
+		with path.open("wb") as fh:
+			cur.copy_expert(f"COPY (\n{query}\n) TO STDOUT WITH (FORMAT csv, HEADER true)", fh)
+		cur.close()
+	finally:
+		# Plain SELECT/COPY only; rollback so the pooled connection comes back clean.
+		raw.rollback()
+		raw.close()
+	return columns
+
+
+def _ensure_staging(
+	con: duckdb.DuckDBPyConnection,
+	*,
+	staging: str,
+	target: str,
+	target_exists: bool,
+	select: str,
+	created: bool,
+) -> None:
+	if not created:
+		# Start from the current bronze table so column types stay what dlt created
+		# (INSERT ... BY NAME casts into them); new tables take the query's types.
+		template = f"SELECT * FROM {target}" if target_exists else select
+		con.execute(f"CREATE TABLE {staging} AS {template} LIMIT 0")
+	existing = {r[0] for r in con.execute(f"DESCRIBE {staging}").fetchall()}
+	for column, column_type, *_ in con.execute(f"DESCRIBE {select}").fetchall():
+		if column not in existing:
+			con.execute(f"ALTER TABLE {staging} ADD COLUMN {_ident(column)} {column_type}")
+
+
+def _register_load(con: duckdb.DuckDBPyConnection, schema: str, load_id: str, dlt_schema_name: str | None) -> None:
+	# A completed (status 0) `_dlt_loads` row for the copied rows' `_dlt_load_id`,
+	# as dlt writes for its own loads, so joins on finished loads keep working.
+	# dlt's stored schema and state are not updated: they do not describe
+	# copy-loaded tables.
+	loads = f"{_ident(schema)}._dlt_loads"
+	con.execute(
+		f"CREATE TABLE IF NOT EXISTS {loads} (load_id VARCHAR NOT NULL, schema_name VARCHAR, "
+		"status BIGINT NOT NULL, inserted_at TIMESTAMP WITH TIME ZONE NOT NULL, schema_version_hash VARCHAR)"
+	)
+	version_hash = None
+	has_versions = con.execute(
+		"SELECT count(*) FROM information_schema.tables WHERE table_schema = ? AND table_name = '_dlt_version'",
+		[schema],
+	).fetchone()[0]
+	if has_versions and dlt_schema_name is not None:
+		row = con.execute(
+			f"SELECT version_hash FROM {_ident(schema)}._dlt_version WHERE schema_name = ? "
+			"ORDER BY inserted_at DESC LIMIT 1",
+			[dlt_schema_name],
+		).fetchone()
+		version_hash = row[0] if row else None
+	con.execute(
+		f"INSERT INTO {loads} (load_id, schema_name, status, inserted_at, schema_version_hash) "
+		"VALUES (?, ?, 0, current_timestamp, ?)",
+		[load_id, dlt_schema_name, version_hash],
+	)
+
+
+def copy_replace_resource(
+	*,
+	name: str,
+	sql: str,
+	source_dbs: list[dict[str, Any]],
+	duckdb_path: Path,
+	schema: str = "bronze",
+	dlt_schema_name: str | None = None,
+) -> dict[str, dict[str, float]]:
+	"""Full-refresh `schema.name` by bulk-copying `sql` from every source DB.
+
+	Rows are streamed through DuckDB's postgres scanner (or `COPY ... TO STDOUT`
+	when the extension is not available) into a staging table, tagged with
+	`source_db` like the dlt path, and swapped into place in one transaction,
+	together with a `_dlt_loads` row for their load id under `dlt_schema_name`.
+	Returns `{"rows": ..., "read_s": ...}` per source DB.
+	"""
+	target = f"{_ident(schema)}.{_ident(name)}"
+	staging = f"{_ident(schema)}.{_ident(name + '__copy')}"
+	load_id = str(time.time())
+	counts: dict[str, dict[str, float]] = {}
+
+	con = duckdb.connect(str(duckdb_path))
+	try:
+		con.execute(f"CREATE SCHEMA IF NOT EXISTS {_ident(schema)}")
+		con.execute(f"DROP TABLE IF EXISTS {staging}")
+		target_exists = bool(
+			con.execute(
+				"SELECT count(*) FROM information_schema.tables WHERE table_schema = ? AND table_name = ?",
+				[schema, name],
+			).fetchone()[0]
+		)
+		use_scanner = _load_postgres_extension(con)
+		created = False
+		with tempfile.TemporaryDirectory(prefix="dwh_copy_") as tmp:
+			for db in source_dbs:
+				started = time.perf_counter()
+				# Same extra columns as the dlt path, so silver SQL reads either.
+				extra = (
+					f"{_literal(db['name'])} AS source_db, {_literal(load_id)} AS _dlt_load_id, "
+					"gen_random_uuid()::VARCHAR AS _dlt_id, CAST(NULL AS BOOLEAN) AS dwh_deleted"
+				)
+				alias = f"pg_{db['name']}"
+				if use_scanner:
+					dsn = _libpq_dsn(db["conn_string"])
+					con.execute(f"ATTACH {_literal(dsn)} AS {_ident(alias)} (TYPE postgres, READ_ONLY)")
+					source = f"postgres_query({_literal(alias)}, {_literal(sql.strip().rstrip(';'))})"
+				else:
+					csv_path = Path(tmp) / f"{db['name']}.csv"
+					columns = _copy_to_csv(db["conn_string"], sql, csv_path)
+					spec = "{" + ", ".join(f"{_literal(c)}: {_literal(t)}" for c, t in columns.items()) + "}"
+					source = (
+						f"read_csv({_literal(str(csv_path))}, header = true, auto_detect = false, "
+						f"columns = {spec}, allow_quoted_nulls = false)"
+					)
+				try:
+					select = f"SELECT *, {extra} FROM {source}"
+					_ensure_staging(
+						con,
+						staging=staging,
+						target=target,
+						target_exists=target_exists,
+						select=select,
+						created=created,
+					)
+					created = True
+					con.execute(f"INSERT INTO {staging} BY NAME {select}")
+				finally:
+					if use_scanner:
+						con.execute(f"DETACH {_ident(alias)}")
+				rows = con.execute(f"SELECT count(*) FROM {staging} WHERE source_db = ?", [db["name"]]).fetchone()[0]
+				counts[db["name"]] = {"rows": rows, "read_s": time.perf_counter() - started}
+				print(f"[Bronze] Copied {name} from {db['name']}: {rows} rows in {counts[db['name']]['read_s']:.1f}s")
+
+		if not created:
+			return counts
+		con.execute("BEGIN TRANSACTION")
+		con.execute(f"DROP TABLE IF EXISTS {target}")
+		con.execute(f"ALTER TABLE {staging} RENAME TO {_ident(name)}")
+		_register_load(con, schema, load_id, dlt_schema_name)
+		con.execute("COMMIT")
+	except Exception:
+		# Bronze keeps the previous snapshot; only the staging table is dropped.
+		try:
+			con.execute("ROLLBACK")
+		except duckdb.Error:
+			pass
+		con.execute(f"DROP TABLE IF EXISTS {staging}")
+		raise
+	finally:
+		con.close()
+	return counts
@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+import resource
+import threading
+from typing import Any
+
+
+# Concurrency levels. `_DEFAULT_LEVEL` matches an ungoverned run (one dlt worker,
+# 4 parallel DBs, 2 queued chunks, 50k-row Arrow batches, dlt's 5k-item writer
+# buffer); the levels below it trade speed for memory. Source reads hold up to
+# `parallel_dbs + read_ahead` Arrow batches in flight (see `_interleave_sources`). Between resources the governor moves one level
+# up while the last resource peaked under `_RAISE_BELOW` of the budget, and down
+# when it went over `_LOWER_ABOVE`.
+_LEVELS: tuple[dict[str, int], ...] = (
+	{"normalize_workers": 1, "load_workers": 1, "parallel_dbs": 1, "read_ahead": 1, "buffer_items": 5_000, "arrow_batch": 20_000},
+	{"normalize_workers": 1, "load_workers": 1, "parallel_dbs": 2, "read_ahead": 1, "buffer_items": 5_000, "arrow_batch": 50_000},
+	{"normalize_workers": 1, "load_workers": 1, "parallel_dbs": 4, "read_ahead": 2, "buffer_items": 5_000, "arrow_batch": 50_000},
+	{"normalize_workers": 2, "load_workers": 2, "parallel_dbs": 4, "read_ahead": 2, "buffer_items": 10_000, "arrow_batch": 50_000},
+	{"normalize_workers": 4, "load_workers": 4, "parallel_dbs": 4, "read_ahead": 2, "buffer_items": 20_000, "arrow_batch": 100_000},
+	{"normalize_workers": 8, "load_workers": 4, "parallel_dbs": 8, "read_ahead": 2, "buffer_items": 50_000, "arrow_batch": 100_000},
+)
+_DEFAULT_LEVEL = 2
+# Settings passed on through the environment. A value the operator set is a cap:
+# the governor may go below it, never above.
+_ENV_SETTINGS = {
+	"parallel_dbs": "DWH_BRONZE_MAX_PARALLEL_DBS",
+	"read_ahead": "DWH_BRONZE_READ_AHEAD",
+	"arrow_batch": "DWH_BRONZE_ARROW_BATCH_SIZE",
+	"buffer_items": "DATA_WRITER__BUFFER_MAX_ITEMS",
+}
+_RAISE_BELOW = 0.5
+_LOWER_ABOVE = 0.9
+
+
+def _status_rss_kb(pid: str) -> int:
+	with open(f"/proc/{pid}/status", encoding="ascii") as fh:
+		for line in fh:
+			if line.startswith("VmRSS:"):
+				return int(line.split()[1])
+	return 0
+
+
+def _child_pids(pid: str) -> list[str]:
+	children: list[str] = []
+	for task in Path(f"/proc/{pid}/task").iterdir():
+		try:
+			children.extend((task / "children").read_text().split())
+		except OSError:
+			continue
+	return children
+
+
+def rss_mb() -> float:
+	"""Resident memory of this process and its children (normalize workers), in MB.
+
+	Uses /proc where available; elsewhere falls back to this process's peak RSS.
+	"""
+	if not Path("/proc/self/status").exists():
+		return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+	pending = ["self"]
+	total_kb = 0
+	while pending:
+		pid = pending.pop()
+		try:
+			total_kb += _status_rss_kb(pid)
+			pending.extend(_child_pids(pid))
+		except OSError:
+			# Child exited between listing and reading.
+			continue
+	return total_kb / 1024
+
+
+class PeakSampler:
+	"""Context manager that samples `rss_mb()` every `interval_s` in a background thread.
+
+	`peak_mb` holds the highest value seen, including one last sample on exit.
+	"""
+
+	def __init__(self, interval_s: float) -> None:
+		self.interval_s = interval_s
+		self.peak_mb = 0.0
+		self._stop = threading.Event()
+		self._thread = threading.Thread(target=self._run, name="peak-rss", daemon=True)
+
+	def _run(self) -> None:
+		while True:
+			self.peak_mb = max(self.peak_mb, rss_mb())
+			if self._stop.wait(self.interval_s):
+				return
+
+	def __enter__(self) -> PeakSampler:
+		self._thread.start()
+		return self
+
+	def __exit__(self, *exc: Any) -> None:
+		self._stop.set()
+		self._thread.join()
+		self.peak_mb = max(self.peak_mb, rss_mb())
+
+
+class MemoryGovernor:
+	"""Pick dlt worker counts and buffer sizes per resource to stay under a memory budget.
+
+	Enabled with `DWH_BRONZE_MEMORY_MB`. Before each resource `apply` sets the
+	current level (dlt normalize/load workers, source DBs read in parallel and
+	chunks queued ahead of dlt, dlt writer buffer and Arrow batch sizes); `observe` then compares the resource's
+	peak RSS with the budget and moves the level for the next one. Values the
+	operator set in the environment cap the matching settings, and `restore`
+	puts them back once bronze is done. Every decision is logged so the budget
+	can be tuned per host.
+	"""
+
+	def __init__(self, budget_mb: int, *, level: int = _DEFAULT_LEVEL, interval_s: float = 0.5) -> None:
+		self.budget_mb = budget_mb
+		self.level = max(0, min(level, len(_LEVELS) - 1))
+		self.interval_s = interval_s
+		self._environ = {var: os.environ.get(var) for var in _ENV_SETTINGS.values()}
+		self._caps: dict[str, int] = {}
+		for setting, var in _ENV_SETTINGS.items():
+			try:
+				self._caps[setting] = max(1, int(self._environ[var] or ""))
+			except ValueError:
+				continue
+
+	@classmethod
+	def from_env(cls) -> MemoryGovernor | None:
+		budget = int(os.getenv("DWH_BRONZE_MEMORY_MB", "0") or 0)
+		if budget <= 0:
+			return None
+		return cls(
+			budget,
+			level=int(os.getenv("DWH_BRONZE_MEMORY_START_LEVEL", "").strip() or _DEFAULT_LEVEL),
+			interval_s=float(os.getenv("DWH_BRONZE_MEMORY_SAMPLE_S", "0.5") or 0.5),
+		)
+
+	def apply(self, resource_name: str) -> dict[str, int]:
+		settings = dict(_LEVELS[self.level])
+		cpus = os.cpu_count() or 1
+		settings["normalize_workers"] = min(settings["normalize_workers"], cpus)
+		for setting, cap in self._caps.items():
+			settings[setting] = min(settings[setting], cap)
+		# Read by `_interleave_sources` / `_arrow_batch_size` and by dlt's buffered
+		# writers each time a resource is extracted or normalized.
+		for setting, var in _ENV_SETTINGS.items():
+			os.environ[var] = str(settings[setting])
+		print(
+			f"[Bronze] Memory governor: {resource_name} at level {self.level} "
+			f"(rss {rss_mb():.0f}/{self.budget_mb} MB, "
+			+ ", ".join(f"{k}={v}" for k, v in settings.items())
+			+ ")"
+		)
+		return settings
+
+	def restore(self) -> None:
+		"""Put back the environment `apply` changed, so later layers see the operator's values."""
+		for var, value in self._environ.items():
+			if value is None:
+				os.environ.pop(var, None)
+			else:
+				os.environ[var] = value
+
+	def sample(self) -> PeakSampler:
+		return PeakSampler(self.interval_s)
+
+	def observe(self, resource_name: str, peak_mb: float) -> None:
+		old = self.level
+		ratio = peak_mb / self.budget_mb
+		if ratio > _LOWER_ABOVE:
+			# Over the budget itself: drop two levels, close to it: one.
+			self.level = max(0, old - (2 if ratio > 1 else 1))
+			reason = "over budget" if ratio > 1 else "near budget"
+		elif ratio < _RAISE_BELOW:
+			self.level = min(len(_LEVELS) - 1, old + 1)
+			reason = "headroom"
+		else:
+			reason = "within band"
+		print(
+			f"[Bronze] Memory governor: {resource_name} peaked at {peak_mb:.0f} MB "
+			f"({ratio:.0%} of {self.budget_mb} MB); level {old} -> {self.level} ({reason})"
+		)
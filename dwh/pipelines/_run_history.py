@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+from datetime import datetime
+import json
+import os
+from pathlib import Path
+from typing import Any
+import uuid
+
+import duckdb
+
+
+# One row per (run, resource, source DB). Cursor values are stored as text since
+# their type differs per resource (dates, timestamps, composite integers).
+_COLUMNS: tuple[tuple[str, str], ...] = (
+	("run_id", "VARCHAR"),
+	("run_started_at", "TIMESTAMP"),
+	("resource", "VARCHAR"),
+	("source_db", "VARCHAR"),
+	("loader", "VARCHAR"),
+	("status", "VARCHAR"),
+	("rows", "BIGINT"),
+	("bytes", "BIGINT"),
+	("first_row_s", "DOUBLE"),
+	("read_s", "DOUBLE"),
+	("rows_per_s", "DOUBLE"),
+	("extract_s", "DOUBLE"),
+	("normalize_s", "DOUBLE"),
+	("load_s", "DOUBLE"),
+	("cursor_column", "VARCHAR"),
+	("cursor_start", "VARCHAR"),
+	("cursor_end", "VARCHAR"),
+	("fallback", "BOOLEAN"),
+	("error", "VARCHAR"),
+)
+
+
+class RunHistory:
+	"""Structured metrics of one `run_bronze` run, per resource and source DB.
+
+	`record` is called as each resource finishes (or fails): its rows are
+	appended to `meta.bronze_run_history` in the warehouse and the run's JSON
+	file is rewritten with everything recorded so far, so an interrupted run
+	still leaves the resources it completed behind.
+	"""
+
+	def __init__(self, duckdb_path: Path, json_dir: Path | None = None) -> None:
+		self.started_at = datetime.now()
+		self.run_id = f"{self.started_at:%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:6]}"
+		self.duckdb_path = duckdb_path
+		self.json_path = (json_dir or duckdb_path.parent / "runs") / f"bronze_run_{self.run_id}.json"
+		self.rows: list[dict[str, Any]] = []
+
+	@classmethod
+	def from_env(cls, duckdb_path: Path) -> RunHistory:
+		# DWH_BRONZE_RUN_LOG_DIR: where the per-run JSON files go (default data/runs).
+		json_dir = os.getenv("DWH_BRONZE_RUN_LOG_DIR", "").strip()
+		return cls(duckdb_path, Path(json_dir) if json_dir else None)
+
+	def record(
+		self,
+		resource: str,
+		reads: list[dict[str, Any]],
+		*,
+		loader: str,
+		phases: dict[str, float],
+		status: str = "ok",
+		error: str | None = None,
+	) -> None:
+		# A resource that failed before reading anything still gets one row.
+		rows = []
+		for read in reads or [{"source_db": None, "rows": 0}]:
+			row: dict[str, Any] = {name: None for name, _ in _COLUMNS}
+			row.update(read)
+			row.update(phases)
+			row.update(run_id=self.run_id, run_started_at=self.started_at, resource=resource, loader=loader)
+			# A failed resource fails all its rows; otherwise keep per-DB `skipped`/`failed`.
+			row["status"] = status if status != "ok" else (row["status"] or status)
+			row["error"] = row["error"] or error
+			if row.get("read_s"):
+				row["rows_per_s"] = row["rows"] / row["read_s"]
+			for key in ("cursor_start", "cursor_end"):
+				if row[key] is not None:
+					row[key] = str(row[key])
+			rows.append({name: row[name] for name, _ in _COLUMNS})
+		self.rows.extend(rows)
+		try:
+			self._insert(rows)
+			self._write_json()
+		except Exception as exc:  # noqa: BLE001
+			# Telemetry must never fail an otherwise successful load.
+			print(f"[Bronze][WARN] Could not record run history for {resource}: {exc}")
+
+	def _insert(self, rows: list[dict[str, Any]]) -> None:
+		columns = ", ".join(name for name, _ in _COLUMNS)
+		with duckdb.connect(str(self.duckdb_path)) as con:
+			con.execute("CREATE SCHEMA IF NOT EXISTS meta")
+			con.execute(
+				"CREATE TABLE IF NOT EXISTS meta.bronze_run_history ("
+				+ ", ".join(f"{name} {column_type}" for name, column_type in _COLUMNS)
+				+ ")"
+			)
+			con.executemany(
+				f"INSERT INTO meta.bronze_run_history ({columns}) VALUES ({', '.join('?' for _ in _COLUMNS)})",
+				[list(row.values()) for row in rows],
+			)
+
+	def _write_json(self) -> None:
+		self.json_path.parent.mkdir(parents=True, exist_ok=True)
+		tmp = self.json_path.with_suffix(".json.tmp")
+		tmp.write_text(json.dumps(self.rows, default=str, indent=1), encoding="utf-8")
+		tmp.replace(self.json_path)
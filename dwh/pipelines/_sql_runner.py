@@ -1,6 +1,16 @@
 from __future__ import annotations
 
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from datetime import date, datetime
+import hashlib
+import json
+import os
 from pathlib import Path
+import re
+import threading
+import time
+from typing import Any, Iterator
+import uuid
 
 import duckdb
 
@@ -21,7 +31,774 @@ def _split_sql_statements(sql_text: str) -> list[str]:
     return statements
 
 
+# Table references, for the dependency graph between scripts. Comments and string
+# literals are stripped first so words like "FROM" in them are not picked up.
+_COMMENT_RE = re.compile(r"--[^\n]*|/\*.*?\*/", re.DOTALL)
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_WRITE_RE = re.compile(
+    r"\b(?:CREATE\s+(?:OR\s+REPLACE\s+)?(?:TEMP(?:ORARY)?\s+)?(?:TABLE|VIEW)(?:\s+IF\s+NOT\s+EXISTS)?"
+    r"|INSERT\s+(?:OR\s+\w+\s+)?INTO|UPDATE|DELETE\s+FROM|ALTER\s+TABLE)\s+([A-Za-z_][\w.]*)",
+    re.IGNORECASE,
+)
+_READ_RE = re.compile(r"\b(?:FROM|JOIN)\s+([A-Za-z_][\w.]*)", re.IGNORECASE)
+# Further tables of a comma join: `FROM a x, b y` (alias optional).
+_COMMA_JOIN_RE = re.compile(
+    r"\b(?:FROM|JOIN)\s+[A-Za-z_][\w.]*(?:\s+(?:AS\s+)?\w+)?"
+    r"((?:\s*,\s*[A-Za-z_][\w.]*(?:\s+(?:AS\s+)?\w+)?)+)",
+    re.IGNORECASE,
+)
+_CTE_RE = re.compile(r"\b([A-Za-z_]\w*)\s+AS\s*(?:NOT\s+)?(?:MATERIALIZED\s+)?\(", re.IGNORECASE)
+
+
+def _table_refs(sql_text: str, schema: str) -> tuple[set[str], set[str], set[str]]:
+    """(written, qualified reads, unqualified reads) of a script, lower-cased."""
+    text = _STRING_RE.sub("''", _COMMENT_RE.sub(" ", sql_text))
+    ctes = {m.lower() for m in _CTE_RE.findall(text)}
+
+    def qualify(name: str) -> str:
+        name = name.lower()
+        return name if "." in name else f"{schema}.{name}"
+
+    writes = {qualify(m) for m in _WRITE_RE.findall(text)}
+    reads = {m.lower() for m in _READ_RE.findall(text)}
+    for tail in _COMMA_JOIN_RE.findall(text):
+        reads.update(item.split()[0].lower() for item in tail.split(",") if item.strip())
+    qualified = {r for r in reads if "." in r}
+    unqualified = {f"{schema}.{r}" for r in reads if "." not in r and r not in ctes}
+    return writes, qualified, unqualified
+
+
+def _dependencies(sql_files: list[Path], schema: str) -> dict[Path, set[Path]]:
+    """Scripts each script has to wait for: the writers of the tables it reads.
+
+    Unqualified names only count when another script in the directory writes them
+    (so CTEs and `EXTRACT(... FROM col)` are not mistaken for tables). Scripts that
+    write the same table keep their file order.
+    """
+    refs = {p: _table_refs(p.read_text(encoding="utf-8"), schema) for p in sql_files}
+    writers: dict[str, list[Path]] = {}
+    for path in sql_files:
+        for table in refs[path][0]:
+            writers.setdefault(table, []).append(path)
+
+    deps: dict[Path, set[Path]] = {p: set() for p in sql_files}
+    for path in sql_files:
+        writes, qualified, unqualified = refs[path]
+        for table in qualified | {t for t in unqualified if t in writers}:
+            deps[path].update(w for w in writers.get(table, []) if w != path)
+        for table in writes:
+            same = writers[table]
+            deps[path].update(same[: same.index(path)])
+    return deps
+
+
+def _has_cycle(deps: dict[Path, set[Path]]) -> bool:
+    done: set[Path] = set()
+    pending = dict(deps)
+    while pending:
+        ready = [p for p, d in pending.items() if d <= done]
+        if not ready:
+            return True
+        for p in ready:
+            done.add(p)
+            del pending[p]
+    return False
+
+
+# One row per profiled statement (`DWH_SQL_PROFILE=1`).
+_PROFILE_COLUMNS: tuple[tuple[str, str], ...] = (
+    ("run_id", "VARCHAR"),
+    ("run_started_at", "TIMESTAMP"),
+    ("layer", "VARCHAR"),
+    ("model", "VARCHAR"),
+    ("statement", "INTEGER"),
+    ("query", "VARCHAR"),
+    ("elapsed_s", "DOUBLE"),
+    ("cpu_s", "DOUBLE"),
+    ("peak_memory_bytes", "BIGINT"),
+    ("rows_out", "BIGINT"),
+    ("operators", "VARCHAR"),
+    ("profile", "VARCHAR"),
+)
+# Writes report one row (the count); their input is what they produced.
+_WRITE_OPERATORS = {"CREATE_TABLE_AS", "BATCH_CREATE_TABLE_AS", "INSERT", "MERGE_INTO", "UPDATE", "DELETE"}
+
+
+def _operators(node: dict[str, Any]) -> Iterator[dict[str, Any]]:
+    extra = node.get("extra_info") or {}
+    yield {
+        "operator": node.get("operator_name") or node.get("operator_type"),
+        "table": extra.get("Table") if isinstance(extra, dict) else None,
+        "timing_s": node.get("operator_timing", 0.0),
+        "rows": node.get("operator_cardinality", 0),
+    }
+    for child in node.get("children", []):
+        yield from _operators(child)
+
+
+class _Profiler:
+    """DuckDB's JSON profile of every statement one `run_sql_dir` call runs.
+
+    Off unless `DWH_SQL_PROFILE=1`. Profiles are kept in memory while scripts
+    run (possibly on several cursors) and written to `meta.model_run_stats`
+    once the directory is done, together with a report of the
+    `DWH_SQL_PROFILE_TOP` slowest operators.
+    """
+
+    def __init__(self, schema: str) -> None:
+        self.enabled = os.getenv("DWH_SQL_PROFILE", "0").strip().lower() in {"1", "true", "yes", "on"}
+        self.top = max(1, int(os.getenv("DWH_SQL_PROFILE_TOP", "10") or 10))
+        self.schema = schema
+        self.started_at = datetime.now()
+        self.run_id = f"{self.started_at:%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:6]}"
+        self.rows: list[dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def execute(self, conn: duckdb.DuckDBPyConnection, path: Path, stmt: str) -> duckdb.DuckDBPyConnection:
+        if not self.enabled:
+            return conn.execute(stmt)
+        # Per connection, so each DAG cursor profiles its own statements.
+        conn.execute("SET enable_profiling = 'no_output'")
+        started = time.perf_counter()
+        result = conn.execute(stmt)
+        elapsed = time.perf_counter() - started
+        profile = json.loads(conn.get_profiling_information(format="json"))
+        # Some plans (e.g. ungrouped aggregates over stored tables) come back as
+        # {"result": "error"}; those keep only their wall time.
+        root = (profile.get("children") or [None])[0]
+        if root is None:
+            rows_out = None
+        elif root.get("operator_type") in _WRITE_OPERATORS:
+            rows_out = sum(child.get("operator_cardinality", 0) for child in root.get("children", []))
+        else:
+            rows_out = root.get("operator_cardinality", 0)
+        with self._lock:
+            self.rows.append(
+                {
+                    "run_id": self.run_id,
+                    "run_started_at": self.started_at,
+                    "layer": self.schema,
+                    "model": path.name,
+                    "statement": sum(1 for r in self.rows if r["model"] == path.name) + 1,
+                    "query": " ".join(stmt.split())[:500],
+                    "elapsed_s": elapsed,
+                    "cpu_s": profile.get("cpu_time"),
+                    "peak_memory_bytes": profile.get("system_peak_buffer_memory"),
+                    "rows_out": rows_out,
+                    "operators": json.dumps(list(_operators(root)) if root else []),
+                    "profile": json.dumps(profile),
+                }
+            )
+        return result
+
+    def save(self, conn: duckdb.DuckDBPyConnection) -> None:
+        if not self.rows:
+            return
+        try:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS meta.model_run_stats ("
+                + ", ".join(f"{name} {column_type}" for name, column_type in _PROFILE_COLUMNS)
+                + ")"
+            )
+            conn.executemany(
+                f"INSERT INTO meta.model_run_stats VALUES ({', '.join('?' for _ in _PROFILE_COLUMNS)})",
+                [[row[name] for name, _ in _PROFILE_COLUMNS] for row in self.rows],
+            )
+        except Exception as exc:  # noqa: BLE001
+            # Profiling must never fail an otherwise successful build.
+            print(f"[SQL][WARN] Could not record model run stats: {exc}")
+
+    def report(self) -> None:
+        if not self.rows:
+            return
+        operators = [
+            (op, f"{row['model']}#{row['statement']}")
+            for row in self.rows
+            for op in json.loads(row["operators"])
+        ]
+        operators.sort(key=lambda item: item[0]["timing_s"], reverse=True)
+        print(f"[SQL] {self.schema}: slowest operators (run {self.run_id}):")
+        for op, where in operators[: self.top]:
+            table = f" {op['table']}" if op["table"] else ""
+            print(f"[SQL]   {op['timing_s']:8.2f}s  {op['operator']}{table} ({op['rows']} rows)  {where}")
+        slowest = sorted(self.rows, key=lambda row: row["elapsed_s"], reverse=True)[: self.top]
+        print(f"[SQL] {self.schema}: slowest statements:")
+        for row in slowest:
+            peak_mb = (row["peak_memory_bytes"] or 0) / 2**20
+            print(
+                f"[SQL]   {row['elapsed_s']:8.2f}s  {row['model']}#{row['statement']}  "
+                f"{row['rows_out'] if row['rows_out'] is not None else '?'} rows, peak {peak_mb:.0f} MB"
+            )
+
+
+# Named DuckDB settings for a whole layer (`DWH_SQL_EXECUTION_PROFILE`) or one
+# script (a `-- dwh:execution_profile heavy` header line). DuckDB applies them to
+# the whole database instance, so a script with its own profile runs alone.
+_EXECUTION_PROFILE_RE = re.compile(r"--\s*dwh:execution_profile\s+(?P<name>[\w-]+)")
+
+
+def _execution_profiles(duckdb_path: Path) -> dict[str, dict[str, Any]]:
+    """Built-in profiles, updated from the `DWH_SQL_EXECUTION_PROFILES` JSON object."""
+    try:
+        total_mb = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") // 2**20
+    except (AttributeError, ValueError, OSError):
+        total_mb = 8 * 1024
+    profiles: dict[str, dict[str, Any]] = {
+        # DuckDB defaults: all cores, 80% of RAM, insertion order kept.
+        "default": {},
+        # Leaves room for the dashboard and other processes on the host.
+        "shared": {
+            "threads": max(1, (os.cpu_count() or 1) // 2),
+            "memory_limit": f"{max(512, total_mb // 4)}MB",
+            "preserve_insertion_order": False,
+        },
+        # Big joins/windows: no ordering guarantee, spill next to the warehouse.
+        "heavy": {
+            "preserve_insertion_order": False,
+            "temp_directory": str(duckdb_path.parent / "duckdb_tmp"),
+        },
+    }
+    overrides = os.getenv("DWH_SQL_EXECUTION_PROFILES", "").strip()
+    for name, settings in (json.loads(overrides) if overrides else {}).items():
+        profiles.setdefault(name, {}).update(settings)
+    return profiles
+
+
+def _stage_execution_profile(schema: str) -> str:
+    # DWH_SQL_EXECUTION_PROFILE=shared (every layer) or silver=default,gold=heavy
+    value = os.getenv("DWH_SQL_EXECUTION_PROFILE", "").strip()
+    chosen = "default"
+    for item in (v.strip() for v in value.split(",") if v.strip()):
+        layer, sep, name = item.partition("=")
+        if not sep:
+            chosen = layer
+        elif layer.strip().lower() == schema.lower():
+            return name.strip()
+    return chosen
+
+
+def _apply_execution_profile(
+    conn: duckdb.DuckDBPyConnection, profiles: dict[str, dict[str, Any]], name: str, label: str
+) -> dict[str, Any]:
+    """SET the profile's settings; returns the previous values for restoring them."""
+    if name not in profiles:
+        raise ValueError(f"{label}: unknown execution profile {name!r} (known: {', '.join(sorted(profiles))})")
+    settings = profiles[name]
+    previous = _set_settings(conn, settings)
+    described = ", ".join(f"{k}={v}" for k, v in settings.items()) or "DuckDB defaults"
+    print(f"[SQL] {label}: execution profile {name} ({described})")
+    return previous
+
+
+def _set_settings(conn: duckdb.DuckDBPyConnection, settings: dict[str, Any]) -> dict[str, Any]:
+    previous = {}
+    for key, value in settings.items():
+        if not re.fullmatch(r"\w+", key):
+            raise ValueError(f"Invalid DuckDB setting name: {key!r}")
+        previous[key] = conn.execute(f"SELECT current_setting('{key}')").fetchone()[0]
+        if isinstance(value, bool):
+            value_sql = str(value).lower()
+        elif isinstance(value, (int, float)):
+            value_sql = str(value)
+        else:
+            value_sql = _literal(str(value))
+        conn.execute(f"SET {key} = {value_sql}")
+    return previous
+
+
+# Scripts can be materialized incrementally with a marker after their WHERE
+# clause, like the Bronze one:
+#   WHERE ha.alumno IS NOT NULL
+#     /* dwh:incremental ha._dlt_load_id source=bronze.historia_academica unique_key=dwh_pk */
+# The expression is the dlt load id of the source rows; only rows loaded into
+# `source` since the last run are selected and merged on `unique_key` (or
+# appended when there is none). The high-water mark lives in meta.incremental_state;
+# load ids are compared as numbers, and a change to the script's SQL forces a
+# full refresh.
+_INCREMENTAL_MARKER = re.compile(r"/\*\s*dwh:incremental\s+(?P<spec>.+?)\s*\*/", re.DOTALL)
+_CREATE_AS_RE = re.compile(r"\bCREATE\s+OR\s+REPLACE\s+TABLE\s+(?P<table>[\w.]+)\s+AS\s", re.IGNORECASE)
+_SELECT_RE = re.compile(r"^\s*SELECT\b", re.IGNORECASE)
+# dlt load ids are epoch seconds ("1712345678.123456"); as text, ids with a
+# different number of digits would sort wrongly.
+_LOAD_ID_TYPE = "DECIMAL(38, 9)"
+
+
+def _literal(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _incremental_spec(stmt: str) -> tuple[str, str, list[str]] | None:
+    """(load id expression, source table, unique key columns) of a marked statement."""
+    match = _INCREMENTAL_MARKER.search(stmt)
+    if match is None:
+        return None
+    expr, *options = match.group("spec").split()
+    settings = dict(o.split("=", 1) for o in options if "=" in o)
+    if "source" not in settings:
+        raise ValueError(f"dwh:incremental marker without source=: {match.group(0)}")
+    keys = [k for k in settings.get("unique_key", "").split(",") if k]
+    return expr, settings["source"], keys
+
+
+def _full_refresh_requested(target: str, path: Path) -> bool:
+    # DWH_SQL_FULL_REFRESH=1 (every incremental model) or a list of table names / files.
+    requested = {n.strip().lower() for n in os.getenv("DWH_SQL_FULL_REFRESH", "").split(",") if n.strip()}
+    names = {"all", "1", "true", target.lower(), target.split(".")[-1].lower(), path.stem.lower()}
+    return bool(requested & names)
+
+
+def _execute_incremental(
+    conn: duckdb.DuckDBPyConnection, path: Path, stmt: str, profiler: _Profiler, cluster_by: list[str]
+) -> None:
+    spec = _incremental_spec(stmt)
+    create = _CREATE_AS_RE.search(stmt)
+    if spec is None or create is None:
+        raise ValueError(f"{path.name}: dwh:incremental needs a CREATE OR REPLACE TABLE ... AS statement")
+    expr, source, keys = spec
+    target = create.group("table")
+    # `stmt` is not clustered yet: the load id column is added to its own SELECT,
+    # where the marker's table aliases are in scope, and the result sorted after.
+    sql_hash = hashlib.sha1(_clustered(stmt, cluster_by).encode("utf-8")).hexdigest()
+    state = conn.execute(
+        "SELECT high_water_mark, sql_hash FROM meta.incremental_state WHERE model = ?", [target]
+    ).fetchone()
+    old_mark = state[0] if state else None
+    # Bounded by the mark read up front, so loads landing mid-run wait for the next one.
+    new_mark, first_mark = conn.execute(
+        f"SELECT max(CAST(_dlt_load_id AS {_LOAD_ID_TYPE})), min(CAST(_dlt_load_id AS {_LOAD_ID_TYPE})) FROM {source}"
+    ).fetchone()
+    schema_name, _, table_name = target.rpartition(".")
+    exists = conn.execute(
+        "SELECT count(*) FROM information_schema.tables WHERE table_schema = ? AND table_name = ?",
+        [schema_name or "main", table_name],
+    ).fetchone()[0]
+
+    reason = None
+    if _full_refresh_requested(target, path):
+        reason = "requested"
+    elif not exists or old_mark is None:
+        reason = "first build"
+    elif state[1] != sql_hash:
+        # Rows already merged were built by the old SQL.
+        reason = "SQL changed"
+    elif first_mark is not None and first_mark > old_mark:
+        # Every source row is newer than the mark: the source was reloaded from scratch.
+        reason = f"{source} was reloaded"
+
+    conn.execute("BEGIN TRANSACTION")
+    try:
+        if reason is not None:
+            profiler.execute(conn, path, _clustered(_INCREMENTAL_MARKER.sub("", stmt), cluster_by))
+            detail = f"full refresh ({reason})"
+        elif new_mark is None or new_mark <= old_mark:
+            conn.execute("ROLLBACK")
+            print(f"[SQL] {target}: no new loads in {source} since {old_mark}")
+            return
+        else:
+            load_id = f"CAST({expr} AS {_LOAD_ID_TYPE})"
+            marks = [f"CAST({_literal(str(m))} AS {_LOAD_ID_TYPE})" for m in (old_mark, new_mark)]
+            predicate = f"AND {load_id} > {marks[0]} AND {load_id} <= {marks[1]}"
+            select = _INCREMENTAL_MARKER.sub(predicate, stmt[create.end() :])
+            staging = f"__incremental_{table_name}"
+            if keys:
+                # MERGE rejects several source rows per key; keep the one from the newest load.
+                if not _SELECT_RE.match(select):
+                    raise ValueError(f"{path.name}: dwh:incremental unique_key needs the query to start with SELECT")
+                select = _SELECT_RE.sub(f"SELECT {load_id} AS __dwh_load_id,", select, count=1)
+                key_list = ", ".join(keys)
+                select = (
+                    f"SELECT * EXCLUDE (__dwh_load_id) FROM ("
+                    f"SELECT DISTINCT ON ({key_list}) * FROM ({select.strip().rstrip(';')}) "
+                    f"ORDER BY {key_list}, __dwh_load_id DESC)"
+                )
+            order_by = f" ORDER BY {', '.join(cluster_by)}" if cluster_by else ""
+            select = f"SELECT * FROM ({select.strip().rstrip(';')}){order_by}"
+            profiler.execute(conn, path, f"CREATE OR REPLACE TEMP TABLE {staging} AS {select}")
+            rows = conn.execute(f"SELECT count(*) FROM {staging}").fetchone()[0]
+            if keys:
+                on = " AND ".join(f"t.{k} = s.{k}" for k in keys)
+                profiler.execute(
+                    conn,
+                    path,
+                    f"MERGE INTO {target} AS t USING {staging} AS s ON {on} "
+                    "WHEN MATCHED THEN UPDATE BY NAME WHEN NOT MATCHED THEN INSERT BY NAME",
+                )
+                detail = f"merged {rows} rows on {', '.join(keys)}"
+            else:
+                profiler.execute(conn, path, f"INSERT INTO {target} BY NAME SELECT * FROM {staging}{order_by}")
+                detail = f"appended {rows} rows"
+            conn.execute(f"DROP TABLE {staging}")
+        conn.execute("DELETE FROM meta.incremental_state WHERE model = ?", [target])
+        conn.execute(
+            "INSERT INTO meta.incremental_state (model, source, high_water_mark, sql_hash, updated_at) "
+            "VALUES (?, ?, ?, ?, current_timestamp)",
+            [target, source, new_mark, sql_hash],
+        )
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    print(f"[SQL] {target}: {detail} (loads up to {new_mark})")
+
+
+# Scripts whose rows are computed per entity (a student's time series) can
+# rebuild only the entities whose input rows changed. Every CTE reading an
+# input gets a marker after its WHERE clause:
+#   WHERE anio_academico IS NOT NULL /* dwh:affected alumno_id */
+# The expression is the entity key of that CTE's rows; the target table has the
+# same key column (`key=` when it is named differently). For every input whose
+# build fingerprint changed, a hash of each key's rows is compared with the one
+# kept in meta.affected_keys; the target's rows of the changed keys are deleted
+# and recomputed with the markers narrowed to those keys. A changed input
+# without the key column (a calendar dimension) means a full rebuild.
+_AFFECTED_MARKER = re.compile(r"/\*\s*dwh:affected\s+(?P<spec>.+?)\s*\*/", re.DOTALL)
+
+
+def _affected_key(stmt: str) -> str:
+    """The target's key column, the same for every marker of the statement."""
+    keys = set()
+    for match in _AFFECTED_MARKER.finditer(stmt):
+        expr, *options = match.group("spec").split()
+        settings = dict(o.split("=", 1) for o in options if "=" in o)
+        keys.add(settings.get("key", expr.rpartition(".")[2]))
+    if len(keys) != 1:
+        raise ValueError(f"dwh:affected markers disagree on the key column: {', '.join(sorted(keys))}")
+    return keys.pop()
+
+
+def _execute_affected(
+    conn: duckdb.DuckDBPyConnection, path: Path, stmt: str, profiler: _Profiler, inputs: dict[str, str]
+) -> None:
+    create = _CREATE_AS_RE.search(stmt)
+    if create is None:
+        raise ValueError(f"{path.name}: dwh:affected needs a CREATE OR REPLACE TABLE ... AS statement")
+    key = _affected_key(stmt)
+    target = create.group("table")
+    schema_name, _, table_name = target.rpartition(".")
+    sql_hash = hashlib.sha1(stmt.encode("utf-8")).hexdigest()
+    state = conn.execute("SELECT sql_hash, inputs FROM meta.affected_state WHERE model = ?", [target]).fetchone()
+    previous = json.loads(state[1]) if state else {}
+    key_type = conn.execute(
+        "SELECT data_type FROM information_schema.columns WHERE table_schema = ? AND table_name = ? AND column_name = ?",
+        [schema_name or "main", table_name, key],
+    ).fetchone()
+
+    reason = None
+    if _full_refresh_requested(target, path):
+        reason = "requested"
+    elif key_type is None or state is None:
+        reason = "first build"
+    elif state[0] != sql_hash:
+        reason = "SQL changed"
+    sources = sorted(inputs) if reason else sorted(t for t in inputs if inputs[t] != previous.get(t))
+
+    affected = f"__affected_{table_name}"
+    conn.execute("BEGIN TRANSACTION")
+    try:
+        if reason is not None:
+            conn.execute("DELETE FROM meta.affected_keys WHERE model = ?", [target])
+        conn.execute(f"CREATE OR REPLACE TEMP TABLE {affected}_keys (key VARCHAR)")
+        unkeyed: list[str] = []
+        for source in sources:
+            source_schema, _, source_table = source.rpartition(".")
+            columns = {
+                r[0]
+                for r in conn.execute(
+                    "SELECT column_name FROM information_schema.columns WHERE table_schema = ? AND table_name = ?",
+                    [source_schema, source_table],
+                ).fetchall()
+            }
+            if not columns:
+                # Not a table (`current_date`, a table function): nothing to diff.
+                unkeyed.append(source)
+                continue
+            # Hash of each key's rows; an input without the key is one whole-table hash.
+            current = (
+                f"SELECT {key}::VARCHAR AS key, hash(count(*), sum(hash(s))) AS fingerprint "
+                f"FROM {source} AS s WHERE {key} IS NOT NULL GROUP BY 1"
+                if key in columns
+                else f"SELECT '' AS key, hash(count(*), sum(hash(s))) AS fingerprint FROM {source} AS s"
+            )
+            conn.execute(
+                f"CREATE OR REPLACE TEMP TABLE {affected}_diff AS "
+                f"SELECT coalesce(c.key, o.key) AS key, c.fingerprint FROM ({current}) AS c "
+                "FULL JOIN (SELECT key, fingerprint FROM meta.affected_keys WHERE model = ? AND source = ?) AS o "
+                "ON c.key = o.key WHERE c.fingerprint IS DISTINCT FROM o.fingerprint",
+                [target, source],
+            )
+            conn.execute(
+                f"DELETE FROM meta.affected_keys WHERE model = ? AND source = ? AND key IN (SELECT key FROM {affected}_diff)",
+                [target, source],
+            )
+            conn.execute(
+                f"INSERT INTO meta.affected_keys SELECT ?, ?, key, fingerprint FROM {affected}_diff "
+                "WHERE fingerprint IS NOT NULL",
+                [target, source],
+            )
+            if key not in columns:
+                if conn.execute(f"SELECT count(*) FROM {affected}_diff").fetchone()[0]:
+                    unkeyed.append(source)
+            elif reason is None:
+                conn.execute(f"INSERT INTO {affected}_keys SELECT key FROM {affected}_diff")
+        if reason is None and unkeyed:
+            reason = f"changed: {', '.join(unkeyed)}"
+
+        if reason is not None:
+            profiler.execute(conn, path, _AFFECTED_MARKER.sub("", stmt))
+            detail = f"full refresh ({reason})"
+        else:
+            conn.execute(
+                f"CREATE OR REPLACE TEMP TABLE {affected} AS SELECT DISTINCT key::{key_type[0]} AS {key} FROM {affected}_keys"
+            )
+            count = conn.execute(f"SELECT count(*) FROM {affected}").fetchone()[0]
+            if count:
+                select = _AFFECTED_MARKER.sub(
+                    lambda m: f"AND {m.group('spec').split()[0]} IN (SELECT {key} FROM {affected})",
+                    stmt[create.end() :],
+                )
+                profiler.execute(conn, path, f"DELETE FROM {target} WHERE {key} IN (SELECT {key} FROM {affected})")
+                profiler.execute(conn, path, f"INSERT INTO {target} BY NAME {select.strip().rstrip(';')}")
+            conn.execute(f"DROP TABLE {affected}")
+            detail = f"rebuilt {count} by {key} (changed: {', '.join(sources) or '-'})"
+        conn.execute(f"DROP TABLE IF EXISTS {affected}_diff")
+        conn.execute(f"DROP TABLE {affected}_keys")
+        conn.execute("DELETE FROM meta.affected_state WHERE model = ?", [target])
+        conn.execute(
+            "INSERT INTO meta.affected_state VALUES (?, ?, ?, current_timestamp)",
+            [target, sql_hash, json.dumps(inputs, sort_keys=True)],
+        )
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    print(f"[SQL] {target}: {detail}")
+
+
+# Scripts whose output depends on the clock are also keyed by the day they ran.
+_CLOCK_RE = re.compile(r"\b(?:CURRENT_DATE|CURRENT_TIMESTAMP|NOW\s*\(|TODAY\s*\()", re.IGNORECASE)
+
+
+class _BuildCache:
+    """Skips scripts whose SQL and input tables are unchanged since their last build.
+
+    `meta.build_cache` has one row per table a script wrote, with the hash of the
+    script and the fingerprint of every table it read. A table built by a script
+    is fingerprinted by that build's cache key, so a rebuild changes the key of
+    everything downstream (also across layers: Gold reads Silver's keys). Other
+    tables (Bronze) are fingerprinted by row count and latest `_dlt_load_id`.
+    Keys are recorded even with `DWH_SQL_CACHE=0`, so turning the cache back on
+    never trusts a build it did not see.
+    """
+
+    def __init__(self, sql_files: list[Path], schema: str) -> None:
+        self.enabled = os.getenv("DWH_SQL_CACHE", "1").strip().lower() not in {"0", "false", "no", "off"}
+        self.schema = schema
+        self.refs: dict[Path, tuple[set[str], set[str]]] = {}
+        writers: dict[str, int] = {}
+        for path in sql_files:
+            writes, qualified, unqualified = _table_refs(path.read_text(encoding="utf-8"), schema)
+            self.refs[path] = (writes, (qualified | unqualified) - writes)
+            for table in writes:
+                writers[table] = writers.get(table, 0) + 1
+        # A table several scripts write is only complete after all of them; never skip those.
+        self.shared = {t for t, n in writers.items() if n > 1}
+        self.external: dict[str, str] = {}
+        self.rebuilt: list[str] = []
+        self.cached: list[str] = []
+        self._lock = threading.Lock()
+
+    def _fingerprint(self, cursor: duckdb.DuckDBPyConnection, table: str) -> str:
+        built = cursor.execute("SELECT cache_key FROM meta.build_cache WHERE table_name = ?", [table]).fetchone()
+        if built:
+            return built[0]
+        with self._lock:
+            if table in self.external:
+                return self.external[table]
+        schema_name, _, table_name = table.rpartition(".")
+        columns = {
+            r[0]
+            for r in cursor.execute(
+                "SELECT column_name FROM information_schema.columns WHERE table_schema = ? AND table_name = ?",
+                [schema_name, table_name],
+            ).fetchall()
+        }
+        if not columns:
+            # Not a table (a column after `FROM` in EXTRACT, a table function, ...).
+            fingerprint = "missing"
+        elif "_dlt_load_id" in columns:
+            fingerprint = "%s/%s" % cursor.execute(f"SELECT count(*), max(_dlt_load_id) FROM {table}").fetchone()
+        else:
+            fingerprint = str(cursor.execute(f"SELECT count(*) FROM {table}").fetchone()[0])
+        with self._lock:
+            self.external[table] = fingerprint
+        return fingerprint
+
+    def inputs(self, cursor: duckdb.DuckDBPyConnection, path: Path) -> tuple[str, dict[str, str]]:
+        sql_text = path.read_text(encoding="utf-8")
+        inputs = {t: self._fingerprint(cursor, t) for t in sorted(self.refs[path][1])}
+        if _CLOCK_RE.search(sql_text):
+            inputs["current_date"] = date.today().isoformat()
+        return hashlib.sha1(sql_text.encode("utf-8")).hexdigest(), inputs
+
+    def stale_reason(self, cursor: duckdb.DuckDBPyConnection, path: Path, sql_hash: str, inputs: dict[str, str]) -> str | None:
+        """Why `path` has to run, or None when its last build is still current."""
+        writes = self.refs[path][0]
+        if not self.enabled:
+            return "cache disabled"
+        if not writes or writes & self.shared:
+            return "not cacheable"
+        if any(_full_refresh_requested(t, path) for t in writes):
+            return "full refresh requested"
+        rows = cursor.execute(
+            "SELECT b.table_name, b.sql_hash, b.inputs, t.table_name IS NOT NULL FROM meta.build_cache b "
+            "LEFT JOIN information_schema.tables t ON b.table_name = t.table_schema || '.' || t.table_name "
+            "WHERE b.model = ?",
+            [f"{self.schema}/{path.name}"],
+        ).fetchall()
+        if {r[0] for r in rows} != writes or not all(r[3] for r in rows):
+            return "no previous build"
+        if any(r[1] != sql_hash for r in rows):
+            return "SQL changed"
+        previous = json.loads(rows[0][2])
+        changed = sorted(t for t in inputs.keys() | previous.keys() if inputs.get(t) != previous.get(t))
+        return f"changed: {', '.join(changed)}" if changed else None
+
+    def record(self, cursor: duckdb.DuckDBPyConnection, path: Path, sql_hash: str | None, inputs: dict[str, str]) -> None:
+        # Called with sql_hash=None before running, so a failed build is never reused.
+        writes = sorted(self.refs[path][0])
+        cursor.execute("BEGIN TRANSACTION")
+        cursor.execute(
+            f"DELETE FROM meta.build_cache WHERE model = ? OR table_name IN ({', '.join('?' for _ in writes) or 'NULL'})",
+            [f"{self.schema}/{path.name}", *writes],
+        )
+        if sql_hash is not None:
+            cache_key = hashlib.sha1(f"{sql_hash}|{json.dumps(inputs, sort_keys=True)}".encode("utf-8")).hexdigest()
+            cursor.executemany(
+                "INSERT INTO meta.build_cache VALUES (?, ?, ?, ?, ?, current_timestamp)",
+                [[table, f"{self.schema}/{path.name}", cache_key, sql_hash, json.dumps(inputs, sort_keys=True)] for table in writes],
+            )
+        cursor.execute("COMMIT")
+
+    def note(self, path: Path, reason: str | None) -> None:
+        with self._lock:
+            if reason is None:
+                self.cached.append(path.stem)
+            else:
+                self.rebuilt.append(f"{path.stem} ({reason})")
+
+
+def _model_execution_profile(path: Path) -> str | None:
+    match = _EXECUTION_PROFILE_RE.search(path.read_text(encoding="utf-8"))
+    return match.group("name") if match else None
+
+
+# Physical layout of the table a script creates, from lines in its header:
+#   -- dwh:cluster_by alumno_id, anio_academico
+#   -- dwh:index alumno_id
+# Rows are written sorted by the cluster columns, so the min/max of each row
+# group (zone maps) let filters and join-key filters on them skip most of the
+# table. Each `dwh:index` line adds an ART index for point lookups on its columns.
+_CLUSTER_BY_RE = re.compile(r"--\s*dwh:cluster_by\s+(?P<columns>[^\n]+)")
+_INDEX_RE = re.compile(r"--\s*dwh:index\s+(?P<columns>[^\n]+)")
+
+
+def _columns(text: str) -> list[str]:
+    return [c.strip() for c in text.split(",") if c.strip()]
+
+
+def _model_layout(sql_text: str) -> tuple[list[str], list[list[str]]]:
+    """(cluster columns, index column lists) declared by a script."""
+    match = _CLUSTER_BY_RE.search(sql_text)
+    return (
+        _columns(match.group("columns")) if match else [],
+        [_columns(m.group("columns")) for m in _INDEX_RE.finditer(sql_text)],
+    )
+
+
+def _clustered(stmt: str, columns: list[str]) -> str:
+    # Wrapping keeps markers inside the SELECT, so affected rebuilds insert their
+    # rows sorted as well. Incremental statements are wrapped by
+    # `_execute_incremental` itself, after the load id column is added to their
+    # SELECT. ORDER BY holds even with preserve_insertion_order=false.
+    create = _CREATE_AS_RE.search(stmt)
+    if create is None or not columns:
+        return stmt
+    return f"{stmt[: create.end()]}SELECT * FROM (\n{stmt[create.end() :]}\n) ORDER BY {', '.join(columns)}"
+
+
+def _create_indexes(
+    conn: duckdb.DuckDBPyConnection, path: Path, table: str, indexes: list[list[str]], profiler: _Profiler
+) -> None:
+    # CREATE OR REPLACE drops a table's indexes; incremental merges keep them.
+    table_name = table.rpartition(".")[2]
+    for columns in indexes:
+        name = f"{table_name}_{'_'.join(columns)}_idx"
+        profiler.execute(conn, path, f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({', '.join(columns)})")
+    if indexes:
+        print(f"[SQL] Indexed {table}: {'; '.join(', '.join(c) for c in indexes)}")
+
+
+def _build(
+    conn: duckdb.DuckDBPyConnection,
+    path: Path,
+    cache: _BuildCache,
+    profiler: _Profiler,
+    profiles: dict[str, dict[str, Any]],
+) -> None:
+    sql_hash, inputs = cache.inputs(conn, path)
+    reason = cache.stale_reason(conn, path, sql_hash, inputs)
+    if reason is None:
+        print(f"[SQL] Cached: {path.name}")
+    else:
+        cache.record(conn, path, None, inputs)
+        model_profile = _model_execution_profile(path)
+        previous = _apply_execution_profile(conn, profiles, model_profile, path.name) if model_profile else {}
+        try:
+            _execute_file(conn, path, profiler, inputs)
+        finally:
+            _set_settings(conn, previous)
+        cache.record(conn, path, sql_hash, inputs)
+    cache.note(path, reason)
+
+
+def _execute_file(
+    conn: duckdb.DuckDBPyConnection, path: Path, profiler: _Profiler, inputs: dict[str, str]
+) -> None:
+    sql_text = path.read_text(encoding="utf-8")
+    cluster_by, indexes = _model_layout(sql_text)
+    for stmt in _split_sql_statements(sql_text):
+        if _INCREMENTAL_MARKER.search(stmt):
+            _execute_incremental(conn, path, stmt, profiler, cluster_by)
+        elif _AFFECTED_MARKER.search(stmt):
+            _execute_affected(conn, path, _clustered(stmt, cluster_by), profiler, inputs)
+        else:
+            profiler.execute(conn, path, _clustered(stmt, cluster_by))
+        create = _CREATE_AS_RE.search(stmt)
+        if create is not None:
+            _create_indexes(conn, path, create.group("table"), indexes, profiler)
+    print(f"[SQL] Executed: {path.name}")
+
+
 def run_sql_dir(*, duckdb_path: Path, sql_dir: Path, schema: str) -> None:
+    """Run every `.sql` file in `sql_dir`, following the tables they read and write.
+
+    A script starts once the scripts writing the tables it reads have finished.
+    Up to `DWH_SQL_PARALLELISM` independent scripts (default 1) run at the same
+    time, each on its own DuckDB cursor. Ready scripts start in file order, so
+    numeric prefixes still break ties. `DWH_SQL_SCHEDULER=lexical` runs plain
+    file order on one connection, as does a dependency cycle.
+
+    Statements with a `dwh:incremental` marker only merge newly loaded source rows
+    (see `_execute_incremental`), and those with `dwh:affected` markers only
+    recompute the keys whose input rows changed (see `_execute_affected`);
+    `DWH_SQL_FULL_REFRESH` rebuilds them. Scripts
+    whose SQL and inputs did not change since their last build are skipped
+    (see `_BuildCache`). `DWH_SQL_PROFILE=1` records DuckDB's profile of every
+    statement in `meta.model_run_stats` (see `_Profiler`). DuckDB settings come
+    from the layer's execution profile (`DWH_SQL_EXECUTION_PROFILE`) or a
+    script's `-- dwh:execution_profile` line, and `-- dwh:cluster_by` /
+    `-- dwh:index` lines set the sort order and indexes of its table.
+    """
     sql_dir = sql_dir.resolve()
     if not sql_dir.exists():
         print(f"[SQL] Directory not found: {sql_dir}")
@@ -32,12 +809,122 @@ def run_sql_dir(*, duckdb_path: Path, sql_dir: Path, schema: str) -> None:
         print(f"[SQL] No .sql files in {sql_dir} (nothing to do)")
         return
 
+    parallelism = max(1, int(os.getenv("DWH_SQL_PARALLELISM", "1") or 1))
+    scheduler = os.getenv("DWH_SQL_SCHEDULER", "dag").strip().lower()
+    deps: dict[Path, set[Path]] | None = None
+    if scheduler != "lexical":
+        deps = _dependencies(sql_files, schema)
+        if _has_cycle(deps):
+            print(f"[SQL][WARN] Dependency cycle in {sql_dir.name}; running in file order")
+            deps = None
+
+    profiles = _execution_profiles(duckdb_path)
+    exclusive = {p for p in sql_files if _model_execution_profile(p)}
     with duckdb.connect(str(duckdb_path)) as conn:
+        _apply_execution_profile(conn, profiles, _stage_execution_profile(schema), sql_dir.name)
         conn.execute(f"CREATE SCHEMA IF NOT EXISTS {schema}")
         conn.execute(f"SET schema '{schema}'")
+        conn.execute("CREATE SCHEMA IF NOT EXISTS meta")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS meta.build_cache ("
+            "table_name VARCHAR, model VARCHAR, cache_key VARCHAR, sql_hash VARCHAR, inputs VARCHAR, built_at TIMESTAMP)"
+        )
+        if any(_INCREMENTAL_MARKER.search(p.read_text(encoding="utf-8")) for p in sql_files):
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS meta.incremental_state ("
+                f"model VARCHAR, source VARCHAR, high_water_mark {_LOAD_ID_TYPE}, updated_at TIMESTAMP, sql_hash VARCHAR)"
+            )
+            # State written before marks were numeric and the SQL was tracked;
+            # the missing sql_hash makes the next run a full refresh.
+            conn.execute("ALTER TABLE meta.incremental_state ADD COLUMN IF NOT EXISTS sql_hash VARCHAR")
+            mark_type = conn.execute(
+                "SELECT data_type FROM information_schema.columns "
+                "WHERE table_schema = 'meta' AND table_name = 'incremental_state' AND column_name = 'high_water_mark'"
+            ).fetchone()[0]
+            if mark_type == "VARCHAR":
+                conn.execute(f"ALTER TABLE meta.incremental_state ALTER high_water_mark TYPE {_LOAD_ID_TYPE}")
+        if any(_AFFECTED_MARKER.search(p.read_text(encoding="utf-8")) for p in sql_files):
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS meta.affected_state ("
+                "model VARCHAR, sql_hash VARCHAR, inputs VARCHAR, updated_at TIMESTAMP)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS meta.affected_keys (model VARCHAR, source VARCHAR, key VARCHAR, fingerprint UBIGINT)"
+            )
 
-        for path in sql_files:
-            sql_text = path.read_text(encoding="utf-8")
-            for stmt in _split_sql_statements(sql_text):
-                conn.execute(stmt)
-            print(f"[SQL] Executed: {path.name}")
+        cache = _BuildCache(sql_files, schema)
+        profiler = _Profiler(schema)
+        try:
+            if deps is None:
+                for path in sql_files:
+                    _build(conn, path, cache, profiler, profiles)
+            else:
+                edges = sum(len(d) for d in deps.values())
+                print(f"[SQL] {sql_dir.name}: {len(sql_files)} scripts, {edges} dependencies, parallelism {parallelism}")
+                _run_dag(
+                    conn,
+                    sql_files,
+                    deps,
+                    schema=schema,
+                    parallelism=parallelism,
+                    cache=cache,
+                    profiler=profiler,
+                    profiles=profiles,
+                    exclusive=exclusive,
+                )
+        finally:
+            print(f"[SQL] {sql_dir.name}: rebuilt {len(cache.rebuilt)}: {', '.join(cache.rebuilt) or '-'}")
+            print(f"[SQL] {sql_dir.name}: from cache {len(cache.cached)}: {', '.join(cache.cached) or '-'}")
+            profiler.save(conn)
+            profiler.report()
+
+
+def _run_dag(
+    conn: duckdb.DuckDBPyConnection,
+    sql_files: list[Path],
+    deps: dict[Path, set[Path]],
+    *,
+    schema: str,
+    parallelism: int,
+    cache: _BuildCache,
+    profiler: _Profiler,
+    profiles: dict[str, dict[str, Any]],
+    exclusive: set[Path],
+) -> None:
+    def run(path: Path, cursor: duckdb.DuckDBPyConnection) -> None:
+        try:
+            _build(cursor, path, cache, profiler, profiles)
+        finally:
+            cursor.close()
+
+    done: set[Path] = set()
+    pending = list(sql_files)
+    running: dict[Future[None], Path] = {}
+    error: BaseException | None = None
+    with ThreadPoolExecutor(max_workers=parallelism, thread_name_prefix="sql") as pool:
+        while pending or running:
+            # Start ready scripts in file order; stop starting new ones after a failure.
+            for path in [p for p in pending if deps[p] <= done] if error is None else []:
+                if len(running) >= parallelism:
+                    break
+                # Scripts with their own execution profile change instance-wide
+                # settings: they wait for the others to finish and run alone.
+                if running and (path in exclusive or exclusive & set(running.values())):
+                    break
+                cursor = conn.cursor()
+                cursor.execute(f"SET schema '{schema}'")
+                running[pool.submit(run, path, cursor)] = path
+                pending.remove(path)
+            if not running:
+                break
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                path = running.pop(future)
+                exc = future.exception()
+                if exc is not None:
+                    print(f"[SQL][E] Failed: {path.name}: {exc}")
+                    error = error or exc
+                else:
+                    done.add(path)
+    if error is not None:
+        raise error
@@ -1,13 +1,30 @@
 from __future__ import annotations
 
+from collections.abc import Iterator
+from contextlib import contextmanager, nullcontext
 import os
+import shutil
+import tempfile
+import time
 from pathlib import Path
 from datetime import datetime
 
 import dlt
 import duckdb
 
-from dwh.sources.sql_sources import guarani_multi_source
+from dwh.pipelines._bronze_copy import copy_replace_resource
+from dwh.pipelines._memory_governor import MemoryGovernor
+from dwh.pipelines._run_history import RunHistory
+from dwh.sources._engines import connection_stats, dispose_engines
+from dwh.sources.sql_sources import (
+	backfill_pending,
+	cancel_prefetches,
+	guarani_multi_source,
+	pop_read_stats,
+	read_bronze_sql,
+	sources_unchanged,
+	start_prefetch,
+)
 
 
 def default_duckdb_path() -> Path:
@@ -35,6 +52,15 @@ def _ensure_valid_duckdb_file(duckdb_path: Path) -> None:
 			conn.execute("SELECT 1")
 
 
+@contextmanager
+def _phase(phases: dict[str, float], key: str) -> Iterator[None]:
+	started = time.perf_counter()
+	try:
+		yield
+	finally:
+		phases[key] = phases.get(key, 0.0) + time.perf_counter() - started
+
+
 def run_bronze(*, source_dbs: list[dict[str, str]], duckdb_path: Path | None = None) -> None:
 	duckdb_path = duckdb_path or default_duckdb_path()
 	duckdb_path.parent.mkdir(parents=True, exist_ok=True)
@@ -81,14 +107,106 @@ def run_bronze(*, source_dbs: list[dict[str, str]], duckdb_path: Path | None = N
 		resources = list(source.resources.values())
 	print(f"[Bronze] Will run {len(resources)} resources")
 
-	for res in resources:
-		print(f"[Bronze] Running resource: {res.name}")
-		# Do NOT use pipeline.run here: it calls load() with default workers=20,
-		# which can spike memory and get OOM-killed on large loads.
-		pipeline.extract(res, workers=1, max_parallel_items=1)
-		pipeline.normalize(workers=1)
-		pipeline.load(workers=1)
-		print(f"[Bronze] Done: {res.name}")
+	# DWH_BRONZE_LOADER=copy bulk-copies full-refresh resources straight into
+	# DuckDB instead of going through dlt extract/normalize/load.
+	loader = os.getenv("DWH_BRONZE_LOADER", "dlt").strip().lower()
+
+	# DWH_BRONZE_PREFETCH=N reads up to N upcoming resources from the source DBs
+	# into a local spool while the current one is normalized and loaded. dlt steps
+	# themselves stay sequential: they share the pipeline's schema and state.
+	prefetch = max(0, int(os.getenv("DWH_BRONZE_PREFETCH", "0") or 0))
+	spool_dir = None
+	if prefetch:
+		spool_root = os.getenv("DWH_BRONZE_PREFETCH_DIR", "").strip() or None
+		spool_dir = Path(tempfile.mkdtemp(prefix="dwh_prefetch_", dir=spool_root))
+	# DWH_BRONZE_MEMORY_MB: size dlt workers and buffers per resource from the
+	# observed RSS instead of the fixed single-worker defaults above.
+	governor = MemoryGovernor.from_env()
+	dlt_names = [r.name for r in resources if not (loader == "copy" and r.write_disposition == "replace")]
+
+	# Per (resource, source DB) metrics: meta.bronze_run_history + a JSON file per run.
+	history = RunHistory.from_env(duckdb_path)
+	print(f"[Bronze] Run {history.run_id}; metrics in meta.bronze_run_history and {history.json_path}")
+
+	try:
+		for res in resources:
+			phases: dict[str, float] = {}
+			try:
+				if loader == "copy" and res.write_disposition == "replace":
+					print(f"[Bronze] Copying resource: {res.name}")
+					with _phase(phases, "load_s"):
+						counts = copy_replace_resource(
+							name=res.name,
+							sql=read_bronze_sql(f"{res.name}.sql"),
+							source_dbs=source_dbs,
+							duckdb_path=duckdb_path,
+							dlt_schema_name=pipeline.default_schema_name or source.name,
+						)
+					reads = [{"source_db": db, **stats} for db, stats in counts.items()]
+					history.record(res.name, reads, loader="copy", phases=phases)
+					print(f"[Bronze] Done: {res.name} ({sum(r['rows'] for r in reads):.0f} rows)")
+					continue
+				# DWH_BRONZE_FINGERPRINT: nothing to extract when no source DB changed.
+				if sources_unchanged(pipeline, res.name):
+					history.record(res.name, pop_read_stats(res.name), loader="dlt", phases=phases)
+					print(f"[Bronze] Skipped: {res.name} (no source DB changed since its last load)")
+					continue
+				print(f"[Bronze] Running resource: {res.name}")
+				normalize_workers, load_workers = 1, 1
+				if governor is not None:
+					settings = governor.apply(res.name)
+					normalize_workers, load_workers = settings["normalize_workers"], settings["load_workers"]
+				with governor.sample() if governor is not None else nullcontext() as sampler:
+					# Do NOT use pipeline.run here: it calls load() with default workers=20,
+					# which can spike memory and get OOM-killed on large loads.
+					with _phase(phases, "extract_s"):
+						pipeline.extract(res, workers=1, max_parallel_items=1)
+					if spool_dir is not None:
+						upcoming = dlt_names[dlt_names.index(res.name) + 1 :]
+						for name in upcoming[:prefetch]:
+							start_prefetch(pipeline, name, spool_dir)
+					with _phase(phases, "normalize_s"):
+						pipeline.normalize(workers=normalize_workers)
+					with _phase(phases, "load_s"):
+						pipeline.load(workers=load_workers)
+					# Windowed backfill (DWH_BACKFILL_RESOURCES): every pass loads the next
+					# window(s) and checkpoints them, so loop until the range is covered.
+					while backfill_pending(pipeline, res.name):
+						res = getattr(guarani_multi_source(source_dbs), res.name)
+						with _phase(phases, "extract_s"):
+							pipeline.extract(res, workers=1, max_parallel_items=1)
+						with _phase(phases, "normalize_s"):
+							pipeline.normalize(workers=normalize_workers)
+						with _phase(phases, "load_s"):
+							pipeline.load(workers=load_workers)
+				if governor is not None:
+					governor.observe(res.name, sampler.peak_mb)
+			except Exception as exc:
+				history.record(
+					res.name,
+					pop_read_stats(res.name),
+					loader="copy" if loader == "copy" and res.write_disposition == "replace" else "dlt",
+					phases=phases,
+					status="failed",
+					error=str(exc),
+				)
+				raise
+			history.record(res.name, pop_read_stats(res.name), loader="dlt", phases=phases)
+			print(f"[Bronze] Done: {res.name}")
+	finally:
+		cancel_prefetches()
+		if governor is not None:
+			governor.restore()
+		if spool_dir is not None:
+			shutil.rmtree(spool_dir, ignore_errors=True)
+		# Source engines are shared by all resources; report how much of the run went
+		# to connection setup and close the pools.
+		for name, stats in sorted(connection_stats().items()):
+			print(
+				f"[Bronze] Connections {name}: {stats['acquires']:.0f} acquired, "
+				f"avg {stats['avg_ms']:.1f} ms, max {stats['max_ms']:.1f} ms, total {stats['total_ms']:.0f} ms"
+			)
+		dispose_engines()
 
 
 def main() -> None:
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+from datetime import datetime
+import json
+import os
+from pathlib import Path
+import shutil
+from typing import Any
+
+import duckdb
+
+from dwh.pipelines._sql_runner import default_duckdb_path
+
+
+# Gold tables the training jobs read.
+ML_TABLES = ("gold_tft_training_dataset", "mart_student_risk_features")
+MANIFEST_NAME = "manifest.json"
+
+
+def default_export_dir(duckdb_path: Path | None = None) -> Path:
+	# DWH_ML_EXPORT_DIR: where versioned exports and the manifest live (default data/ml_export).
+	configured = os.getenv("DWH_ML_EXPORT_DIR", "").strip()
+	if configured:
+		return Path(configured)
+	return (duckdb_path or default_duckdb_path()).parent / "ml_export"
+
+
+def _literal(value: str) -> str:
+	return "'" + value.replace("'", "''") + "'"
+
+
+def _ident(value: str) -> str:
+	return '"' + value.replace('"', '""') + '"'
+
+
+def _env_list(name: str, default: str) -> list[str]:
+	return [v.strip() for v in os.getenv(name, default).split(",") if v.strip()]
+
+
+def _export_table(
+	con: duckdb.DuckDBPyConnection,
+	table: str,
+	target: Path,
+	*,
+	partition_by: list[str],
+	compression: str,
+	row_group_size: int,
+) -> dict[str, Any] | None:
+	columns = con.execute(
+		"SELECT column_name, data_type FROM information_schema.columns "
+		"WHERE table_schema = 'gold' AND table_name = ? ORDER BY ordinal_position",
+		[table],
+	).fetchall()
+	if not columns:
+		print(f"[Export][WARN] gold.{table} not found; skipped")
+		return None
+	names = [c[0] for c in columns]
+	partitions = [c for c in partition_by if c in names]
+	# Rows ordered by student within each partition keep row-group min/max tight
+	# for `alumno_id` filters.
+	order = ", ".join(_ident(c) for c in partitions + [n for n in ("alumno_id",) if n in names])
+	select = f"SELECT * FROM gold.{_ident(table)}" + (f" ORDER BY {order}" if order else "")
+	options = [
+		"FORMAT parquet",
+		f"COMPRESSION {compression}",
+		f"ROW_GROUP_SIZE {row_group_size}",
+	]
+	if partitions:
+		options.append(f"PARTITION_BY ({', '.join(_ident(c) for c in partitions)})")
+	con.execute(f"COPY ({select}) TO {_literal(str(target))} ({', '.join(options)})")
+
+	counts = con.execute(
+		f"SELECT {', '.join(_ident(c) for c in partitions) + ', ' if partitions else ''}count(*) "
+		f"FROM gold.{_ident(table)}" + (" GROUP BY ALL ORDER BY ALL" if partitions else "")
+	).fetchall()
+	files = sorted(target.rglob("*.parquet")) if target.is_dir() else [target]
+	return {
+		"path": target.name,
+		"partition_by": partitions,
+		"rows": sum(r[-1] for r in counts),
+		"files": len(files),
+		"bytes": sum(f.stat().st_size for f in files),
+		"columns": [{"name": n, "type": t} for n, t in columns],
+		"partitions": [
+			{"values": dict(zip(partitions, [None if v is None else str(v) for v in r[:-1]])), "rows": r[-1]}
+			for r in counts
+		]
+		if partitions
+		else [],
+	}
+
+
+def export_ml_tables(
+	*,
+	duckdb_path: Path | None = None,
+	export_dir: Path | None = None,
+	tables: list[str] | None = None,
+	partition_by: list[str] | None = None,
+) -> Path:
+	"""Export the Gold ML tables as Hive-partitioned Parquet and write a manifest.
+
+	Each run writes `<export_dir>/<version>/<table>/anio_academico=.../*.parquet`
+	and then atomically replaces `<export_dir>/manifest.json`, which lists the
+	version's tables with their files, row counts, partitions and schema. Readers
+	follow the manifest, so an export in progress is never read half-written.
+	"""
+	duckdb_path = duckdb_path or default_duckdb_path()
+	export_dir = export_dir or default_export_dir(duckdb_path)
+	tables = tables or list(ML_TABLES)
+	# DWH_ML_EXPORT_PARTITION_BY=anio_academico (default) or anio_academico,propuesta_id
+	partition_by = partition_by or _env_list("DWH_ML_EXPORT_PARTITION_BY", "anio_academico")
+	compression = os.getenv("DWH_ML_EXPORT_COMPRESSION", "zstd").strip() or "zstd"
+	# DuckDB's default row group: large enough for fast scans, small enough that
+	# year/student filters skip most of a file.
+	row_group_size = int(os.getenv("DWH_ML_EXPORT_ROW_GROUP_SIZE", "122880") or 122880)
+	keep = max(1, int(os.getenv("DWH_ML_EXPORT_KEEP", "2") or 2))
+
+	version = datetime.now().strftime("%Y%m%dT%H%M%S")
+	version_dir = export_dir / version
+	version_dir.mkdir(parents=True, exist_ok=False)
+	manifest: dict[str, Any] = {
+		"version": version,
+		"exported_at": datetime.now().isoformat(timespec="seconds"),
+		"source": str(duckdb_path),
+		"format": {"compression": compression, "row_group_size": row_group_size, "hive_partitioning": True},
+		"tables": {},
+	}
+	try:
+		with duckdb.connect(str(duckdb_path), read_only=True) as con:
+			for table in tables:
+				entry = _export_table(
+					con,
+					table,
+					version_dir / table,
+					partition_by=partition_by,
+					compression=compression,
+					row_group_size=row_group_size,
+				)
+				if entry is None:
+					continue
+				entry["path"] = f"{version}/{table}"
+				manifest["tables"][table] = entry
+				print(
+					f"[Export] {table}: {entry['rows']} rows, {len(entry['partitions'])} partitions, "
+					f"{entry['files']} files, {entry['bytes'] / 2**20:.1f} MB"
+				)
+	except Exception:
+		shutil.rmtree(version_dir, ignore_errors=True)
+		raise
+
+	tmp = export_dir / f"{MANIFEST_NAME}.tmp"
+	tmp.write_text(json.dumps(manifest, indent=1), encoding="utf-8")
+	tmp.replace(export_dir / MANIFEST_NAME)
+	print(f"[Export] {export_dir / MANIFEST_NAME} -> version {version}")
+
+	# DWH_ML_EXPORT_KEEP versions stay on disk (default 2), for jobs still reading the previous one.
+	older = sorted(p for p in export_dir.iterdir() if p.is_dir() and p.name != version)
+	for old in older[: max(0, len(older) - (keep - 1))]:
+		shutil.rmtree(old, ignore_errors=True)
+		print(f"[Export] Removed old export {old.name}")
+	return export_dir / MANIFEST_NAME
+
+
+def main() -> None:
+	export_ml_tables()
+
+
+if __name__ == "__main__":
+	main()
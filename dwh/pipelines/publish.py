@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import argparse
+from datetime import datetime
+import os
+from pathlib import Path
+
+import duckdb
+
+from dwh.pipelines._sql_runner import default_duckdb_path
+
+
+# The pipeline builds into warehouse.duckdb; readers (the dashboard) only open
+# published snapshots. `CURRENT` holds the file name of the live snapshot and is
+# replaced atomically, so a reader sees either the old or the new version.
+POINTER_NAME = "CURRENT"
+_SNAPSHOT_PREFIX = "warehouse_"
+
+
+def default_publish_dir(duckdb_path: Path | None = None) -> Path:
+	# DWH_PUBLISH_DIR: where snapshots and the pointer live (default data/published).
+	configured = os.getenv("DWH_PUBLISH_DIR", "").strip()
+	if configured:
+		return Path(configured)
+	return (duckdb_path or default_duckdb_path()).parent / "published"
+
+
+def _ident(value: str) -> str:
+	return '"' + value.replace('"', '""') + '"'
+
+
+def _literal(value: str) -> str:
+	return "'" + value.replace("'", "''") + "'"
+
+
+def published_versions(publish_dir: Path) -> list[Path]:
+	"""Snapshot files in `publish_dir`, oldest first."""
+	if not publish_dir.exists():
+		return []
+	return sorted(publish_dir.glob(f"{_SNAPSHOT_PREFIX}*.duckdb"))
+
+
+def current_version(publish_dir: Path) -> Path | None:
+	"""The snapshot `CURRENT` points at, or None before the first publish."""
+	pointer = publish_dir / POINTER_NAME
+	if not pointer.exists():
+		return None
+	snapshot = publish_dir / pointer.read_text(encoding="utf-8").strip()
+	return snapshot if snapshot.exists() else None
+
+
+def _point_to(publish_dir: Path, snapshot: Path) -> None:
+	tmp = publish_dir / f"{POINTER_NAME}.tmp"
+	tmp.write_text(snapshot.name + "\n", encoding="utf-8")
+	tmp.replace(publish_dir / POINTER_NAME)
+
+
+def _copy_schemas(build_path: Path, snapshot: Path, schemas: list[str]) -> int:
+	copied = 0
+	with duckdb.connect(str(build_path)) as con:
+		con.execute(f"ATTACH {_literal(str(snapshot))} AS snapshot")
+		try:
+			for schema in schemas:
+				con.execute(f"CREATE SCHEMA IF NOT EXISTS snapshot.{_ident(schema)}")
+				tables = con.execute(
+					"SELECT table_name FROM duckdb_tables() WHERE database_name = current_database() "
+					"AND schema_name = ? ORDER BY table_name",
+					[schema],
+				).fetchall()
+				for (table,) in tables:
+					name = f"{_ident(schema)}.{_ident(table)}"
+					con.execute(f"CREATE TABLE snapshot.{name} AS SELECT * FROM {name}")
+					copied += 1
+			# Views and indexes resolve unqualified catalogs against the default database.
+			views = con.execute(
+				"SELECT schema_name, sql FROM duckdb_views() WHERE database_name = current_database() "
+				"AND NOT internal AND list_contains(?, schema_name)",
+				[schemas],
+			).fetchall()
+			# CREATE TABLE AS keeps the (clustered) row order but not the indexes.
+			indexes = con.execute(
+				"SELECT schema_name, sql FROM duckdb_indexes() WHERE database_name = current_database() "
+				"AND sql IS NOT NULL AND list_contains(?, schema_name)",
+				[schemas],
+			).fetchall()
+			build_catalog = con.execute("SELECT current_database()").fetchone()[0]
+			con.execute("USE snapshot")
+			for _, view_sql in views + indexes:
+				con.execute(view_sql)
+			con.execute(f"USE {_ident(build_catalog)}")
+		finally:
+			con.execute("DETACH snapshot")
+	return copied
+
+
+def publish_warehouse(
+	*,
+	duckdb_path: Path | None = None,
+	publish_dir: Path | None = None,
+	schemas: list[str] | None = None,
+	keep: int | None = None,
+) -> Path:
+	"""Copy the serving schemas of the build database into a new snapshot and switch to it.
+
+	The snapshot is written under a fresh versioned name, checked, and only then
+	made current by replacing the `CURRENT` pointer. The last `DWH_PUBLISH_KEEP`
+	snapshots (default 3) stay on disk for `rollback`.
+	"""
+	duckdb_path = duckdb_path or default_duckdb_path()
+	publish_dir = publish_dir or default_publish_dir(duckdb_path)
+	# DWH_PUBLISH_SCHEMAS: schemas readers need (default silver,gold).
+	schemas = schemas or [
+		s.strip() for s in os.getenv("DWH_PUBLISH_SCHEMAS", "silver,gold").split(",") if s.strip()
+	]
+	keep = max(1, keep or int(os.getenv("DWH_PUBLISH_KEEP", "3") or 3))
+	publish_dir.mkdir(parents=True, exist_ok=True)
+
+	version = datetime.now().strftime("%Y%m%dT%H%M%S")
+	snapshot = publish_dir / f"{_SNAPSHOT_PREFIX}{version}.duckdb"
+	if snapshot.exists():
+		raise FileExistsError(f"Snapshot already exists: {snapshot}")
+	try:
+		copied = _copy_schemas(duckdb_path, snapshot, schemas)
+		with duckdb.connect(str(snapshot), read_only=True) as con:
+			found = con.execute(
+				"SELECT count(*) FROM duckdb_tables() WHERE list_contains(?, schema_name)", [schemas]
+			).fetchone()[0]
+		if found != copied:
+			raise RuntimeError(f"Snapshot has {found} tables, expected {copied}")
+	except Exception:
+		# Never leave a half-written snapshot where `rollback` could pick it up.
+		snapshot.unlink(missing_ok=True)
+		snapshot.with_name(snapshot.name + ".wal").unlink(missing_ok=True)
+		raise
+
+	_point_to(publish_dir, snapshot)
+	print(f"[Publish] {snapshot.name}: {copied} tables from {', '.join(schemas)} is now current")
+	_prune(publish_dir, keep)
+	return snapshot
+
+
+def _prune(publish_dir: Path, keep: int) -> None:
+	current = current_version(publish_dir)
+	for old in published_versions(publish_dir)[:-keep]:
+		if old == current:
+			continue
+		try:
+			old.unlink()
+			print(f"[Publish] Removed old snapshot {old.name}")
+		except OSError as exc:
+			# Still open by a reader on platforms that lock open files; retried next publish.
+			print(f"[Publish][WARN] Could not remove {old.name}: {exc}")
+
+
+def rollback(*, publish_dir: Path | None = None, version: str | None = None) -> Path:
+	"""Point `CURRENT` at an older snapshot: `version` (e.g. 20250101T020000) or the previous one."""
+	publish_dir = publish_dir or default_publish_dir()
+	versions = published_versions(publish_dir)
+	current = current_version(publish_dir)
+	if version is not None:
+		target = publish_dir / f"{_SNAPSHOT_PREFIX}{version}.duckdb"
+		if target not in versions:
+			raise FileNotFoundError(f"No published snapshot {target.name} in {publish_dir}")
+	else:
+		older = [v for v in versions if current is None or v < current]
+		if not older:
+			raise FileNotFoundError(f"No snapshot older than {current.name if current else '-'} in {publish_dir}")
+		target = older[-1]
+	_point_to(publish_dir, target)
+	print(f"[Publish] Rolled back to {target.name} (was {current.name if current else '-'})")
+	return target
+
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description="Publish or roll back warehouse snapshots.")
+	parser.add_argument("command", nargs="?", choices=["publish", "rollback", "list"], default="publish")
+	parser.add_argument("version", nargs="?", help="snapshot version for rollback (default: previous)")
+	args = parser.parse_args()
+
+	if args.command == "rollback":
+		rollback(version=args.version)
+	elif args.command == "list":
+		publish_dir = default_publish_dir()
+		current = current_version(publish_dir)
+		for snapshot in published_versions(publish_dir):
+			print(f"{'*' if snapshot == current else ' '} {snapshot.name}")
+	else:
+		publish_warehouse()
+
+
+if __name__ == "__main__":
+	main()
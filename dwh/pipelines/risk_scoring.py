@@ -0,0 +1,414 @@
+"""Batch risk scoring of `gold.mart_student_risk_features`.
+
+Scores every student-year with a serialized model and writes the dropout
+probability and risk band to `gold.student_risk_predictions`. Supported model
+artifacts (`DWH_RISK_MODEL`, default `data/models/risk_model.json`):
+
+	*.json     {"type": "logistic", "features": [...], "coefficients": [...], "intercept": b}
+	           {"type": "gbm", "features": [...], "base_score": b, "learning_rate": lr,
+	            "trees": [{"feature": [...], "threshold": [...], "left": [...],
+	                       "right": [...], "value": [...]}, ...]}
+	*.npz      NumPy arrays `features`, `coefficients`, `intercept` (logistic)
+	*.pkl      a pickled sklearn-compatible estimator (`predict_proba`, with
+	*.joblib   `feature_names_in_`), e.g. a GradientBoostingClassifier
+
+GBM trees use sklearn's flattened layout: node arrays where `left` is -1 at
+leaves, rows with `x[feature] <= threshold` go left, and the leaf values add
+up (times `learning_rate`, plus `base_score`) to the log-odds. JSON artifacts
+may also set `fill` (value per feature for NULLs, default 0) and `bands`
+(lower probability bound per band, default bajo 0 / medio 0.3 / alto 0.6).
+Feature columns are read as DOUBLE; non-numeric values count as NULL.
+
+Each row keeps the hash of its feature values and the model version, so a
+run only rescores student-years that are new, whose features changed or that
+were scored by another model, and drops predictions whose row is gone. Rows
+are streamed in `DWH_RISK_CHUNK_ROWS` Arrow record batches to a pool of
+`DWH_RISK_WORKERS` processes; throughput and peak RSS are printed at the end.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+import hashlib
+import json
+import multiprocessing
+import os
+from pathlib import Path
+import pickle
+import time
+from typing import Any, Iterator
+import warnings
+
+import duckdb
+import numpy as np
+import pyarrow as pa
+
+from dwh.pipelines._memory_governor import PeakSampler
+from dwh.pipelines._sql_runner import default_duckdb_path
+
+
+SOURCE_TABLE = "gold.mart_student_risk_features"
+TARGET_TABLE = "gold.student_risk_predictions"
+DEFAULT_BANDS = {"bajo": 0.0, "medio": 0.3, "alto": 0.6}
+
+
+def default_model_path(duckdb_path: Path | None = None) -> Path:
+	# DWH_RISK_MODEL: serialized model artifact (default data/models/risk_model.json).
+	configured = os.getenv("DWH_RISK_MODEL", "").strip()
+	if configured:
+		return Path(configured)
+	return (duckdb_path or default_duckdb_path()).parent / "models" / "risk_model.json"
+
+
+def _ident(value: str) -> str:
+	return '"' + value.replace('"', '""') + '"'
+
+
+def _sigmoid(z: np.ndarray) -> np.ndarray:
+	return 1.0 / (1.0 + np.exp(-np.clip(z, -500, 500)))
+
+
+@dataclass
+class _LogisticModel:
+	features: list[str]
+	coefficients: np.ndarray
+	intercept: float
+
+	def predict(self, x: np.ndarray) -> np.ndarray:
+		return _sigmoid(x @ self.coefficients + self.intercept)
+
+
+@dataclass
+class _TreeEnsembleModel:
+	features: list[str]
+	trees: list[dict[str, np.ndarray]]
+	base_score: float
+	learning_rate: float
+
+	def predict(self, x: np.ndarray) -> np.ndarray:
+		rows = np.arange(len(x))
+		raw = np.full(len(x), self.base_score)
+		for tree in self.trees:
+			node = np.zeros(len(x), dtype=np.int64)
+			# One level per pass; rows already at a leaf keep their node.
+			while True:
+				inner = tree["left"][node] >= 0
+				if not inner.any():
+					break
+				go_left = x[rows, np.where(inner, tree["feature"][node], 0)] <= tree["threshold"][node]
+				node = np.where(inner, np.where(go_left, tree["left"][node], tree["right"][node]), node)
+			raw += self.learning_rate * tree["value"][node]
+		return _sigmoid(raw)
+
+
+@dataclass
+class _EstimatorModel:
+	features: list[str]
+	estimator: Any
+
+	def predict(self, x: np.ndarray) -> np.ndarray:
+		# Columns are passed in `feature_names_in_` order, without the names.
+		with warnings.catch_warnings():
+			warnings.simplefilter("ignore", UserWarning)
+			return np.asarray(self.estimator.predict_proba(x))[:, 1]
+
+
+@dataclass
+class RiskModel:
+	"""A loaded model artifact: feature columns, scorer, NULL fills and bands."""
+
+	path: Path
+	version: str
+	scorer: _LogisticModel | _TreeEnsembleModel | _EstimatorModel
+	fill: np.ndarray
+	bands: dict[str, float] = field(default_factory=lambda: dict(DEFAULT_BANDS))
+
+	@property
+	def features(self) -> list[str]:
+		return self.scorer.features
+
+	def score(self, x: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+		x = np.where(np.isnan(x), self.fill, x)
+		probability = np.asarray(self.scorer.predict(x), dtype=np.float64)
+		labels = sorted(self.bands, key=self.bands.get)
+		bounds = np.array([self.bands[b] for b in labels])
+		band = np.array(labels, dtype=object)[np.clip(np.searchsorted(bounds, probability, side="right") - 1, 0, None)]
+		return probability, band
+
+
+def _tree(spec: dict[str, Any]) -> dict[str, np.ndarray]:
+	return {
+		"feature": np.asarray(spec["feature"], dtype=np.int64),
+		"threshold": np.asarray(spec["threshold"], dtype=np.float64),
+		"left": np.asarray(spec["left"], dtype=np.int64),
+		"right": np.asarray(spec["right"], dtype=np.int64),
+		"value": np.asarray(spec["value"], dtype=np.float64).reshape(-1),
+	}
+
+
+def load_model(path: Path) -> RiskModel:
+	"""Load a risk model artifact (see the module docstring for the formats)."""
+	data = path.read_bytes()
+	spec: dict[str, Any] = {}
+	suffix = path.suffix.lower()
+	if suffix == ".json":
+		spec = json.loads(data)
+		kind = spec.get("type", "logistic")
+		if kind == "logistic":
+			scorer = _LogisticModel(
+				list(spec["features"]),
+				np.asarray(spec["coefficients"], dtype=np.float64),
+				float(spec.get("intercept", 0.0)),
+			)
+		elif kind == "gbm":
+			scorer = _TreeEnsembleModel(
+				list(spec["features"]),
+				[_tree(t) for t in spec["trees"]],
+				float(spec.get("base_score", 0.0)),
+				float(spec.get("learning_rate", 1.0)),
+			)
+		else:
+			raise ValueError(f"{path}: unknown model type {kind!r} (expected 'logistic' or 'gbm')")
+	elif suffix == ".npz":
+		with np.load(path, allow_pickle=False) as arrays:
+			scorer = _LogisticModel(
+				[str(f) for f in arrays["features"]],
+				arrays["coefficients"].astype(np.float64).reshape(-1),
+				float(arrays["intercept"].reshape(-1)[0]),
+			)
+	elif suffix in {".pkl", ".pickle", ".joblib"}:
+		try:
+			import joblib
+
+			estimator = joblib.load(path)
+		except ImportError:
+			estimator = pickle.loads(data)
+		if not hasattr(estimator, "predict_proba") or not hasattr(estimator, "feature_names_in_"):
+			raise ValueError(f"{path}: estimator needs predict_proba and feature_names_in_ (fit on named columns)")
+		scorer = _EstimatorModel([str(f) for f in estimator.feature_names_in_], estimator)
+	else:
+		raise ValueError(f"{path}: unsupported model artifact (expected .json, .npz, .pkl or .joblib)")
+
+	if isinstance(scorer, _LogisticModel) and len(scorer.coefficients) != len(scorer.features):
+		raise ValueError(f"{path}: {len(scorer.features)} features but {len(scorer.coefficients)} coefficients")
+	fills = spec.get("fill", {})
+	bands = {str(k): float(v) for k, v in spec.get("bands", DEFAULT_BANDS).items()}
+	# Bands and fills change the output too, so they are part of the version.
+	digest = hashlib.sha256(data)
+	digest.update(json.dumps([bands, fills], sort_keys=True).encode())
+	return RiskModel(
+		path=path,
+		version=digest.hexdigest()[:16],
+		scorer=scorer,
+		fill=np.array([float(fills.get(f, 0.0)) for f in scorer.features]),
+		bands=bands,
+	)
+
+
+# Model of each pool worker, loaded once by `_init_worker`.
+_MODEL: RiskModel | None = None
+
+
+def _init_worker(model_path: str) -> None:
+	global _MODEL
+	_MODEL = load_model(Path(model_path))
+
+
+def _score_batch(batch: pa.RecordBatch) -> pa.RecordBatch:
+	assert _MODEL is not None
+	x = np.column_stack(
+		[batch.column(f).to_numpy(zero_copy_only=False).astype(np.float64) for f in _MODEL.features]
+	)
+	probability, band = _MODEL.score(x)
+	return pa.RecordBatch.from_arrays(
+		[
+			batch.column("alumno_id"),
+			batch.column("anio_academico"),
+			pa.array(probability, pa.float64()),
+			pa.array(band, pa.string()),
+			batch.column("features_hash"),
+		],
+		names=["alumno_id", "anio_academico", "risk_probability", "risk_band", "features_hash"],
+	)
+
+
+def _scored(batches: Iterator[pa.RecordBatch], model_path: Path, workers: int) -> Iterator[pa.RecordBatch]:
+	if workers <= 1:
+		_init_worker(str(model_path))
+		for batch in batches:
+			yield _score_batch(batch)
+		return
+	# Spawned (not forked) workers: the parent holds a multi-threaded DuckDB connection.
+	with ProcessPoolExecutor(
+		max_workers=workers,
+		mp_context=multiprocessing.get_context("spawn"),
+		initializer=_init_worker,
+		initargs=(str(model_path),),
+	) as pool:
+		# At most two chunks per worker in flight keeps memory bounded.
+		pending: deque = deque()
+		for batch in batches:
+			pending.append(pool.submit(_score_batch, batch))
+			if len(pending) >= 2 * workers:
+				yield pending.popleft().result()
+		while pending:
+			yield pending.popleft().result()
+
+
+def _ensure_target(con: duckdb.DuckDBPyConnection) -> None:
+	# Key types follow the feature table.
+	con.execute(
+		f"""
+		CREATE TABLE IF NOT EXISTS {TARGET_TABLE} AS
+		SELECT
+			alumno_id,
+			anio_academico,
+			NULL::DOUBLE AS risk_probability,
+			NULL::VARCHAR AS risk_band,
+			NULL::VARCHAR AS model_version,
+			NULL::UBIGINT AS features_hash,
+			NULL::TIMESTAMP AS scored_at
+		FROM {SOURCE_TABLE}
+		LIMIT 0
+		"""
+	)
+
+
+def score_risk(
+	*,
+	duckdb_path: Path | None = None,
+	model_path: Path | None = None,
+	workers: int | None = None,
+	chunk_rows: int | None = None,
+	full_refresh: bool | None = None,
+) -> dict[str, Any] | None:
+	"""Score changed rows of `gold.mart_student_risk_features` into `gold.student_risk_predictions`.
+
+	Returns the run's counts and throughput, or None when there is no model
+	artifact or feature table.
+	"""
+	duckdb_path = duckdb_path or default_duckdb_path()
+	model_path = model_path or default_model_path(duckdb_path)
+	if not model_path.exists():
+		print(f"[Risk][WARN] No model artifact at {model_path} (DWH_RISK_MODEL); scoring skipped")
+		return None
+	# DWH_RISK_WORKERS: scoring processes (default: CPU count; 1 scores in-process).
+	workers = workers or int(os.getenv("DWH_RISK_WORKERS", "0") or 0) or os.cpu_count() or 1
+	# DWH_RISK_CHUNK_ROWS: rows per Arrow chunk sent to a worker.
+	chunk_rows = chunk_rows or int(os.getenv("DWH_RISK_CHUNK_ROWS", "65536") or 65536)
+	if full_refresh is None:
+		# DWH_RISK_FULL_REFRESH=1 rescores every row.
+		full_refresh = os.getenv("DWH_RISK_FULL_REFRESH", "0").strip().lower() in {"1", "true", "yes", "on"}
+
+	model = load_model(model_path)
+	print(f"[Risk] Model {model_path.name} version {model.version} ({len(model.features)} features)")
+	with duckdb.connect(str(duckdb_path)) as con:
+		columns = {
+			r[0]
+			for r in con.execute(
+				"SELECT column_name FROM information_schema.columns "
+				"WHERE table_schema = 'gold' AND table_name = 'mart_student_risk_features'"
+			).fetchall()
+		}
+		if not columns:
+			print(f"[Risk][WARN] {SOURCE_TABLE} not found; scoring skipped")
+			return None
+		missing = [f for f in model.features if f not in columns]
+		if missing:
+			raise ValueError(f"{model_path}: features not in {SOURCE_TABLE}: {', '.join(missing)}")
+
+		_ensure_target(con)
+		if full_refresh:
+			con.execute(f"DELETE FROM {TARGET_TABLE}")
+		features = [_ident(f) for f in model.features]
+		changed_sql = f"""
+			WITH src AS (
+				SELECT
+					alumno_id,
+					anio_academico,
+					hash({', '.join(features)}) AS features_hash,
+					{', '.join(f'TRY_CAST({f} AS DOUBLE) AS {f}' for f in features)}
+				FROM {SOURCE_TABLE}
+			)
+			SELECT src.*
+			FROM src
+			LEFT JOIN {TARGET_TABLE} p USING (alumno_id, anio_academico)
+			WHERE p.alumno_id IS NULL
+			   OR p.features_hash IS DISTINCT FROM src.features_hash
+			   OR p.model_version IS DISTINCT FROM ?
+		"""
+		con.execute(
+			f"""
+			CREATE OR REPLACE TEMP TABLE __risk_scored AS
+			SELECT alumno_id, anio_academico, risk_probability, risk_band, features_hash
+			FROM {TARGET_TABLE}
+			LIMIT 0
+			"""
+		)
+
+		scored = 0
+		started = time.perf_counter()
+		reader = con.cursor()
+		with PeakSampler(interval_s=0.2) as peak:
+			batches = reader.execute(changed_sql, [model.version]).fetch_record_batch(chunk_rows)
+			for result in _scored(iter(batches), model_path, workers):
+				con.register("__risk_batch", result)
+				con.execute("INSERT INTO __risk_scored SELECT * FROM __risk_batch")
+				con.unregister("__risk_batch")
+				scored += result.num_rows
+		reader.close()
+		elapsed = time.perf_counter() - started
+
+		con.execute("BEGIN TRANSACTION")
+		try:
+			con.execute(
+				f"DELETE FROM {TARGET_TABLE} p WHERE EXISTS (SELECT 1 FROM __risk_scored s "
+				"WHERE s.alumno_id = p.alumno_id AND s.anio_academico = p.anio_academico)"
+			)
+			removed = con.execute(
+				f"DELETE FROM {TARGET_TABLE} p WHERE NOT EXISTS (SELECT 1 FROM {SOURCE_TABLE} f "
+				"WHERE f.alumno_id = p.alumno_id AND f.anio_academico = p.anio_academico)"
+			).fetchone()[0]
+			con.execute(
+				f"""
+				INSERT INTO {TARGET_TABLE}
+				SELECT alumno_id, anio_academico, risk_probability, risk_band, ?, features_hash, current_timestamp::TIMESTAMP
+				FROM __risk_scored
+				ORDER BY anio_academico, alumno_id
+				""",
+				[model.version],
+			)
+			con.execute("COMMIT")
+		except Exception:
+			con.execute("ROLLBACK")
+			raise
+		con.execute("DROP TABLE __risk_scored")
+		total = con.execute(f"SELECT count(*) FROM {TARGET_TABLE}").fetchone()[0]
+
+	stats = {
+		"model_version": model.version,
+		"rows_scored": scored,
+		"rows_unchanged": total - scored,
+		"rows_removed": removed,
+		"workers": workers,
+		"chunk_rows": chunk_rows,
+		"elapsed_s": elapsed,
+		"rows_per_s": scored / elapsed if elapsed > 0 else 0.0,
+		"peak_rss_mb": peak.peak_mb,
+	}
+	print(
+		f"[Risk] Scored {scored} rows ({stats['rows_unchanged']} unchanged, {removed} removed) "
+		f"in {elapsed:.2f}s: {stats['rows_per_s']:,.0f} rows/s, {workers} workers, "
+		f"peak RSS {peak.peak_mb:.0f} MB"
+	)
+	return stats
+
+
+def main() -> None:
+	score_risk()
+
+
+if __name__ == "__main__":
+	main()
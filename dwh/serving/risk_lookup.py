@@ -0,0 +1,360 @@
+"""Per-student risk lookup served from memory.
+
+Advisors ask for one student at a time; the dashboard answers by scanning Gold.
+`RiskLookup` instead loads, once per published snapshot, each student's latest
+year of `gold.mart_student_risk_features` (with its `student_risk_predictions`
+score when scoring ran) and latest `gold.gold_tft_training_dataset` row, plus a
+few columns of every year as history. The rows are kept as Arrow tables sorted
+by `alumno_id`, with string columns dictionary-encoded; sorted NumPy key arrays
+index them by `alumno_id` and `persona_id`, so a lookup is a binary search and
+a one-row slice, with no DuckDB query:
+
+	lookup = RiskLookup().start()
+	lookup.student(12345)      # {"alumno_id", "persona_id", "anio_academico", "score", "features", "tft", "history"}
+	lookup.persona(678)        # every student record of a person
+
+The store is read from the snapshot `CURRENT` points at (`dwh.pipelines.publish`),
+or from the build database before the first publish. A background thread checks
+the pointer every `DWH_LOOKUP_RELOAD_S` seconds and, after a publish or rollback,
+loads the new snapshot and swaps it in; requests keep using the old store until
+then. The snapshot is not held open between reloads.
+
+`python -m dwh.serving.risk_lookup` serves the same over HTTP (JSON):
+
+	GET /students/<alumno_id>
+	GET /personas/<persona_id>
+	GET /health
+"""
+
+from __future__ import annotations
+
+import argparse
+from dataclasses import dataclass
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import os
+from pathlib import Path
+import threading
+import time
+from typing import Any
+
+import duckdb
+import numpy as np
+import pyarrow as pa
+
+from dwh.pipelines._sql_runner import default_duckdb_path
+from dwh.pipelines.publish import current_version, default_publish_dir
+
+
+# Per-year columns returned as the student's history, where present.
+HISTORY_COLUMNS = (
+	"anio_academico",
+	"materias_cursadas",
+	"promedio_notas",
+	"tasa_aprobacion",
+	"tasa_ausentismo",
+	"promedio_asistencia",
+	"engagement_score",
+	"risk_score_heuristic",
+	"dropout_label",
+)
+SCORE_COLUMNS = ("risk_probability", "risk_band", "model_version", "scored_at")
+
+
+def default_source_path(duckdb_path: Path | None = None) -> Path:
+	"""The published snapshot `CURRENT` names, else the build database."""
+	duckdb_path = duckdb_path or default_duckdb_path()
+	return current_version(default_publish_dir(duckdb_path)) or duckdb_path
+
+
+class _KeyIndex:
+	"""Sorted keys and the table rows they point to; `rows(key)` is a binary search."""
+
+	def __init__(self, column: pa.ChunkedArray) -> None:
+		values = column.to_numpy()
+		valid = ~np.asarray(column.is_null().to_numpy(zero_copy_only=False), dtype=bool)
+		rows = np.flatnonzero(valid)
+		order = np.argsort(values[rows], kind="stable")
+		self.keys = values[rows][order]
+		self.positions = rows[order]
+
+	def rows(self, key: Any) -> np.ndarray:
+		left = np.searchsorted(self.keys, key, side="left")
+		right = np.searchsorted(self.keys, key, side="right")
+		return self.positions[left:right]
+
+	@property
+	def nbytes(self) -> int:
+		return self.keys.nbytes + self.positions.nbytes
+
+
+@dataclass(frozen=True)
+class _Store:
+	source: Path
+	source_mtime_ns: int
+	loaded_at: datetime
+	latest: pa.Table
+	tft: pa.Table | None
+	history: pa.Table
+	by_alumno: _KeyIndex
+	by_persona: _KeyIndex
+	tft_by_alumno: _KeyIndex | None
+	history_by_alumno: _KeyIndex
+
+	@property
+	def nbytes(self) -> int:
+		tables = [self.latest, self.history] + ([self.tft] if self.tft is not None else [])
+		indexes = [self.by_alumno, self.by_persona, self.history_by_alumno]
+		indexes += [self.tft_by_alumno] if self.tft_by_alumno is not None else []
+		return sum(t.nbytes for t in tables) + sum(i.nbytes for i in indexes)
+
+
+def _compact(table: pa.Table) -> pa.Table:
+	# Program, faculty and other labels repeat across students.
+	for i, f in enumerate(table.schema):
+		if pa.types.is_string(f.type) or pa.types.is_large_string(f.type):
+			table = table.set_column(i, f.name, table.column(i).dictionary_encode())
+	return table.combine_chunks()
+
+
+def _gold_columns(con: duckdb.DuckDBPyConnection, table: str) -> list[str]:
+	return [
+		r[0]
+		for r in con.execute(
+			"SELECT column_name FROM information_schema.columns "
+			"WHERE table_schema = 'gold' AND table_name = ? ORDER BY ordinal_position",
+			[table],
+		).fetchall()
+	]
+
+
+def _load(source: Path) -> _Store:
+	mtime_ns = source.stat().st_mtime_ns
+	with duckdb.connect(str(source), read_only=True) as con:
+		features = _gold_columns(con, "mart_student_risk_features")
+		if not features:
+			raise RuntimeError(f"gold.mart_student_risk_features not found in {source}")
+		scored = bool(_gold_columns(con, "student_risk_predictions"))
+		if scored:
+			score_select = ", ".join(f"p.{c}" for c in SCORE_COLUMNS)
+			score_join = "LEFT JOIN gold.student_risk_predictions p USING (alumno_id, anio_academico)"
+		else:
+			print("[Lookup][WARN] gold.student_risk_predictions not found; scores will be empty")
+			score_select = ", ".join(f"NULL AS {c}" for c in SCORE_COLUMNS)
+			score_join = ""
+
+		latest = con.execute(
+			f"""
+			SELECT f.*, {score_select}
+			FROM gold.mart_student_risk_features f
+			{score_join}
+			WHERE f.alumno_id IS NOT NULL
+			QUALIFY row_number() OVER (PARTITION BY f.alumno_id ORDER BY f.anio_academico DESC) = 1
+			ORDER BY f.alumno_id
+			"""
+		).fetch_record_batch().read_all()
+		history_columns = [c for c in HISTORY_COLUMNS if c in features]
+		history = con.execute(
+			f"""
+			SELECT f.alumno_id, {', '.join(f'f.{c}' for c in history_columns)},
+				{'p.risk_probability, p.risk_band' if scored else 'NULL::DOUBLE AS risk_probability, NULL AS risk_band'}
+			FROM gold.mart_student_risk_features f
+			{score_join}
+			WHERE f.alumno_id IS NOT NULL
+			ORDER BY f.alumno_id, f.anio_academico
+			"""
+		).fetch_record_batch().read_all()
+		tft = None
+		if _gold_columns(con, "gold_tft_training_dataset"):
+			tft = con.execute(
+				"SELECT * FROM gold.gold_tft_training_dataset "
+				"WHERE is_last_observation = 1 AND alumno_id IS NOT NULL ORDER BY alumno_id"
+			).fetch_record_batch().read_all()
+		else:
+			print("[Lookup][WARN] gold.gold_tft_training_dataset not found; TFT features will be empty")
+
+	latest, history = _compact(latest), _compact(history)
+	tft = _compact(tft) if tft is not None else None
+	return _Store(
+		source=source,
+		source_mtime_ns=mtime_ns,
+		loaded_at=datetime.now(),
+		latest=latest,
+		tft=tft,
+		history=history,
+		by_alumno=_KeyIndex(latest.column("alumno_id")),
+		by_persona=_KeyIndex(latest.column("persona_id")),
+		tft_by_alumno=_KeyIndex(tft.column("alumno_id")) if tft is not None else None,
+		history_by_alumno=_KeyIndex(history.column("alumno_id")),
+	)
+
+
+def _row(table: pa.Table, position: int) -> dict[str, Any]:
+	return table.slice(int(position), 1).to_pylist()[0]
+
+
+class RiskLookup:
+	"""In-memory per-student risk features, history and score, reloaded on publish."""
+
+	def __init__(self, *, duckdb_path: Path | None = None, source: Path | None = None) -> None:
+		self.duckdb_path = duckdb_path or default_duckdb_path()
+		# An explicit source (e.g. a snapshot file) is never reloaded.
+		self.fixed_source = source
+		self._store: _Store | None = None
+		self._lock = threading.Lock()
+		self._stop = threading.Event()
+		self._watcher: threading.Thread | None = None
+
+	def _source(self) -> Path:
+		return self.fixed_source or default_source_path(self.duckdb_path)
+
+	def reload(self, *, force: bool = False) -> bool:
+		"""Load the current source if it changed since the last load; True when swapped."""
+		with self._lock:
+			source = self._source()
+			current = self._store
+			# A publish or rollback moves the pointer; the build database is rebuilt in place.
+			if not force and current is not None and current.source == source:
+				if source.stat().st_mtime_ns == current.source_mtime_ns:
+					return False
+			started = time.perf_counter()
+			store = _load(source)
+			self._store = store
+		print(
+			f"[Lookup] Loaded {source.name}: {store.latest.num_rows} students, "
+			f"{store.history.num_rows} student-years, {store.nbytes / 2**20:.1f} MB "
+			f"in {time.perf_counter() - started:.2f}s"
+		)
+		return True
+
+	def start(self, interval_s: float | None = None) -> RiskLookup:
+		"""Load now and start the background thread that follows new publishes."""
+		self.reload(force=True)
+		if self.fixed_source is not None:
+			return self
+		# DWH_LOOKUP_RELOAD_S: seconds between checks of the publish pointer.
+		interval_s = interval_s or float(os.getenv("DWH_LOOKUP_RELOAD_S", "5") or 5)
+		self._watcher = threading.Thread(target=self._watch, args=(interval_s,), name="risk-lookup-reload", daemon=True)
+		self._watcher.start()
+		return self
+
+	def stop(self) -> None:
+		self._stop.set()
+		if self._watcher is not None:
+			self._watcher.join()
+
+	def _watch(self, interval_s: float) -> None:
+		while not self._stop.wait(interval_s):
+			try:
+				self.reload()
+			except Exception as exc:
+				# Keep serving the loaded store; the next check retries.
+				print(f"[Lookup][WARN] Reload failed, still serving {self.store.source.name}: {exc}")
+
+	@property
+	def store(self) -> _Store:
+		if self._store is None:
+			self.reload(force=True)
+		assert self._store is not None
+		return self._store
+
+	def _student(self, store: _Store, position: int) -> dict[str, Any]:
+		features = _row(store.latest, position)
+		alumno_id = features["alumno_id"]
+		score = {c: features.pop(c) for c in SCORE_COLUMNS}
+		score["risk_score_heuristic"] = features.get("risk_score_heuristic")
+		tft = None
+		if store.tft is not None and store.tft_by_alumno is not None:
+			found = store.tft_by_alumno.rows(alumno_id)
+			tft = _row(store.tft, found[0]) if len(found) else None
+		years = store.history_by_alumno.rows(alumno_id)
+		history = store.history.slice(int(years[0]), len(years)).drop_columns(["alumno_id"]).to_pylist() if len(years) else []
+		return {
+			"alumno_id": alumno_id,
+			"persona_id": features.get("persona_id"),
+			"anio_academico": features.get("anio_academico"),
+			"score": score,
+			"features": features,
+			"tft": tft,
+			"history": history,
+		}
+
+	def student(self, alumno_id: int) -> dict[str, Any] | None:
+		"""Latest features, TFT row, per-year history and score of a student, or None."""
+		store = self.store
+		found = store.by_alumno.rows(alumno_id)
+		return self._student(store, found[0]) if len(found) else None
+
+	def persona(self, persona_id: int) -> list[dict[str, Any]]:
+		"""`student()` for every student record (program) of a person."""
+		store = self.store
+		return [self._student(store, p) for p in store.by_persona.rows(persona_id)]
+
+	def health(self) -> dict[str, Any]:
+		store = self.store
+		return {
+			"source": str(store.source),
+			"loaded_at": store.loaded_at.isoformat(timespec="seconds"),
+			"students": store.latest.num_rows,
+			"student_years": store.history.num_rows,
+			"memory_mb": round(store.nbytes / 2**20, 1),
+		}
+
+
+def _handler(lookup: RiskLookup) -> type[BaseHTTPRequestHandler]:
+	class Handler(BaseHTTPRequestHandler):
+		def do_GET(self) -> None:
+			parts = [p for p in self.path.split("?")[0].split("/") if p]
+			started = time.perf_counter()
+			if parts == ["health"]:
+				body: Any = lookup.health()
+			elif len(parts) == 2 and parts[0] in {"students", "personas"}:
+				try:
+					key = int(parts[1])
+				except ValueError:
+					return self._send(400, {"error": f"invalid id {parts[1]!r}"})
+				body = lookup.student(key) if parts[0] == "students" else lookup.persona(key)
+				if not body:
+					return self._send(404, {"error": f"{parts[0][:-1]} {key} not found"})
+			else:
+				return self._send(404, {"error": "use /students/<alumno_id>, /personas/<persona_id> or /health"})
+			self._send(200, body, elapsed_ms=(time.perf_counter() - started) * 1000)
+
+		def _send(self, status: int, body: Any, elapsed_ms: float | None = None) -> None:
+			data = json.dumps(body, default=str).encode("utf-8")
+			self.send_response(status)
+			self.send_header("Content-Type", "application/json")
+			self.send_header("Content-Length", str(len(data)))
+			if elapsed_ms is not None:
+				self.send_header("Server-Timing", f"lookup;dur={elapsed_ms:.3f}")
+			self.end_headers()
+			self.wfile.write(data)
+
+		def log_message(self, format: str, *args: Any) -> None:
+			pass
+
+	return Handler
+
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description="Serve per-student risk lookups over HTTP.")
+	parser.add_argument("--host", default=os.getenv("DWH_LOOKUP_HOST", "127.0.0.1"))
+	parser.add_argument("--port", type=int, default=int(os.getenv("DWH_LOOKUP_PORT", "8765") or 8765))
+	parser.add_argument("--source", type=Path, help="serve this DuckDB file instead of following the publish pointer")
+	args = parser.parse_args()
+
+	lookup = RiskLookup(source=args.source).start()
+	server = ThreadingHTTPServer((args.host, args.port), _handler(lookup))
+	print(f"[Lookup] Serving on http://{args.host}:{args.port}")
+	try:
+		server.serve_forever()
+	except KeyboardInterrupt:
+		pass
+	finally:
+		server.server_close()
+		lookup.stop()
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+import os
+import threading
+import time
+from typing import Any
+
+import sqlalchemy as sa
+
+
+# One engine (and connection pool) per connection string for the whole process,
+# shared by every Bronze resource, source DB and fallback query.
+_ENGINES: dict[str, sa.Engine] = {}
+_ENGINES_LOCK = threading.Lock()
+
+# Connection-acquire latency per source name: [count, total_seconds, max_seconds].
+# Keyed by source name rather than connection string to keep passwords out of logs.
+_ACQUIRE_STATS: dict[str, list[float]] = {}
+
+
+def _env_flag(name: str, default: bool) -> bool:
+	v = os.getenv(name, "").strip().lower()
+	if not v:
+		return default
+	return v in ("1", "true", "yes", "on")
+
+
+def _engine_options(conn_string: str) -> dict[str, Any]:
+	# Pool sizing, liveness checks and server-side timeouts are env-configurable:
+	#   DWH_SOURCE_POOL_SIZE=2 DWH_SOURCE_POOL_MAX_OVERFLOW=2
+	#   DWH_SOURCE_POOL_PRE_PING=1 DWH_SOURCE_STATEMENT_TIMEOUT_S=0 (0 = no timeout)
+	options: dict[str, Any] = {
+		"pool_size": int(os.getenv("DWH_SOURCE_POOL_SIZE", "2")),
+		"max_overflow": int(os.getenv("DWH_SOURCE_POOL_MAX_OVERFLOW", "2")),
+		"pool_pre_ping": _env_flag("DWH_SOURCE_POOL_PRE_PING", True),
+		"pool_recycle": 1800,
+	}
+	timeout_s = int(os.getenv("DWH_SOURCE_STATEMENT_TIMEOUT_S", "0"))
+	if timeout_s > 0 and sa.engine.make_url(conn_string).get_backend_name() == "postgresql":
+		# Applies per statement; with server-side cursors each FETCH is its own statement.
+		options["connect_args"] = {"options": f"-c statement_timeout={timeout_s * 1000}"}
+	return options
+
+
+def get_engine(conn_string: str) -> sa.Engine:
+	with _ENGINES_LOCK:
+		engine = _ENGINES.get(conn_string)
+		if engine is None:
+			engine = sa.create_engine(conn_string, **_engine_options(conn_string))
+			_ENGINES[conn_string] = engine
+		return engine
+
+
+@contextmanager
+def connect(conn_string: str, source_name: str) -> Iterator[sa.Connection]:
+	"""Check out a pooled connection and record how long acquiring it took."""
+	engine = get_engine(conn_string)
+	started = time.perf_counter()
+	with engine.connect() as conn:
+		elapsed = time.perf_counter() - started
+		with _ENGINES_LOCK:
+			stats = _ACQUIRE_STATS.setdefault(source_name, [0, 0.0, 0.0])
+			stats[0] += 1
+			stats[1] += elapsed
+			stats[2] = max(stats[2], elapsed)
+		yield conn
+
+
+def connection_stats() -> dict[str, dict[str, float]]:
+	with _ENGINES_LOCK:
+		return {
+			name: {
+				"acquires": count,
+				"total_ms": total * 1000,
+				"avg_ms": (total / count * 1000) if count else 0.0,
+				"max_ms": max_s * 1000,
+			}
+			for name, (count, total, max_s) in _ACQUIRE_STATS.items()
+		}
+
+
+def dispose_engines() -> None:
+	"""Close every pooled connection and forget engines and acquire stats."""
+	with _ENGINES_LOCK:
+		engines = list(_ENGINES.values())
+		_ENGINES.clear()
+		_ACQUIRE_STATS.clear()
+	for engine in engines:
+		engine.dispose()
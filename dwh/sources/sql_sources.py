@@ -1,8 +1,15 @@
 from __future__ import annotations
 
-from collections.abc import Iterable, Iterator
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
 import os
-from datetime import date, datetime, timezone
+import pickle
+import queue
+import re
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+from decimal import Context, Decimal
 from pathlib import Path
 from typing import Any
 import hashlib
@@ -10,6 +17,35 @@ import hashlib
 import dlt
 import sqlalchemy as sa
 
+from dwh.sources._engines import connect
+
+
+# Columns that identify a `historia_academica` row, in `dwh_pk` hashing order
+# (the source name is always the first part). Changing this invalidates merge state.
+_DWH_PK_FIELDS = (
+	"persona",
+	"alumno",
+	"elemento",
+	"elemento_revision",
+	"instancia",
+	"fecha",
+	"id_acta",
+	"folio",
+	"renglon",
+	"evaluacion",
+	"comision",
+	"actividad_codigo",
+	"nota",
+	"resultado",
+)
+
+
+def _dwh_pk(record: dict[str, Any], source_name: str) -> str:
+	# Stable per-row key to enable incremental dedup when cursor resolution is low
+	# (e.g., DATE cursors with many records per day).
+	pk_parts = [source_name] + [str(record.get(field) or "") for field in _DWH_PK_FIELDS]
+	return hashlib.sha1("|".join(pk_parts).encode("utf-8")).hexdigest()
+
 
 def _stream_query(
 	*,
@@ -18,47 +54,419 @@ def _stream_query(
 	source_name: str,
 	params: dict[str, Any] | None = None,
 	add_dwh_pk: bool = False,
-) -> Iterator[dict[str, Any]]:
-	engine = sa.create_engine(conn_string)
-	with engine.connect() as conn:
+	arrow_batch_size: int | None = None,
+) -> Iterator[Any]:
+	if arrow_batch_size:
+		yield from _stream_query_arrow(
+			conn_string=conn_string,
+			sql=sql,
+			source_name=source_name,
+			params=params,
+			add_dwh_pk=add_dwh_pk,
+			batch_size=arrow_batch_size,
+		)
+		return
+
+	with connect(conn_string, source_name) as conn:
 		result = conn.execution_options(stream_results=True).execute(sa.text(sql), params or {})
 		for row in result.mappings():
 			record = dict(row)
 			record["source_db"] = source_name
 			if add_dwh_pk:
-				# Stable per-row key to enable incremental dedup when cursor resolution is low
-				# (e.g., DATE cursors with many records per day).
-				pk_parts = [
-					source_name,
-					str(record.get("persona") or ""),
-					str(record.get("alumno") or ""),
-					str(record.get("elemento") or ""),
-					str(record.get("elemento_revision") or ""),
-					str(record.get("instancia") or ""),
-					str(record.get("fecha") or ""),
-					str(record.get("id_acta") or ""),
-					str(record.get("folio") or ""),
-					str(record.get("renglon") or ""),
-					str(record.get("evaluacion") or ""),
-					str(record.get("comision") or ""),
-					str(record.get("actividad_codigo") or ""),
-					str(record.get("nota") or ""),
-					str(record.get("resultado") or ""),
-				]
-				record["dwh_pk"] = hashlib.sha1("|".join(pk_parts).encode("utf-8")).hexdigest()
+				record["dwh_pk"] = _dwh_pk(record, source_name)
 			yield record
 
 
-def _wrap_incremental(sql: str, cursor_column: str) -> str:
+def _arrow_batch_size(resource_name: str) -> int | None:
+	"""Batch size for columnar extraction of `resource_name`, or None for row dicts.
+
+	Opt-in via `DWH_BRONZE_ARROW=historia_academica,academic` (or `all`); batch size
+	via `DWH_BRONZE_ARROW_BATCH_SIZE` (rows per RecordBatch, default 50000).
+	"""
+	requested = os.getenv("DWH_BRONZE_ARROW", "").strip()
+	if not requested:
+		return None
+	names = {n.strip() for n in requested.split(",") if n.strip()}
+	if not names & {"all", "1", "true", resource_name}:
+		return None
+	return max(1, _env_int("DWH_BRONZE_ARROW_BATCH_SIZE", 50_000))
+
+
+def _dwh_pk_part(values: tuple[Any, ...], arr: Any) -> Any:
+	"""`str(value or "")` for a whole column, as a non-null pyarrow string array.
+
+	Types whose Arrow text cast is byte-identical to Python's `str()` (text,
+	integers, dates) are converted with compute kernels; anything else (decimals,
+	floats, timestamps, booleans) goes through `str()` on the original values so
+	the key matches the row-wise `_dwh_pk` exactly.
+	"""
+	import pyarrow as pa
+	import pyarrow.compute as pc
+
+	t = arr.type
+	if pa.types.is_string(t) or pa.types.is_large_string(t):
+		if all(v is None or isinstance(v, str) for v in values):
+			return pc.fill_null(arr.cast(pa.string()), "")
+		# Mixed types kept as text: `str(0)` is "0" but `0 or ""` is "".
+		return pa.array([str(v or "") for v in values], type=pa.string())
+	if pa.types.is_integer(t):
+		# `0 or ""` is "" in Python, so zeros become empty parts as well.
+		return pc.fill_null(pc.if_else(pc.equal(arr, 0), "", arr.cast(pa.string())), "")
+	if pa.types.is_date32(t):
+		return pc.fill_null(arr.cast(pa.string()), "")
+	if pa.types.is_null(t):
+		return pa.array([""] * len(arr), type=pa.string())
+	return pa.array([str(v or "") for v in values], type=pa.string())
+
+
+def _dwh_pk_array(columns: dict[str, tuple[Any, tuple[Any, ...]]], num_rows: int, source_name: str) -> Any:
+	"""Vectorized `_dwh_pk` over one batch; `columns` maps name -> (arrow array, raw values)."""
+	import pyarrow as pa
+	import pyarrow.compute as pc
+
+	empty = pa.array([""] * num_rows, type=pa.string())
+	parts = [pa.array([source_name] * num_rows, type=pa.string())]
+	for field in _DWH_PK_FIELDS:
+		if field in columns:
+			arr, values = columns[field]
+			parts.append(_dwh_pk_part(values, arr))
+		else:
+			parts.append(empty)
+	return _sha1_hex(pc.binary_join_element_wise(*parts, "|"))
+
+
+# One in-memory DuckDB connection per reader thread, for `_sha1_hex`.
+_HASHER = threading.local()
+
+
+def _sha1_hex(keys: Any) -> Any:
+	"""Hex SHA-1 of every string in `keys` (UTF-8, as `hashlib`), in one DuckDB call."""
+	import duckdb
+	import pyarrow as pa
+
+	con = getattr(_HASHER, "con", None)
+	if con is None:
+		con = _HASHER.con = duckdb.connect()
+	hashed = con.from_arrow(pa.table({"k": keys})).project("sha1(k)").fetch_record_batch().read_all()
+	return hashed.column(0).combine_chunks().cast(pa.string())
+
+
+# Decimal type of every NUMERIC column in Arrow batches: dlt's default, so the
+# column type does not depend on the values of a batch.
+_ARROW_DECIMAL = (38, 9)
+
+
+def _arrow_decimal(values: tuple[Any, ...]) -> Any:
+	import pyarrow as pa
+
+	arrow_type = pa.decimal128(*_ARROW_DECIMAL)
+	try:
+		return pa.array(values, type=arrow_type)
+	except pa.ArrowInvalid:
+		# More than 9 decimal places: round like DuckDB does on insert.
+		step, context = Decimal(1).scaleb(-_ARROW_DECIMAL[1]), Context(prec=_ARROW_DECIMAL[0])
+		rounded = [None if v is None else Decimal(v).quantize(step, context=context) for v in values]
+		return pa.array(rounded, type=arrow_type)
+
+
+def _arrow_column(name: str, values: tuple[Any, ...], arrow_type: Any) -> Any:
+	"""`values` as an Arrow array of `arrow_type`, or of the inferred type if None/null."""
+	import pyarrow as pa
+
+	if arrow_type is None or pa.types.is_null(arrow_type):
+		try:
+			arr = pa.array(values)
+		except (pa.ArrowInvalid, pa.ArrowTypeError, OverflowError):
+			# Mixed Python types in one column; keep as text.
+			arrow_type = pa.string()
+		else:
+			if not pa.types.is_decimal(arr.type):
+				return arr
+			arrow_type = pa.decimal128(*_ARROW_DECIMAL)
+	if pa.types.is_decimal(arrow_type):
+		return _arrow_decimal(values)
+	try:
+		return pa.array(values, type=arrow_type)
+	except (pa.ArrowInvalid, pa.ArrowTypeError, OverflowError) as exc:
+		if pa.types.is_string(arrow_type):
+			return pa.array([None if v is None else str(v) for v in values], type=arrow_type)
+		raise ValueError(f"Column {name!r} does not fit its type {arrow_type} from the first batch: {exc}") from exc
+
+
+def _rows_to_record_batch(
+	columns: list[str],
+	rows: list[Any],
+	source_name: str,
+	*,
+	add_dwh_pk: bool = False,
+	schema: Any = None,
+) -> Any:
+	"""Build a RecordBatch from DB-API rows, plus `source_db` (and `dwh_pk`).
+
+	Column types come from `schema` (the previous batch's) so every batch of a
+	query has the same schema; columns that were all NULL so far are inferred.
+	"""
+	import pyarrow as pa
+
+	arrays = []
+	pk_columns: dict[str, tuple[Any, tuple[Any, ...]]] = {}
+	for name, values in zip(columns, zip(*rows)):
+		arrow_type = schema.field(name).type if schema is not None else None
+		arr = _arrow_column(name, values, arrow_type)
+		if add_dwh_pk and name in _DWH_PK_FIELDS:
+			pk_columns[name] = (arr, values)
+		arrays.append(arr)
+	names = [*columns, "source_db"]
+	arrays.append(pa.array([source_name] * len(rows), type=pa.string()))
+	if add_dwh_pk:
+		names.append("dwh_pk")
+		arrays.append(_dwh_pk_array(pk_columns, len(rows), source_name))
+	return pa.RecordBatch.from_arrays(arrays, names=names)
+
+
+def _stream_query_arrow(
+	*,
+	conn_string: str,
+	sql: str,
+	source_name: str,
+	params: dict[str, Any] | None = None,
+	add_dwh_pk: bool = False,
+	batch_size: int = 50_000,
+) -> Iterator[Any]:
+	"""Stream a query as pyarrow RecordBatches of up to `batch_size` rows.
+
+	Rows are fetched from a server-side cursor in `batch_size` chunks, so memory
+	per source DB stays bounded by about one batch. dlt loads arrow items without
+	row-wise normalization. Column types are inferred from the first batch and
+	kept for the rest of the query.
+	"""
+	with connect(conn_string, source_name) as conn:
+		result = conn.execution_options(stream_results=True, yield_per=batch_size).execute(
+			sa.text(sql), params or {}
+		)
+		columns = list(result.keys())
+		schema = None
+		for rows in result.partitions(batch_size):
+			batch = _rows_to_record_batch(columns, rows, source_name, add_dwh_pk=add_dwh_pk, schema=schema)
+			schema = batch.schema
+			yield batch
+
+
+def _arrow_tz(tzinfo: Any) -> str:
+	offset = tzinfo.utcoffset(None)
+	if offset is None or not offset:
+		return "UTC"
+	minutes = int(offset.total_seconds() // 60)
+	sign = "-" if minutes < 0 else "+"
+	return f"{sign}{abs(minutes) // 60:02d}:{abs(minutes) % 60:02d}"
+
+
+def _coerce_incremental_batch(batch: Any, cursor_column: str, target: Any) -> Any:
+	"""Columnar counterpart of `_coerce_incremental_value` for RecordBatches."""
+	import pyarrow as pa
+	import pyarrow.compute as pc
+
+	if target is None or cursor_column not in batch.schema.names:
+		return batch
+	idx = batch.schema.get_field_index(cursor_column)
+	col = batch.column(idx)
+	coerced = col
+	if isinstance(target, date) and not isinstance(target, datetime):
+		if pa.types.is_timestamp(col.type):
+			# Same as datetime.date(): the wall-clock date in the value's own timezone.
+			local = pc.local_timestamp(col) if col.type.tz else col
+			coerced = local.cast(pa.date32())
+	elif isinstance(target, datetime):
+		tz = _arrow_tz(target.tzinfo) if target.tzinfo is not None else None
+		if pa.types.is_date(col.type):
+			coerced = col.cast(pa.timestamp("us"))
+			if tz is not None:
+				coerced = pc.assume_timezone(coerced, tz)
+		elif pa.types.is_timestamp(col.type) and col.type.tz is None and tz is not None:
+			coerced = pc.assume_timezone(col, tz)
+	if coerced is col:
+		return batch
+	return batch.set_column(idx, pa.field(cursor_column, coerced.type), coerced)
+
+
+def _coerce_incremental_item(item: Any, cursor_column: str, target: Any) -> Any:
+	if isinstance(item, dict):
+		item[cursor_column] = _coerce_incremental_value(item.get(cursor_column), target)
+		return item
+	return _coerce_incremental_batch(item, cursor_column, target)
+
+
+def _env_int(name: str, default: int) -> int:
+	v = os.getenv(name, "").strip()
+	if not v:
+		return default
+	try:
+		return int(v)
+	except ValueError:
+		print(f"[Bronze][WARN] Ignoring invalid {name}={v!r}; using {default}")
+		return default
+
+
+# Per source DB concurrency slots, shared by every resource in the process so a
+# single Guarani server never serves more than `max_concurrency` queries at once.
+_SOURCE_SLOTS: dict[str, threading.BoundedSemaphore] = {}
+_SOURCE_SLOTS_LOCK = threading.Lock()
+
+# Rows are handed between threads in chunks to keep queue overhead low.
+_INTERLEAVE_CHUNK_ROWS = 1000
+_WORKER_DONE = object()
+
+
+class _WorkerError:
+	def __init__(self, exc: BaseException) -> None:
+		self.exc = exc
+
+
+def _source_slot(db: dict[str, Any]) -> threading.BoundedSemaphore:
+	with _SOURCE_SLOTS_LOCK:
+		slot = _SOURCE_SLOTS.get(db["name"])
+		if slot is None:
+			# Per-DB override via `max_concurrency` in SOURCE_DATABASES, else env default.
+			limit = int(db.get("max_concurrency") or _env_int("DWH_BRONZE_PER_DB_CONCURRENCY", 1))
+			slot = threading.BoundedSemaphore(max(1, limit))
+			_SOURCE_SLOTS[db["name"]] = slot
+		return slot
+
+
+def _interleave_sources(
+	source_dbs: list[dict[str, Any]],
+	read_db: Callable[[dict[str, Any]], Iterator[Any]],
+) -> Iterator[Any]:
+	"""Yield the items of `read_db(db)` for every source DB, reading DBs concurrently.
+
+	Up to `DWH_BRONZE_MAX_PARALLEL_DBS` databases are read at once (each in its own
+	thread) and their items are interleaved through a queue of at most
+	`DWH_BRONZE_READ_AHEAD` chunks (default 2; a chunk is one Arrow batch or
+	`_INTERLEAVE_CHUNK_ROWS` row dicts), so wall-clock time follows the slowest DB
+	instead of the sum of all of them. Besides the queue, each reading thread holds
+	at most the chunk it is waiting to put. With a cap of 1 (or a single DB) this is
+	exactly the old sequential loop.
+	"""
+	workers = min(_env_int("DWH_BRONZE_MAX_PARALLEL_DBS", 4), len(source_dbs))
+	if workers <= 1:
+		for db in source_dbs:
+			yield from read_db(db)
+		return
+
+	out: queue.Queue[Any] = queue.Queue(maxsize=max(1, _env_int("DWH_BRONZE_READ_AHEAD", 2)))
+	stop = threading.Event()
+
+	def _put(item: Any) -> bool:
+		# Never block forever: the consumer may stop early (error, generator closed).
+		while not stop.is_set():
+			try:
+				out.put(item, timeout=0.5)
+				return True
+			except queue.Full:
+				continue
+		return False
+
+	def _worker(db: dict[str, Any]) -> None:
+		try:
+			with _source_slot(db):
+				if stop.is_set():
+					return
+				items = read_db(db)
+				try:
+					chunk: list[Any] = []
+					for item in items:
+						chunk.append(item)
+						if len(chunk) >= _INTERLEAVE_CHUNK_ROWS or not isinstance(item, dict):
+							if not _put(chunk):
+								return
+							chunk = []
+					if chunk:
+						_put(chunk)
+				finally:
+					items.close()
+		except BaseException as exc:  # noqa: BLE001
+			_put(_WorkerError(exc))
+		finally:
+			_put(_WORKER_DONE)
+
+	pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bronze-src")
+	try:
+		for db in source_dbs:
+			pool.submit(_worker, db)
+		pending = len(source_dbs)
+		while pending:
+			item = out.get()
+			if item is _WORKER_DONE:
+				pending -= 1
+			elif isinstance(item, _WorkerError):
+				raise item.exc
+			else:
+				yield from item
+	finally:
+		stop.set()
+		pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _wrap_incremental(sql: str, cursor_column: str, *, bounded: bool = False) -> str:
 	# Wrap query to safely apply incremental WHERE regardless of existing WHERE.
 	# NOTE: assumes `cursor_column` is available in the SELECT projection.
+	upper = f" AND q.{cursor_column} <= :cursor_end" if bounded else ""
 	return (
 		"SELECT * FROM (\n"
 		+ sql.strip().rstrip(";")
-		+ f"\n) AS q WHERE q.{cursor_column} IS NOT NULL AND q.{cursor_column} > :cursor ORDER BY q.{cursor_column}"
+		+ f"\n) AS q WHERE q.{cursor_column} IS NOT NULL AND q.{cursor_column} > :cursor{upper} ORDER BY q.{cursor_column}"
 	)
 
 
+# Bronze SQL files can declare where the incremental filter goes with a marker
+# placed after their WHERE clause, e.g.
+#   WHERE sp.anio_academico IS NOT NULL /* dwh:incremental sedc.fecha_regular */
+# where the expression is the indexed base column behind the cursor column.
+_INCREMENTAL_MARKER = re.compile(r"/\*\s*dwh:incremental\s+(?P<expr>.+?)\s*\*/", re.DOTALL)
+
+
+def _incremental_sql(sql: str, cursor_column: str, *, bounded: bool = False) -> str:
+	"""Build the incremental query for a bronze SQL file.
+
+	If the file has a `dwh:incremental` marker, `AND <expr> > :cursor` is injected
+	in place of the marker so the predicate reaches the base table (and its index).
+	Otherwise the query is wrapped as a subquery (`_wrap_incremental`).
+	With `bounded=True` the range is closed with `<= :cursor_end` (backfill windows).
+	"""
+	match = _INCREMENTAL_MARKER.search(sql)
+	if match is None:
+		return _wrap_incremental(sql, cursor_column, bounded=bounded)
+	expr = match.group("expr")
+	predicate = f"AND {expr} > :cursor" + (f" AND {expr} <= :cursor_end" if bounded else "")
+	injected = sql[: match.start()] + predicate + sql[match.end() :]
+	return injected.strip().rstrip(";") + f"\nORDER BY {cursor_column}"
+
+
+def _dump_explain(
+	*,
+	conn_string: str,
+	sql: str,
+	source_name: str,
+	resource_name: str,
+	params: dict[str, Any] | None = None,
+) -> None:
+	# Writes the generated query and its plan per (resource, source DB) when
+	# DWH_BRONZE_EXPLAIN_DIR is set, e.g. DWH_BRONZE_EXPLAIN_DIR=dwh/data/explain
+	out_dir = os.getenv("DWH_BRONZE_EXPLAIN_DIR", "").strip()
+	if not out_dir:
+		return
+	try:
+		with connect(conn_string, source_name) as conn:
+			plan = conn.execute(sa.text(f"EXPLAIN {sql}"), params or {}).scalars().all()
+	except Exception as exc:  # noqa: BLE001
+		print(f"[Bronze][WARN] EXPLAIN failed for {resource_name} on {source_name}: {exc}")
+		return
+	path = Path(out_dir) / f"{resource_name}__{source_name}.txt"
+	path.parent.mkdir(parents=True, exist_ok=True)
+	path.write_text(f"{sql}\n\n-- params: {params or {}}\n\n" + "\n".join(map(str, plan)) + "\n", encoding="utf-8")
+	print(f"[Bronze] EXPLAIN written: {path}")
+
+
 def _coerce_incremental_value(value: Any, target: Any) -> Any:
 	"""Coerce cursor field values to the same *kind* as the incremental state.
 
@@ -119,6 +527,556 @@ def _incremental_start(default: Any) -> Any:
 	return default
 
 
+def _backfill_resources() -> set[str]:
+	# Resources loaded in windowed backfill mode, e.g.
+	# DWH_BACKFILL_RESOURCES=historia_academica,academic,course_inscriptions
+	v = os.getenv("DWH_BACKFILL_RESOURCES", "").strip()
+	return {n.strip() for n in v.split(",") if n.strip()}
+
+
+def _backfill_until(start_value: Any) -> Any:
+	# End of the backfill range: DWH_BACKFILL_UNTIL if set, else "now".
+	# Integer cursors have no natural "now" and need DWH_BACKFILL_UNTIL.
+	v = os.getenv("DWH_BACKFILL_UNTIL", "").strip()
+	if isinstance(start_value, datetime):
+		until = datetime.fromisoformat(v) if v else datetime.now(start_value.tzinfo)
+		if until.tzinfo is not None and start_value.tzinfo is None:
+			until = until.replace(tzinfo=None)
+		return _coerce_incremental_value(until, start_value)
+	if isinstance(start_value, date):
+		return date.fromisoformat(v) if v else date.today()
+	if isinstance(start_value, int):
+		return int(v) if v else None
+	return None
+
+
+def _backfill_windows(name: str, start_value: Any) -> tuple[list[tuple[Any, Any]], Any]:
+	"""Cursor windows `(lo, hi]` to read in this run if `name` is being backfilled.
+
+	Progress is checkpointed in the dlt resource state (`backfill.done_until`), which
+	dlt commits together with the loaded package, so an interrupted backfill resumes
+	after the last finished window. Returns no windows once the backfill is complete
+	(or if the resource is not listed in `DWH_BACKFILL_RESOURCES`): the resource
+	then runs as a plain incremental load.
+	"""
+	if name not in _backfill_resources():
+		return [], None
+	progress = dlt.current.resource_state().setdefault("backfill", {})
+	if progress.get("complete"):
+		return [], None
+	until = _backfill_until(start_value)
+	if until is None:
+		print(f"[Bronze][WARN] Backfill of {name} needs DWH_BACKFILL_UNTIL for its cursor; running normally")
+		return [], None
+
+	lo = start_value
+	done_until = _coerce_incremental_value(progress.get("done_until"), start_value)
+	if done_until is not None and done_until > lo:
+		lo = done_until
+	# Window size in days for date/datetime cursors, in cursor units for integer ones.
+	size = max(1, _env_int("DWH_BACKFILL_WINDOW", 365))
+	step = size if isinstance(start_value, int) else timedelta(days=size)
+	max_windows = max(1, _env_int("DWH_BACKFILL_PARALLEL_WINDOWS", 1))
+
+	windows: list[tuple[Any, Any]] = []
+	while lo < until and len(windows) < max_windows:
+		hi = min(lo + step, until)
+		windows.append((lo, hi))
+		lo = hi
+	if not windows:
+		progress["complete"] = True
+	return windows, until
+
+
+def _backfill_checkpoint(name: str, windows: list[tuple[Any, Any]], until: Any) -> None:
+	progress = dlt.current.resource_state().setdefault("backfill", {})
+	done_until = windows[-1][1]
+	progress["done_until"] = done_until
+	progress["complete"] = done_until >= until
+	state = "complete" if progress["complete"] else f"next window after {done_until}"
+	print(f"[Bronze] Backfill {name}: read ({windows[0][0]}, {done_until}] ({state})")
+
+
+def _backfill_tasks(source_dbs: list[dict[str, Any]], windows: list[tuple[Any, Any]]) -> list[dict[str, Any]]:
+	# One read task per (window, source DB), oldest windows first. Windows of the same
+	# DB only run in parallel if its concurrency slot allows it (`max_concurrency`).
+	if not windows:
+		return source_dbs
+	return [dict(db, backfill_window=window) for window in windows for db in source_dbs]
+
+
+def _cursor_params(task: dict[str, Any], start_value: Any) -> dict[str, Any]:
+	window = task.get("backfill_window")
+	if window is None:
+		return {"cursor": start_value}
+	return {"cursor": window[0], "cursor_end": window[1]}
+
+
+def _read_incremental(
+	name: str,
+	source_dbs: list[dict[str, Any]],
+	start_value: Any,
+	read_db: Callable[[dict[str, Any]], Iterator[Any]],
+) -> Iterator[Any]:
+	"""Read every source DB, one batch of cursor windows at a time while backfilling.
+
+	A pass ends (and its windows are checkpointed) after the first batch that
+	returns rows; empty windows (e.g. years before a source has any data) are
+	skipped within the same pass instead of costing a whole extract/load each.
+	If a source DB's read failed (optional resources only log it), the pass
+	raises instead: dlt then drops its rows and state, so the windows are read
+	again by the next run rather than checkpointed with that DB's rows missing.
+	"""
+	windows, until = _backfill_windows(name, start_value)
+	if not windows:
+		yield from _interleave_sources(_source_plan(name), read_db)
+		return
+	# Windows read every source DB; fingerprints are taken again after the backfill.
+	_store_fingerprints(name, keep=False)
+	while windows:
+		items = 0
+		for item in _interleave_sources(_backfill_tasks(source_dbs, windows), read_db):
+			items += 1
+			yield item
+		failed = _failed_reads(name)
+		if failed:
+			raise RuntimeError(
+				f"Backfill of {name}: reading ({windows[0][0]}, {windows[-1][1]}] failed for "
+				f"{', '.join(sorted(failed))}; not checkpointed, the next run reads it again"
+			)
+		_backfill_checkpoint(name, windows, until)
+		if items:
+			return
+		windows, until = _backfill_windows(name, start_value)
+
+
+def _pipeline_resource_state(pipeline: Any, resource_name: str) -> dict[str, Any]:
+	# Resources extracted one by one keep their state under the pipeline's schema
+	# name rather than the source name, so look the resource up in every section.
+	for section in pipeline.state.get("sources", {}).values():
+		state = section.get("resources", {}).get(resource_name)
+		if state is not None:
+			return state
+	return {}
+
+
+def backfill_pending(pipeline: Any, resource_name: str) -> bool:
+	"""True if `resource_name` is in backfill mode and has windows left to load."""
+	if resource_name not in _backfill_resources():
+		return False
+	progress = _pipeline_resource_state(pipeline, resource_name).get("backfill")
+	return progress is not None and not progress.get("complete", False)
+
+
+# Source fingerprints (`DWH_BRONZE_FINGERPRINT`): per resource, the source DBs
+# it reads, the schema-qualified relations its SQL touches and the SQL hash;
+# and the DBs planned for this run with their fresh fingerprints.
+_FINGERPRINTED: dict[str, tuple[list[dict[str, Any]], tuple[str, ...], str, bool]] = {}
+_SOURCE_PLANS: dict[str, tuple[list[dict[str, Any]], dict[str, str]]] = {}
+_FINGERPRINT_LOCK = threading.Lock()
+
+_RELATION_RE = re.compile(r"\b(?:FROM|JOIN)\s+([A-Za-z_]\w*\.[A-Za-z_]\w*)", re.IGNORECASE)
+
+# Write counters of every table behind the given relations (views are expanded
+# through their rewrite rules down to base tables).
+_FINGERPRINT_SQL = """
+WITH RECURSIVE rels(oid) AS (
+    SELECT c.oid
+    FROM pg_class c
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE n.nspname || '.' || c.relname = ANY(:tables)
+  UNION
+    SELECT d.refobjid
+    FROM rels r
+    JOIN pg_rewrite w ON w.ev_class = r.oid
+    JOIN pg_depend d ON d.objid = w.oid
+     AND d.classid = 'pg_rewrite'::regclass
+     AND d.refclassid = 'pg_class'::regclass
+    WHERE d.refobjid <> r.oid
+)
+SELECT s.relid::regclass::text, s.n_tup_ins, s.n_tup_upd, s.n_tup_del, s.n_live_tup
+FROM pg_stat_user_tables s
+JOIN rels ON rels.oid = s.relid
+ORDER BY 1
+"""
+
+
+def _fingerprint_enabled() -> bool:
+	return os.getenv("DWH_BRONZE_FINGERPRINT", "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def _force_refresh(db: dict[str, Any]) -> bool:
+	# Per-DB `force_refresh` in SOURCE_DATABASES, or DWH_BRONZE_FORCE_REFRESH=db1,db2 (or `all`).
+	forced = {n.strip() for n in os.getenv("DWH_BRONZE_FORCE_REFRESH", "").split(",") if n.strip()}
+	return bool(db.get("force_refresh")) or bool(forced & {"all", db["name"]})
+
+
+def _register_fingerprint(name: str, source_dbs: list[dict[str, Any]], *sqls: str | None, partial: bool) -> None:
+	# `partial`: unchanged DBs can be left out of a read (incremental and hash-diff
+	# resources). Full-refresh resources are only skipped when no DB changed.
+	relations = sorted({m.lower() for sql in sqls if sql for m in _RELATION_RE.findall(sql)})
+	sql_hash = hashlib.sha1("\n".join(sql or "" for sql in sqls).encode("utf-8")).hexdigest()
+	with _FINGERPRINT_LOCK:
+		_FINGERPRINTED[name] = (source_dbs, tuple(relations), sql_hash, partial)
+
+
+def _source_fingerprint(db: dict[str, Any], relations: tuple[str, ...], sql_hash: str) -> str | None:
+	"""Hash of Postgres write statistics for `relations`, or None if it cannot tell.
+
+	Counters restart with the server or a stats reset, which changes the hash and
+	forces a read. Standbys do not count writes, so they never get a fingerprint.
+	"""
+	if not relations or sa.engine.make_url(db["conn_string"]).get_backend_name() != "postgresql":
+		return None
+	try:
+		with connect(db["conn_string"], db["name"]) as conn:
+			in_recovery, started, stats_reset = conn.execute(
+				sa.text(
+					"SELECT pg_is_in_recovery(), pg_postmaster_start_time()::text, "
+					"(SELECT stats_reset::text FROM pg_stat_database WHERE datname = current_database())"
+				)
+			).one()
+			if in_recovery:
+				return None
+			stats = conn.execute(sa.text(_FINGERPRINT_SQL), {"tables": list(relations)}).all()
+	except Exception as exc:  # noqa: BLE001
+		print(f"[Bronze][WARN] Fingerprint failed for {db['name']}: {exc}")
+		return None
+	if not stats:
+		return None
+	payload = repr((sql_hash, started, stats_reset, [tuple(r) for r in stats]))
+	return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def _source_plan(name: str, previous: dict[str, str] | None = None) -> list[dict[str, Any]]:
+	"""Source DBs `name` has to read this run; computed once, until `_store_fingerprints`.
+
+	`previous` is the resource's stored fingerprints (read from dlt resource state
+	when not given). DBs whose fingerprint matches are skipped; DBs without one
+	or with `force_refresh` are always read.
+	"""
+	with _FINGERPRINT_LOCK:
+		plan = _SOURCE_PLANS.get(name)
+		registered = _FINGERPRINTED.get(name)
+	if plan is not None:
+		return plan[0]
+	if registered is None:
+		return []
+	source_dbs, relations, sql_hash, partial = registered
+	if not _fingerprint_enabled():
+		with _FINGERPRINT_LOCK:
+			_SOURCE_PLANS[name] = (source_dbs, {})
+		return source_dbs
+	if previous is None:
+		previous = dlt.current.resource_state().get("fingerprints", {})
+
+	fingerprints: dict[str, str] = {}
+	changed: list[dict[str, Any]] = []
+	unchanged: list[str] = []
+	for db in source_dbs:
+		fingerprint = _source_fingerprint(db, relations, sql_hash)
+		if fingerprint is not None:
+			fingerprints[db["name"]] = fingerprint
+		if _force_refresh(db):
+			print(f"[Bronze] {name}: reading {db['name']} (forced refresh)")
+			changed.append(db)
+		elif fingerprint is None or previous.get(db["name"]) != fingerprint:
+			changed.append(db)
+		else:
+			unchanged.append(db["name"])
+
+	if unchanged and changed and not partial:
+		print(f"[Bronze] {name}: {len(changed)} of {len(source_dbs)} source DBs changed; full refresh reads all")
+		changed = source_dbs
+	else:
+		for db_name in unchanged:
+			print(f"[Bronze] {name}: skipping {db_name} (source tables unchanged since last load)")
+			_read_stats(name, db_name)["status"] = "skipped"
+	with _FINGERPRINT_LOCK:
+		_SOURCE_PLANS[name] = (changed, fingerprints)
+	return changed
+
+
+def _store_fingerprints(name: str, *, keep: bool = True) -> None:
+	# Called once the resource's read finished, so a read that raised never records
+	# fingerprints. Optional resources swallow query errors instead: DBs whose read
+	# failed get no fingerprint, so the next run reads them again even if their
+	# source tables did not change. `keep=False` clears them (backfill passes read
+	# by window).
+	with _FINGERPRINT_LOCK:
+		plan = _SOURCE_PLANS.pop(name, None)
+	if not _fingerprint_enabled() or (keep and plan is None):
+		return
+	fingerprints: dict[str, str] = {}
+	if keep and plan is not None:
+		failed = _failed_reads(name)
+		for db_name in sorted(failed & plan[1].keys()):
+			print(f"[Bronze][WARN] {name}: not storing the fingerprint of {db_name} (read failed)")
+		fingerprints = {db_name: fp for db_name, fp in plan[1].items() if db_name not in failed}
+	dlt.current.resource_state()["fingerprints"] = fingerprints
+
+
+def sources_unchanged(pipeline: Any, resource_name: str) -> bool:
+	"""True if fingerprinting is on and no source DB of `resource_name` changed.
+
+	The plan is kept for the resource's extraction, so fingerprints are only
+	queried once per resource and run.
+	"""
+	if resource_name not in _FINGERPRINTED or not _fingerprint_enabled() or backfill_pending(pipeline, resource_name):
+		return False
+	previous = _pipeline_resource_state(pipeline, resource_name).get("fingerprints", {})
+	if _source_plan(resource_name, previous):
+		return False
+	with _FINGERPRINT_LOCK:
+		_SOURCE_PLANS.pop(resource_name, None)
+	return True
+
+
+# Read-ahead of source rows (see `start_prefetch`): how to read each resource
+# outside dlt, and the spools started for resources not extracted yet.
+_PREFETCHERS: dict[str, tuple[Callable[[Any], Iterator[Any]], str | None, Any]] = {}
+_PREFETCHED: dict[str, "_Spool"] = {}
+_PREFETCH_LOCK = threading.Lock()
+
+
+class _Spool:
+	"""Source items read ahead of dlt into a local file, replayed on extraction.
+
+	A background thread pickles item chunks to `path` as they arrive; iterating
+	the spool replays them, waiting for the writer when it catches up, so dlt can
+	start extracting before the read-ahead has finished.
+	"""
+
+	def __init__(self, name: str, start_value: Any, items: Callable[[], Iterator[Any]], path: Path) -> None:
+		self.name = name
+		self.start_value = start_value
+		self.path = path
+		self.path.touch()
+		self._cond = threading.Condition()
+		self._chunks = 0
+		self._done = False
+		self._cancelled = False
+		self._error: BaseException | None = None
+		self._thread = threading.Thread(target=self._fill, args=(items,), name=f"bronze-prefetch-{name}", daemon=True)
+		self._thread.start()
+
+	def _fill(self, items: Callable[[], Iterator[Any]]) -> None:
+		started = time.perf_counter()
+		count = 0
+		try:
+			source = items()
+			try:
+				with self.path.open("ab") as fh:
+					chunk: list[Any] = []
+					for item in source:
+						if self._cancelled:
+							return
+						chunk.append(item)
+						if len(chunk) >= _INTERLEAVE_CHUNK_ROWS or not isinstance(item, dict):
+							count += self._write(fh, chunk)
+							chunk = []
+					if chunk:
+						count += self._write(fh, chunk)
+			finally:
+				source.close()
+			print(f"[Bronze] Prefetched {self.name}: {count} items in {time.perf_counter() - started:.1f}s")
+		except BaseException as exc:  # noqa: BLE001
+			self._error = exc
+		finally:
+			with self._cond:
+				self._done = True
+				self._cond.notify_all()
+
+	def _write(self, fh: Any, chunk: list[Any]) -> int:
+		pickle.dump(chunk, fh, protocol=pickle.HIGHEST_PROTOCOL)
+		fh.flush()
+		with self._cond:
+			self._chunks += 1
+			self._cond.notify_all()
+		return len(chunk)
+
+	def __iter__(self) -> Iterator[Any]:
+		try:
+			with self.path.open("rb") as fh:
+				read = 0
+				while True:
+					with self._cond:
+						while read >= self._chunks and not self._done:
+							self._cond.wait()
+						if read >= self._chunks:
+							if self._error is not None:
+								raise self._error
+							return
+					yield from pickle.load(fh)
+					read += 1
+		finally:
+			self.cancel()
+
+	def cancel(self) -> None:
+		self._cancelled = True
+		self._thread.join()
+		self.path.unlink(missing_ok=True)
+
+
+def _register_prefetch(
+	name: str,
+	read: Callable[[Any], Iterator[Any]],
+	*,
+	cursor_column: str | None = None,
+	initial_value: Any = None,
+) -> None:
+	with _PREFETCH_LOCK:
+		_PREFETCHERS[name] = (read, cursor_column, initial_value)
+
+
+def _prefetched_or_read(name: str, start_value: Any, read: Callable[[], Iterator[Any]]) -> Iterator[Any]:
+	with _PREFETCH_LOCK:
+		spool = _PREFETCHED.pop(name, None)
+	if spool is not None:
+		if spool.start_value == start_value:
+			print(f"[Bronze] {name}: extracting prefetched source rows")
+			yield from spool
+			return
+		# The cursor moved after the read-ahead started; its rows may be incomplete.
+		print(f"[Bronze][WARN] Discarding prefetch of {name} (cursor {spool.start_value} != {start_value})")
+		spool.cancel()
+	yield from read()
+
+
+def start_prefetch(pipeline: Any, resource_name: str, spool_dir: Path) -> bool:
+	"""Start reading `resource_name` from the source DBs ahead of its dlt extract.
+
+	The incremental cursor is taken from the pipeline state as it is now, which
+	other resources' loads do not change. Backfill resources are not prefetched:
+	their windows depend on state written during extraction.
+	"""
+	with _PREFETCH_LOCK:
+		if resource_name in _PREFETCHED or resource_name not in _PREFETCHERS:
+			return False
+		read, cursor_column, initial_value = _PREFETCHERS[resource_name]
+	start_value = None
+	if cursor_column is not None:
+		if resource_name in _backfill_resources():
+			return False
+		incremental = _pipeline_resource_state(pipeline, resource_name).get("incremental", {})
+		start_value = incremental.get(cursor_column, {}).get("last_value", initial_value)
+	if _fingerprint_enabled() and resource_name in _FINGERPRINTED:
+		# Plan the source DBs now, from the same state the extract will see.
+		previous = _pipeline_resource_state(pipeline, resource_name).get("fingerprints", {})
+		if not _source_plan(resource_name, previous):
+			return False
+	spool = _Spool(resource_name, start_value, lambda: read(start_value), spool_dir / f"{resource_name}.spool")
+	with _PREFETCH_LOCK:
+		_PREFETCHED[resource_name] = spool
+	print(f"[Bronze] Prefetching {resource_name} (cursor {start_value})")
+	return True
+
+
+def cancel_prefetches() -> None:
+	"""Stop and delete read-ahead spools that were never extracted.
+
+	Also forgets source plans of resources that were never extracted.
+	"""
+	with _PREFETCH_LOCK:
+		spools = list(_PREFETCHED.values())
+		_PREFETCHED.clear()
+	with _FINGERPRINT_LOCK:
+		_SOURCE_PLANS.clear()
+	for spool in spools:
+		spool.cancel()
+
+
+# Read metrics per (resource, source DB) for the run history, accumulated over
+# backfill passes until `pop_read_stats`.
+_READ_STATS: dict[tuple[str, str], dict[str, Any]] = {}
+_READ_STATS_LOCK = threading.Lock()
+
+# Rows dicts are sized from one row in `_BYTES_SAMPLE_EVERY` (Arrow batches exactly).
+_BYTES_SAMPLE_EVERY = 100
+
+
+def _read_stats(resource_name: str, source_name: str) -> dict[str, Any]:
+	with _READ_STATS_LOCK:
+		return _READ_STATS.setdefault(
+			(resource_name, source_name),
+			{
+				"source_db": source_name,
+				"status": "ok",
+				"rows": 0,
+				"bytes": 0,
+				"first_row_s": None,
+				"read_s": 0.0,
+				"cursor_column": None,
+				"cursor_start": None,
+				"cursor_end": None,
+				"fallback": False,
+				"error": None,
+			},
+		)
+
+
+def _failed_reads(resource_name: str) -> set[str]:
+	"""Source DBs whose read of `resource_name` failed since the last `pop_read_stats`."""
+	with _READ_STATS_LOCK:
+		return {db for (name, db), stats in _READ_STATS.items() if name == resource_name and stats["status"] == "failed"}
+
+
+def _measured(
+	resource_name: str,
+	source_name: str,
+	items: Iterator[Any],
+	*,
+	cursor_column: str | None = None,
+	cursor_start: Any = None,
+) -> Iterator[Any]:
+	"""Pass `items` through, recording rows, bytes, timings and the cursor range."""
+	stats = _read_stats(resource_name, source_name)
+	started = time.perf_counter()
+	rows = 0
+	size = 0
+	first_row_s = None
+	cursor_end = None
+	try:
+		for item in items:
+			if first_row_s is None:
+				first_row_s = time.perf_counter() - started
+			if isinstance(item, dict):
+				rows += 1
+				if rows % _BYTES_SAMPLE_EVERY == 1:
+					size += _BYTES_SAMPLE_EVERY * sum(len(str(v)) for v in item.values() if v is not None)
+				cursor = item.get(cursor_column) if cursor_column else None
+			else:
+				import pyarrow.compute as pc
+
+				rows += item.num_rows
+				size += item.nbytes
+				has_cursor = cursor_column is not None and cursor_column in item.schema.names
+				cursor = pc.max(item.column(cursor_column)).as_py() if has_cursor else None
+			if cursor is not None and (cursor_end is None or cursor > cursor_end):
+				cursor_end = cursor
+			yield item
+	finally:
+		with _READ_STATS_LOCK:
+			stats["rows"] += rows
+			stats["bytes"] += size
+			stats["read_s"] += time.perf_counter() - started
+			if stats["first_row_s"] is None:
+				stats["first_row_s"] = first_row_s
+			if cursor_column is not None:
+				stats["cursor_column"] = cursor_column
+				if stats["cursor_start"] is None or (cursor_start is not None and cursor_start < stats["cursor_start"]):
+					stats["cursor_start"] = cursor_start
+				if cursor_end is not None and (stats["cursor_end"] is None or cursor_end > stats["cursor_end"]):
+					stats["cursor_end"] = cursor_end
+
+
+def pop_read_stats(resource_name: str) -> list[dict[str, Any]]:
+	"""Read metrics of `resource_name` per source DB since the last call, sorted by DB."""
+	with _READ_STATS_LOCK:
+		keys = sorted(k for k in _READ_STATS if k[0] == resource_name)
+		return [_READ_STATS.pop(k) for k in keys]
+
+
 def _stream_query_optional(
 	*,
 	conn_string: str,
@@ -126,63 +1084,296 @@ def _stream_query_optional(
 	source_name: str,
 	fallback_sql: str | None = None,
 	add_dwh_pk: bool = False,
-) -> Iterator[dict[str, Any]]:
+	arrow_batch_size: int | None = None,
+	resource_name: str | None = None,
+) -> Iterator[Any]:
 	try:
 		yield from _stream_query(
 			conn_string=conn_string,
 			sql=sql,
 			source_name=source_name,
 			add_dwh_pk=add_dwh_pk,
+			arrow_batch_size=arrow_batch_size,
 		)
 	except Exception as exc:  # noqa: BLE001
+		stats = _read_stats(resource_name, source_name) if resource_name else {}
+		stats["error"] = str(exc)
 		if fallback_sql is not None:
+			stats["fallback"] = True
 			try:
 				yield from _stream_query(
 					conn_string=conn_string,
 					sql=fallback_sql,
 					source_name=source_name,
 					add_dwh_pk=add_dwh_pk,
+					arrow_batch_size=arrow_batch_size,
 				)
 				return
 			except Exception as exc2:  # noqa: BLE001
 				print(f"[Bronze][E] Query failed for {source_name} (fallback also failed): {exc2}")
+				stats.update(status="failed", error=str(exc2))
 				return
 		print(f"[Bronze][E] Optional query skipped for {source_name}: {exc}")
+		stats["status"] = "failed"
+
+
+# Natural keys of the full-refresh dimensions, for hash-diff change detection
+# (`DWH_BRONZE_HASHDIFF`). `source_db` is always part of the key. The queries
+# must ORDER BY these columns (plus tiebreakers for duplicate keys), so that
+# duplicates get the same occurrence number, and thus the same `dwh_key`, every run.
+_HASHDIFF_KEYS: dict[str, tuple[str, ...]] = {
+	"students": ("alumno",),
+	"personas": ("persona",),
+	"elementos": ("elemento",),
+	"instancias": ("instancia",),
+	"attendance": ("alumno", "comision"),
+}
+
+# Nullable on purpose: DuckDB cannot ADD COLUMN ... NOT NULL, which is what dlt
+# would emit when a replace-loaded bronze table is first switched to hash-diff.
+_HASHDIFF_COLUMNS = {
+	"dwh_key": {"data_type": "text", "nullable": True},
+	"dwh_row_hash": {"data_type": "text", "nullable": True},
+	"dwh_deleted": {"data_type": "bool", "nullable": True},
+}
+
+
+def _hashdiff_enabled(resource_name: str) -> bool:
+	# Opt-in via `DWH_BRONZE_HASHDIFF=students,personas` (or `all`).
+	requested = os.getenv("DWH_BRONZE_HASHDIFF", "").strip()
+	names = {n.strip() for n in requested.split(",") if n.strip()}
+	return resource_name in _HASHDIFF_KEYS and bool(names & {"all", "1", "true", resource_name})
+
+
+def _row_hash(record: dict[str, Any]) -> str:
+	# Column names are part of the hash so a new column counts as a change.
+	parts = [f"{k}={chr(0) if v is None else v}" for k, v in record.items()]
+	return hashlib.sha1("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+# Rows compared against the snapshot at a time.
+_HASHDIFF_CHUNK_ROWS = 20_000
+
+
+def _prefix64(hexdigest: str) -> int:
+	# The first 16 hex digits of a SHA-1, as DuckDB computes them in `_hashdiff_snapshot`.
+	return int(hexdigest[:16], 16)
+
+
+def _hashdiff_snapshot(client: Any, table: str, resource_name: str, read_dbs: set[str]) -> tuple[Any, Any] | None:
+	"""Sorted 64-bit prefixes of `dwh_key` and `dwh_row_hash` of the live rows of `read_dbs`, or None.
+
+	DuckDB computes and sorts the prefixes, so the snapshot costs 16 bytes per row
+	here instead of the rows themselves.
+	"""
+	import numpy as np
+
+	try:
+		total, hashed = client.execute_sql(f"SELECT count(*), count(dwh_key) FROM {table}")[0]
+	except Exception as exc:  # noqa: BLE001
+		print(f"[Bronze] {resource_name}: no hashed snapshot yet, full replace ({type(exc).__name__})")
+		return None
+	if hashed < total:
+		# Last loaded by a plain replace or bulk copy: start over.
+		print(f"[Bronze] {resource_name}: snapshot has unhashed rows, full replace")
+		return None
+	sql = (
+		"SELECT CAST('0x' || left(dwh_key, 16) AS UBIGINT) AS k, CAST('0x' || left(dwh_row_hash, 16) AS UBIGINT) AS h "
+		f"FROM {table} WHERE NOT coalesce(dwh_deleted, false) AND source_db IN (SELECT unnest(?)) ORDER BY k"
+	)
+	keys, hashes = [np.empty(0, dtype=np.uint64)], [np.empty(0, dtype=np.uint64)]
+	with client.execute_query(sql, sorted(read_dbs)) as cur:
+		for chunk in cur.iter_arrow(500_000):
+			keys.append(chunk.column("k").to_numpy())
+			hashes.append(chunk.column("h").to_numpy())
+	return np.concatenate(keys), np.concatenate(hashes)
+
+
+def _hashdiff_keyed(rows: Iterator[dict[str, Any]], natural_key: tuple[str, ...]) -> Iterator[dict[str, Any]]:
+	"""Add `dwh_key` (source_db + natural key) and `dwh_row_hash` (content) to each row.
+
+	Duplicates of a natural key (e.g. several aspirant rows for one student) get
+	distinct keys by occurrence, so merge keeps every row like `replace` did. The
+	hash-diff queries order by the natural key plus tiebreakers, so duplicates
+	arrive together and in the same order on every run; only the last key per
+	source DB is tracked.
+	"""
+	last: dict[str, tuple[tuple[Any, ...], int]] = {}
+	for row in rows:
+		natural = tuple(row.get(k) for k in natural_key)
+		previous, n = last.get(row["source_db"], ((), -1))
+		n = n + 1 if natural == previous else 0
+		last[row["source_db"]] = (natural, n)
+		key = hashlib.sha1("|".join(str(v) for v in (row["source_db"], *natural, n)).encode("utf-8")).hexdigest()
+		row_hash = _row_hash(row)
+		row.update(dwh_key=key, dwh_row_hash=row_hash, dwh_deleted=False)
+		yield row
+
+
+def _hashdiff_changed(
+	client: Any, seen: str, snapshot: tuple[Any, Any], rows: list[dict[str, Any]], counts: dict[str, int]
+) -> Iterator[dict[str, Any]]:
+	import numpy as np
+
+	snapshot_keys, snapshot_hashes = snapshot
+	keys = np.array([_prefix64(r["dwh_key"]) for r in rows], dtype=np.uint64)
+	hashes = np.array([_prefix64(r["dwh_row_hash"]) for r in rows], dtype=np.uint64)
+	pos = np.minimum(np.searchsorted(snapshot_keys, keys), max(len(snapshot_keys) - 1, 0))
+	found = (snapshot_keys[pos] == keys) if len(snapshot_keys) else np.zeros(len(rows), dtype=bool)
+	unchanged = found & (snapshot_hashes[pos] == hashes) if len(snapshot_keys) else found
+	# Whatever the snapshot holds beyond the keys seen in this run was deleted.
+	client.execute_sql(f"INSERT INTO {seen} SELECT unnest(?)", [r["dwh_key"] for r in rows])
+	counts["unchanged"] += int(unchanged.sum())
+	counts["updated"] += int((found & ~unchanged).sum())
+	counts["inserted"] += int((~found).sum())
+	for row, same in zip(rows, unchanged):
+		if not same:
+			yield row
+
+
+def _hashdiff_tombstones(
+	client: Any, table: str, seen: str, read_dbs: set[str], counts: dict[str, int]
+) -> Iterator[dict[str, Any]]:
+	# Deleted rows keep their last known values and get `dwh_deleted = true`.
+	sql = (
+		f"SELECT * FROM {table} t WHERE NOT coalesce(t.dwh_deleted, false) AND t.source_db IN (SELECT unnest(?)) "
+		f"AND NOT EXISTS (SELECT 1 FROM {seen} s WHERE s.dwh_key = t.dwh_key)"
+	)
+	with client.execute_query(sql, sorted(read_dbs)) as cur:
+		columns = [d[0] for d in cur.description]
+		while values_batch := cur.fetchmany(1000):
+			for values in values_batch:
+				record = {c: v for c, v in zip(columns, values) if not c.startswith("_dlt_")}
+				record["dwh_deleted"] = True
+				counts["deleted"] += 1
+				yield record
+
+
+def _hashdiff_rows(resource_name: str, rows: Iterator[dict[str, Any]], read_dbs: set[str]) -> Iterator[Any]:
+	"""Yield only inserted, changed and deleted rows compared to the bronze snapshot.
+
+	Rows missing from a source DB in `read_dbs` are re-yielded from the snapshot as
+	soft deletes; rows of DBs that were not read (unchanged fingerprint) are kept.
+	Without a hashed snapshot (first run, or a table loaded before this mode) all
+	rows are yielded with a `replace` hint, so the merge starts from a clean table.
+	Memory is the snapshot's key/hash prefixes plus one chunk of rows; deletes are
+	an anti-join in DuckDB against the keys seen in this run.
+	"""
+	keyed = _hashdiff_keyed(rows, _HASHDIFF_KEYS[resource_name])
+	counts = {"inserted": 0, "updated": 0, "unchanged": 0, "deleted": 0}
+	with dlt.current.pipeline().sql_client() as client:
+		table = client.make_qualified_table_name(resource_name)
+		snapshot = _hashdiff_snapshot(client, table, resource_name, read_dbs)
+		# Keys seen in this run, per resource since resources may extract concurrently.
+		seen = f"__hashdiff_seen_{resource_name}"
+		if snapshot is None:
+			for i, row in enumerate(keyed):
+				counts["inserted"] += 1
+				yield dlt.mark.with_hints(row, dlt.mark.make_hints(write_disposition="replace")) if i == 0 else row
+		else:
+			client.execute_sql(f"CREATE OR REPLACE TEMP TABLE {seen} (dwh_key VARCHAR)")
+			chunk: list[dict[str, Any]] = []
+			for row in keyed:
+				chunk.append(row)
+				if len(chunk) >= _HASHDIFF_CHUNK_ROWS:
+					yield from _hashdiff_changed(client, seen, snapshot, chunk, counts)
+					chunk = []
+			if chunk:
+				yield from _hashdiff_changed(client, seen, snapshot, chunk, counts)
+			yield from _hashdiff_tombstones(client, table, seen, read_dbs, counts)
+			client.execute_sql(f"DROP TABLE {seen}")
+	print(f"[Bronze] {resource_name} hash-diff: " + ", ".join(f"{v} {k}" for k, v in counts.items()))
+
+
+def read_bronze_sql(filename: str) -> str:
+	path = Path(__file__).resolve().parents[1] / "sql" / "bronze" / filename
+	return path.read_text(encoding="utf-8")
 
 
 @dlt.source
 def guarani_multi_source(source_dbs: list[dict[str, str]]):
 	"""dlt source that extracts multiple datasets from multiple Guarani DBs.
 
-	Each resource concatenates rows from all source DBs and adds `source_db`.
+	Each resource interleaves rows from all source DBs (read concurrently, see
+	`_interleave_sources`) and adds `source_db`.
 	"""
 
-	base_dir = Path(__file__).resolve().parents[1]
-	sql_dir = base_dir / "sql" / "bronze"
-
 	def _read_sql(filename: str) -> str:
-		path = sql_dir / filename
-		return path.read_text(encoding="utf-8")
+		return read_bronze_sql(filename)
 
 	def _resource_for_query(name: str, sql: str, *, write_disposition: str = "replace"):
-		@dlt.resource(name=name, write_disposition=write_disposition)
-		def _resource() -> Iterable[dict[str, Any]]:
-			for db in source_dbs:
-				yield from _stream_query(conn_string=db["conn_string"], sql=sql, source_name=db["name"])
+		hashdiff = _hashdiff_enabled(name)
 
+		def _reader(_start_value: Any = None) -> Callable[[dict[str, Any]], Iterator[Any]]:
+			# Hash-diff compares rows one by one, so it reads row dicts.
+			arrow_batch_size = None if hashdiff else _arrow_batch_size(name)
+
+			def _read(db: dict[str, Any]) -> Iterator[Any]:
+				rows = _stream_query(
+					conn_string=db["conn_string"],
+					sql=sql,
+					source_name=db["name"],
+					arrow_batch_size=arrow_batch_size,
+				)
+				yield from _measured(name, db["name"], rows)
+
+			return _read
+
+		if hashdiff:
+			# Only changed rows are merged on `dwh_key`; unchanged tables are not rewritten.
+			@dlt.resource(name=name, write_disposition="merge", primary_key="dwh_key", columns=_HASHDIFF_COLUMNS)
+			def _resource() -> Iterable[Any]:
+				read_dbs = _source_plan(name)
+				rows = _prefetched_or_read(name, None, lambda: _interleave_sources(read_dbs, _reader()))
+				yield from _hashdiff_rows(name, rows, {db["name"] for db in read_dbs})
+				_store_fingerprints(name)
+
+		else:
+			# `dwh_deleted` exists in every mode so Silver can always filter on it.
+			@dlt.resource(
+				name=name,
+				write_disposition=write_disposition,
+				columns={"dwh_deleted": _HASHDIFF_COLUMNS["dwh_deleted"]},
+			)
+			def _resource() -> Iterable[Any]:
+				# A replace without rows would empty the table: read every DB, and let
+				# `sources_unchanged` skip the whole resource instead.
+				_source_plan(name)
+				yield from _prefetched_or_read(name, None, lambda: _interleave_sources(source_dbs, _reader()))
+				_store_fingerprints(name)
+
+		_register_fingerprint(name, source_dbs, sql, partial=hashdiff)
+		if hashdiff:
+			_register_prefetch(name, lambda start: _interleave_sources(_source_plan(name), _reader(start)))
+		else:
+			_register_prefetch(name, lambda start: _interleave_sources(source_dbs, _reader(start)))
 		return _resource
 
 	def _resource_for_query_optional(name: str, sql: str, *, fallback_sql: str | None = None):
-		@dlt.resource(name=name)
-		def _resource() -> Iterable[dict[str, Any]]:
-			for db in source_dbs:
-				yield from _stream_query_optional(
+		def _reader(_start_value: Any = None) -> Callable[[dict[str, Any]], Iterator[Any]]:
+			arrow_batch_size = _arrow_batch_size(name)
+
+			def _read(db: dict[str, Any]) -> Iterator[Any]:
+				rows = _stream_query_optional(
 					conn_string=db["conn_string"],
 					sql=sql,
 					source_name=db["name"],
 					fallback_sql=fallback_sql,
+					arrow_batch_size=arrow_batch_size,
+					resource_name=name,
 				)
+				yield from _measured(name, db["name"], rows)
 
+			return _read
+
+		@dlt.resource(name=name)
+		def _resource() -> Iterable[Any]:
+			_source_plan(name)
+			yield from _prefetched_or_read(name, None, lambda: _interleave_sources(source_dbs, _reader()))
+			_store_fingerprints(name)
+
+		_register_fingerprint(name, source_dbs, sql, fallback_sql, partial=False)
+		_register_prefetch(name, lambda start: _interleave_sources(source_dbs, _reader(start)))
 		return _resource
 
 	def _resource_for_query_incremental(
@@ -195,6 +1386,39 @@ def guarani_multi_source(source_dbs: list[dict[str, str]]):
 		primary_key: str | list[str] | None = None,
 		columns: dict[str, Any] | None = None,
 	):
+		incremental_sql = _incremental_sql(sql, cursor_column)
+		window_sql = _incremental_sql(sql, cursor_column, bounded=True)
+		add_dwh_pk = primary_key == "dwh_pk" or (columns is not None and "dwh_pk" in columns)
+
+		def _reader(start_value: Any) -> Callable[[dict[str, Any]], Iterator[Any]]:
+			arrow_batch_size = _arrow_batch_size(name)
+
+			def _query(db: dict[str, Any], params: dict[str, Any]) -> Iterator[Any]:
+				query = window_sql if "cursor_end" in params else incremental_sql
+				_dump_explain(
+					conn_string=db["conn_string"],
+					sql=query,
+					source_name=db["name"],
+					resource_name=name,
+					params=params,
+				)
+				for item in _stream_query(
+					conn_string=db["conn_string"],
+					sql=query,
+					source_name=db["name"],
+					params=params,
+					add_dwh_pk=add_dwh_pk,
+					arrow_batch_size=arrow_batch_size,
+				):
+					yield _coerce_incremental_item(item, cursor_column, start_value)
+
+			def _read(db: dict[str, Any]) -> Iterator[Any]:
+				params = _cursor_params(db, start_value)
+				rows = _query(db, params)
+				yield from _measured(name, db["name"], rows, cursor_column=cursor_column, cursor_start=params["cursor"])
+
+			return _read
+
 		@dlt.resource(
 			name=name,
 			write_disposition=write_disposition,
@@ -203,20 +1427,25 @@ def guarani_multi_source(source_dbs: list[dict[str, str]]):
 		)
 		def _resource(
 			cursor=dlt.sources.incremental(cursor_column, initial_value=_incremental_start(initial_value))
-		) -> Iterable[dict[str, Any]]:
-			wrapped = _wrap_incremental(sql, cursor_column)
-			add_dwh_pk = primary_key == "dwh_pk" or (columns is not None and "dwh_pk" in columns)
-			for db in source_dbs:
-				for record in _stream_query(
-					conn_string=db["conn_string"],
-					sql=wrapped,
-					source_name=db["name"],
-					params={"cursor": cursor.last_value},
-					add_dwh_pk=add_dwh_pk,
-				):
-					record[cursor_column] = _coerce_incremental_value(record.get(cursor_column), cursor.last_value)
-					yield record
+		) -> Iterable[Any]:
+			# Every source DB is queried from the same starting cursor, read once up front:
+			# DBs are read concurrently, so the live `last_value` may already reflect rows
+			# yielded by another DB.
+			start_value = cursor.last_value
+			yield from _prefetched_or_read(
+				name,
+				start_value,
+				lambda: _read_incremental(name, source_dbs, start_value, _reader(start_value)),
+			)
+			_store_fingerprints(name)
 
+		_register_fingerprint(name, source_dbs, sql, partial=True)
+		_register_prefetch(
+			name,
+			lambda start: _interleave_sources(_source_plan(name), _reader(start)),
+			cursor_column=cursor_column,
+			initial_value=_incremental_start(initial_value),
+		)
 		return _resource
 
 	def _resource_for_query_incremental_optional(
@@ -230,48 +1459,96 @@ def guarani_multi_source(source_dbs: list[dict[str, str]]):
 		primary_key: str | list[str] | None = None,
 		columns: dict[str, Any] | None = None,
 	):
-		@dlt.resource(
-			name=name,
-			write_disposition=write_disposition,
-			primary_key=primary_key,
-			columns=columns,
-		)
-		def _resource(
-			cursor=dlt.sources.incremental(cursor_column, initial_value=_incremental_start(initial_value))
-		) -> Iterable[dict[str, Any]]:
-			wrapped = _wrap_incremental(sql, cursor_column)
-			wrapped_fallback = _wrap_incremental(fallback_sql, cursor_column) if fallback_sql else None
-			add_dwh_pk = primary_key == "dwh_pk" or (columns is not None and "dwh_pk" in columns)
+		incremental_sql = _incremental_sql(sql, cursor_column)
+		incremental_fallback = _incremental_sql(fallback_sql, cursor_column) if fallback_sql else None
+		window_sql = _incremental_sql(sql, cursor_column, bounded=True)
+		window_fallback = _incremental_sql(fallback_sql, cursor_column, bounded=True) if fallback_sql else None
+		add_dwh_pk = primary_key == "dwh_pk" or (columns is not None and "dwh_pk" in columns)
+
+		def _reader(start_value: Any) -> Callable[[dict[str, Any]], Iterator[Any]]:
+			arrow_batch_size = _arrow_batch_size(name)
 
-			for db in source_dbs:
+			def _query(db: dict[str, Any], params: dict[str, Any]) -> Iterator[Any]:
+				query = window_sql if "cursor_end" in params else incremental_sql
+				fallback = window_fallback if "cursor_end" in params else incremental_fallback
 				try:
-					for record in _stream_query(
+					_dump_explain(
 						conn_string=db["conn_string"],
-						sql=wrapped,
+						sql=query,
 						source_name=db["name"],
-						params={"cursor": cursor.last_value},
-							add_dwh_pk=add_dwh_pk,
+						resource_name=name,
+						params=params,
+					)
+					for item in _stream_query(
+						conn_string=db["conn_string"],
+						sql=query,
+						source_name=db["name"],
+						params=params,
+						add_dwh_pk=add_dwh_pk,
+						arrow_batch_size=arrow_batch_size,
 					):
-						record[cursor_column] = _coerce_incremental_value(record.get(cursor_column), cursor.last_value)
-						yield record
+						yield _coerce_incremental_item(item, cursor_column, start_value)
 				except Exception as exc:  # noqa: BLE001
-					if wrapped_fallback:
+					stats = _read_stats(name, db["name"])
+					stats["error"] = str(exc)
+					if fallback:
 						print(f"[Bronze][WARN] {name} failed for {db['name']}; trying fallback ({exc})")
+						stats["fallback"] = True
 						try:
-							for record in _stream_query(
+							_dump_explain(
 								conn_string=db["conn_string"],
-								sql=wrapped_fallback,
+								sql=fallback,
 								source_name=db["name"],
-								params={"cursor": cursor.last_value},
+								resource_name=f"{name}_fallback",
+								params=params,
+							)
+							for item in _stream_query(
+								conn_string=db["conn_string"],
+								sql=fallback,
+								source_name=db["name"],
+								params=params,
 								add_dwh_pk=add_dwh_pk,
+								arrow_batch_size=arrow_batch_size,
 							):
-								record[cursor_column] = _coerce_incremental_value(record.get(cursor_column), cursor.last_value)
-								yield record
+								yield _coerce_incremental_item(item, cursor_column, start_value)
 						except Exception as exc2:  # noqa: BLE001
 							print(f"[Bronze][E] {name} fallback also failed for {db['name']}: {exc2}")
+							stats.update(status="failed", error=str(exc2))
 					else:
 						print(f"[Bronze][WARN] Optional resource {name} skipped for {db['name']}: {exc}")
+						stats["status"] = "failed"
+
+			def _read(db: dict[str, Any]) -> Iterator[Any]:
+				params = _cursor_params(db, start_value)
+				rows = _query(db, params)
+				yield from _measured(name, db["name"], rows, cursor_column=cursor_column, cursor_start=params["cursor"])
+
+			return _read
+
+		@dlt.resource(
+			name=name,
+			write_disposition=write_disposition,
+			primary_key=primary_key,
+			columns=columns,
+		)
+		def _resource(
+			cursor=dlt.sources.incremental(cursor_column, initial_value=_incremental_start(initial_value))
+		) -> Iterable[Any]:
+			start_value = cursor.last_value
+			yield from _prefetched_or_read(
+				name,
+				start_value,
+				lambda: _read_incremental(name, source_dbs, start_value, _reader(start_value)),
+			)
+			_store_fingerprints(name)
 
+		_register_fingerprint(name, source_dbs, sql, fallback_sql, partial=True)
+		_register_prefetch(
+			name,
+			lambda start: _interleave_sources(_source_plan(name), _reader(start)),
+			cursor_column=cursor_column,
+			initial_value=_incremental_start(initial_value),
+		)
 		return _resource
 
 	# Small/static dimensions: full refresh.
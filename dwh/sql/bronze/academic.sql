@@ -18,4 +18,4 @@ INNER JOIN negocio.sga_periodos sp ON spl.periodo = sp.periodo
 LEFT JOIN negocio.sga_evaluaciones sev ON sev.entidad = scom.comision
 LEFT JOIN negocio.sga_eval_detalle_cursadas sedc 
     ON sedc.evaluacion = sev.evaluacion AND sedc.alumno = sc.alumno
-WHERE sp.anio_academico IS NOT NULL;
+WHERE sp.anio_academico IS NOT NULL /* dwh:incremental sedc.fecha_regular */;
@@ -3,4 +3,5 @@ SELECT
     fecha,
     motivo_calidad,
     calidad
-FROM negocio.sga_alumnos_hist_calidad;
+FROM negocio.sga_alumnos_hist_calidad
+WHERE fecha IS NOT NULL /* dwh:incremental fecha */;
@@ -14,4 +14,5 @@ LEFT JOIN negocio.sga_comisiones sc ON sic.comision = sc.comision
 LEFT JOIN negocio.sga_elementos se ON sc.elemento = se.elemento
 LEFT JOIN negocio.sga_periodos_lectivos spl ON sc.periodo_lectivo = spl.periodo_lectivo
 LEFT JOIN negocio.sga_periodos sp ON spl.periodo = sp.periodo
-LEFT JOIN negocio.sga_planes_versiones spv ON sic.plan_version = spv.plan_version;
+LEFT JOIN negocio.sga_planes_versiones spv ON sic.plan_version = spv.plan_version
+WHERE sic.fecha_inscripcion IS NOT NULL /* dwh:incremental sic.fecha_inscripcion */;
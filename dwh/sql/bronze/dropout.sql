@@ -2,4 +2,5 @@ SELECT
     alumno,
     anio_academico,
     fecha AS fecha_dropout
-FROM negocio.sga_perdida_regularidad;
+FROM negocio.sga_perdida_regularidad
+WHERE fecha IS NOT NULL /* dwh:incremental fecha */;
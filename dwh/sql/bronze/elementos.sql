@@ -2,4 +2,5 @@ SELECT
     elemento,
     codigo AS materia_codigo,
     nombre AS materia_nombre
-FROM negocio.sga_elementos;
+FROM negocio.sga_elementos
+ORDER BY elemento;
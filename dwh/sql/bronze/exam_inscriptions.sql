@@ -14,4 +14,5 @@ LEFT JOIN negocio.sga_llamados_mesa slm ON sie.llamado_mesa = slm.llamado_mesa
 LEFT JOIN negocio.sga_mesas_examen sme ON slm.mesa_examen = sme.mesa_examen
 LEFT JOIN negocio.sga_elementos se ON sme.elemento = se.elemento
 LEFT JOIN negocio.sga_instancias sin ON sie.instancia = sin.instancia
-LEFT JOIN negocio.sga_planes_versiones spv ON sie.plan_version = spv.plan_version;
+LEFT JOIN negocio.sga_planes_versiones spv ON sie.plan_version = spv.plan_version
+WHERE slm.fecha IS NOT NULL /* dwh:incremental slm.fecha */;
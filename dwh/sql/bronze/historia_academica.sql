@@ -1,2 +1,3 @@
 SELECT *
-FROM negocio.vw_hist_academica;
+FROM negocio.vw_hist_academica
+WHERE fecha IS NOT NULL /* dwh:incremental fecha */;
@@ -1,2 +1,3 @@
 SELECT *
-FROM negocio.vw_hist_academica_basica;
+FROM negocio.vw_hist_academica_basica
+WHERE fecha IS NOT NULL /* dwh:incremental fecha */;
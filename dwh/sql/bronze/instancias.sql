@@ -1,4 +1,5 @@
 SELECT
     instancia,
     nombre AS instancia_nombre
-FROM negocio.sga_instancias;
+FROM negocio.sga_instancias
+ORDER BY instancia;
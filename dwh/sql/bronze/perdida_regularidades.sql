@@ -5,4 +5,5 @@ SELECT
     fecha,
     fecha_control_desde,
     fecha_control_hasta
-FROM negocio.sga_perdida_regularidad;
+FROM negocio.sga_perdida_regularidad
+WHERE fecha IS NOT NULL /* dwh:incremental fecha */;
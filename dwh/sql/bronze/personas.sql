@@ -8,4 +8,5 @@ SELECT
     mn.descripcion AS nacionalidad_desc
 FROM negocio.mdp_personas p
 LEFT JOIN negocio.mug_localidades ln ON p.localidad_nacimiento = ln.localidad
-LEFT JOIN negocio.mdp_nacionalidades mn ON p.nacionalidad = mn.nacionalidad;
+LEFT JOIN negocio.mdp_nacionalidades mn ON p.nacionalidad = mn.nacionalidad
+ORDER BY p.persona;
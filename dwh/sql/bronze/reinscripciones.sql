@@ -3,4 +3,5 @@ SELECT
     sr.anio_academico,
     sr.fecha_reinscripcion,
     sr.nro_transaccion
-FROM negocio.sga_reinscripciones sr;
+FROM negocio.sga_reinscripciones sr
+WHERE sr.fecha_reinscripcion IS NOT NULL /* dwh:incremental sr.fecha_reinscripcion */;
@@ -40,4 +40,5 @@ LEFT JOIN negocio.int_arau_instituciones iai ON su.institucion_araucano = iai.in
 LEFT JOIN negocio.mug_localidades ml ON su.localidad = ml.localidad
 LEFT JOIN negocio.mug_dptos_partidos mdp2 ON ml.dpto_partido = mdp2.dpto_partido
 LEFT JOIN negocio.mug_provincias mp ON mdp2.provincia = mp.provincia
-WHERE sa.resultado_asp IN ('A', 'P') OR sa.resultado_asp IS NULL;
+WHERE sa.resultado_asp IN ('A', 'P') OR sa.resultado_asp IS NULL
+ORDER BY a.alumno, pa.fecha_inscripcion, pa.tipo_ingreso;
@@ -2,6 +2,7 @@
 -- GOLD: gold_student_academic_summary
 -- Aggregated academic performance metrics per student per year
 -- Features for ML dropout prediction model
+-- dwh:cluster_by alumno_id, anio_academico
 -- ============================================================================
 
 CREATE OR REPLACE TABLE gold.mart_student_academic_summary AS
@@ -2,6 +2,7 @@
 -- GOLD: gold_student_engagement
 -- Aggregated engagement metrics (attendance, reinscription, exams) per student
 -- Features for ML dropout prediction model
+-- dwh:cluster_by alumno_id, anio_academico
 -- ============================================================================
 
 CREATE OR REPLACE TABLE gold.mart_student_engagement AS
@@ -2,6 +2,8 @@
 -- GOLD: gold_student_risk_features
 -- Combined feature table for ML dropout prediction model
 -- Joins academic, engagement, demographic, and socioeconomic features
+-- dwh:cluster_by anio_academico, alumno_id
+-- dwh:index alumno_id
 -- ============================================================================
 
 CREATE OR REPLACE TABLE gold.mart_student_risk_features AS
@@ -0,0 +1,77 @@
+-- ============================================================================
+-- GOLD: mart_cohort_cube
+-- Additive cohort cube for the dashboard: sums and counts (no rates or averages)
+-- for every combination of cohort, program and faculty and all their rollups,
+-- so any filter is answered by adding up the matching cells
+-- Grain: One row per CUBE (cohorte, propuesta_nombre, facultad_nombre) cell;
+--        grouping_id has a bit set for each dimension rolled up (NULL there)
+-- ============================================================================
+
+CREATE OR REPLACE TABLE gold.mart_cohort_cube AS
+WITH dropout_by_student AS (
+    SELECT
+        alumno_id,
+        MAX(CASE WHEN dropout_flag = 1 THEN 1 ELSE 0 END) AS ever_dropped_out,
+        MIN(anio_academico) AS primer_anio_dropout
+    FROM silver.fact_dropout
+    GROUP BY alumno_id
+),
+
+-- Aggregated separately from dropouts so students with several dropout
+-- events do not count their evaluations more than once
+grades_by_student AS (
+    SELECT
+        alumno_id,
+        AVG(TRY_CAST(nota AS DOUBLE)) AS promedio_notas_global,
+        SUM(aprobado_flag) AS total_aprobadas,
+        SUM(reprobado_flag) AS total_reprobadas
+    FROM silver.fact_academic_performance
+    GROUP BY alumno_id
+),
+
+student_outcomes AS (
+    SELECT
+        ds.alumno_id,
+        ds.anio_ingreso AS cohorte,
+        ds.propuesta_nombre,
+        ds.facultad_nombre,
+        COALESCE(fd.ever_dropped_out, 0) AS ever_dropped_out,
+        fd.primer_anio_dropout - ds.anio_ingreso AS anios_hasta_dropout,
+        ha.promedio_notas_global,
+        ha.total_aprobadas,
+        ha.total_reprobadas
+    FROM silver.dim_student ds
+    LEFT JOIN dropout_by_student fd ON ds.alumno_id = fd.alumno_id
+    LEFT JOIN grades_by_student ha ON ds.alumno_id = ha.alumno_id
+    WHERE ds.anio_ingreso IS NOT NULL
+)
+
+SELECT
+    -- Bits (cohorte=4, propuesta_nombre=2, facultad_nombre=1) of rolled-up dimensions
+    GROUPING(cohorte, propuesta_nombre, facultad_nombre) AS grouping_id,
+    cohorte,
+    propuesta_nombre,
+    facultad_nombre,
+
+    -- Cohort size and outcomes
+    COUNT(*) AS total_estudiantes,
+    SUM(ever_dropped_out) AS total_desertores,
+    COUNT(*) - SUM(ever_dropped_out) AS total_retenidos,
+
+    -- Time to dropout: average = suma / n
+    SUM(anios_hasta_dropout) AS suma_anios_hasta_dropout,
+    COUNT(anios_hasta_dropout) AS n_anios_hasta_dropout,
+
+    -- Grades: average of the students' averages = suma / n
+    SUM(promedio_notas_global) AS suma_promedio_notas,
+    COUNT(promedio_notas_global) AS n_promedio_notas,
+
+    -- Approval rate = aprobadas / (aprobadas + reprobadas)
+    COALESCE(SUM(total_aprobadas), 0) AS total_aprobadas,
+    COALESCE(SUM(total_reprobadas), 0) AS total_reprobadas
+
+FROM student_outcomes
+GROUP BY CUBE (cohorte, propuesta_nombre, facultad_nombre)
+
+-- Cells of one level are contiguous, so reading a level skips the others' row groups
+ORDER BY grouping_id, cohorte, propuesta_nombre, facultad_nombre;
@@ -2,6 +2,7 @@
 -- GOLD: gold_tft_static_features
 -- STATIC COVARIATES for TFT Model (unchanging per student)
 -- These are student characteristics that don't change over time
+-- dwh:cluster_by alumno_id
 -- ============================================================================
 
 CREATE OR REPLACE TABLE gold.gold_tft_static_features AS
@@ -3,6 +3,9 @@
 -- TIME-VARYING OBSERVED INPUTS for TFT Model
 -- Historical features that change over time (grades, attendance, engagement)
 -- Grain: One row per student per academic year (time step)
+-- Only students whose silver rows changed are recomputed (dwh:affected)
+-- dwh:execution_profile heavy
+-- dwh:cluster_by alumno_id, anio_academico
 -- ============================================================================
 
 CREATE OR REPLACE TABLE gold.gold_tft_temporal_features AS
@@ -11,19 +14,19 @@ WITH
 student_years AS (
     SELECT DISTINCT alumno_id, anio_academico
     FROM silver.fact_academic_performance
-    WHERE anio_academico IS NOT NULL
+    WHERE anio_academico IS NOT NULL /* dwh:affected alumno_id */
     
     UNION
     
     SELECT DISTINCT alumno_id, anio_academico
     FROM silver.fact_reinscription
-    WHERE anio_academico IS NOT NULL
+    WHERE anio_academico IS NOT NULL /* dwh:affected alumno_id */
     
     UNION
     
     SELECT DISTINCT alumno_id, anio_academico
     FROM silver.fact_dropout
-    WHERE anio_academico IS NOT NULL
+    WHERE anio_academico IS NOT NULL /* dwh:affected alumno_id */
 ),
 
 -- Academic performance per year
@@ -62,7 +65,7 @@ yearly_academic AS (
         SUM(creditos) AS creditos_obtenidos
         
     FROM silver.fact_academic_performance
-    WHERE anio_academico IS NOT NULL
+    WHERE anio_academico IS NOT NULL /* dwh:affected alumno_id */
     GROUP BY alumno_id, anio_academico
 ),
 
@@ -77,6 +80,7 @@ yearly_attendance AS (
         SUM(riesgo_asistencia_flag) AS periodos_riesgo_asistencia,
         COUNT(*) AS periodos_con_asistencia
     FROM silver.fact_attendance
+    WHERE alumno_id IS NOT NULL /* dwh:affected alumno_id */
     GROUP BY alumno_id, anio_academico
 ),
 
@@ -88,7 +92,7 @@ yearly_enrollment AS (
         COUNT(*) AS inscripciones_cursada,
         COUNT(DISTINCT elemento_id) AS materias_inscriptas
     FROM silver.fact_course_enrollment
-    WHERE fecha_inscripcion IS NOT NULL
+    WHERE fecha_inscripcion IS NOT NULL /* dwh:affected alumno_id */
     GROUP BY alumno_id, YEAR(fecha_inscripcion)
 ),
 
@@ -101,7 +105,7 @@ yearly_exams AS (
         COUNT(DISTINCT elemento_id) AS materias_examen_inscriptas,
         COUNT(DISTINCT instancia_id) AS tipos_instancia_usados
     FROM silver.fact_exam_inscription
-    WHERE fecha_mesa_examen IS NOT NULL
+    WHERE fecha_mesa_examen IS NOT NULL /* dwh:affected alumno_id */
     GROUP BY alumno_id, YEAR(fecha_mesa_examen)
 ),
 
@@ -115,6 +119,7 @@ yearly_reinscription AS (
         MAX(fecha_reinscripcion) AS ultima_reinscripcion,
         1 AS tuvo_reinscripcion
     FROM silver.fact_reinscription
+    WHERE alumno_id IS NOT NULL /* dwh:affected alumno_id */
     GROUP BY alumno_id, anio_academico
 ),
 
@@ -125,6 +130,7 @@ yearly_status_changes AS (
         YEAR(fecha_cambio) AS anio_academico,
         COUNT(*) AS cambios_estado_anio
     FROM silver.fact_student_status_history
+    WHERE alumno_id IS NOT NULL /* dwh:affected alumno_id */
     GROUP BY alumno_id, YEAR(fecha_cambio)
 ),
 
@@ -136,6 +142,7 @@ dropout_events AS (
         1 AS dropout_flag,
         fecha_dropout
     FROM silver.fact_dropout
+    WHERE alumno_id IS NOT NULL /* dwh:affected alumno_id */
 )
 
 SELECT
@@ -3,6 +3,9 @@
 -- FINAL TRAINING DATASET for TFT Model
 -- Joins static features with temporal features for complete sequences
 -- Each student has multiple rows (one per year) forming a time series
+-- Only students whose temporal or static features changed are recomputed (dwh:affected)
+-- dwh:execution_profile heavy
+-- dwh:cluster_by alumno_id, anio_academico
 -- ============================================================================
 
 CREATE OR REPLACE TABLE gold.gold_tft_training_dataset AS
@@ -139,6 +142,6 @@ LEFT JOIN gold.gold_tft_static_features sf ON tf.alumno_id = sf.alumno_id
 LEFT JOIN gold.gold_tft_known_future kf ON tf.anio_academico = kf.anio_academico
 
 -- Filter: only students with at least 1 year of data
-WHERE tf.anio_academico IS NOT NULL
+WHERE tf.anio_academico IS NOT NULL /* dwh:affected tf.alumno_id */
 
 ORDER BY tf.alumno_id, tf.anio_academico;
@@ -27,6 +27,7 @@ WITH academic_years AS (
     SELECT DISTINCT anio_academico 
     FROM bronze.attendance
     WHERE anio_academico IS NOT NULL
+      AND dwh_deleted IS NOT TRUE
 )
 SELECT
     anio_academico,
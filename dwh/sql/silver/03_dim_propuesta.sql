@@ -9,4 +9,5 @@ SELECT DISTINCT
     propuesta_nombre,
     propuesta_codigo
 FROM bronze.students
-WHERE propuesta IS NOT NULL;
+WHERE propuesta IS NOT NULL
+  AND dwh_deleted IS NOT TRUE;
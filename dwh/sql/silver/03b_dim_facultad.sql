@@ -28,4 +28,5 @@ FROM (
         END AS ubicacion_sede
     FROM bronze.students
     WHERE see_institucion IS NOT NULL
+      AND dwh_deleted IS NOT TRUE
 ) sub;
@@ -9,6 +9,7 @@ SELECT DISTINCT
     plan_version AS plan_version_nombre
 FROM bronze.students
 WHERE plan_version_id IS NOT NULL
+  AND dwh_deleted IS NOT TRUE
 
 UNION
 
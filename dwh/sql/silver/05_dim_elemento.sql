@@ -9,4 +9,5 @@ SELECT DISTINCT
     materia_codigo,
     materia_nombre
 FROM bronze.elementos
-WHERE elemento IS NOT NULL;
+WHERE elemento IS NOT NULL
+  AND dwh_deleted IS NOT TRUE;
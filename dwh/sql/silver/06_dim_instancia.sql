@@ -8,4 +8,5 @@ SELECT DISTINCT
     instancia AS instancia_id,
     instancia_nombre
 FROM bronze.instancias
-WHERE instancia IS NOT NULL;
+WHERE instancia IS NOT NULL
+  AND dwh_deleted IS NOT TRUE;
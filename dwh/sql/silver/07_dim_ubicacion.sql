@@ -16,4 +16,5 @@ SELECT DISTINCT
     see_dpto,
     see_provincia
 FROM bronze.students
-WHERE ubicacion IS NOT NULL;
+WHERE ubicacion IS NOT NULL
+  AND dwh_deleted IS NOT TRUE;
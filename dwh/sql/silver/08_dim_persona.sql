@@ -15,4 +15,5 @@ SELECT
     nacionalidad,
     nacionalidad_desc
 FROM bronze.personas
-WHERE persona IS NOT NULL;
+WHERE persona IS NOT NULL
+  AND dwh_deleted IS NOT TRUE;
@@ -1,6 +1,8 @@
 -- ============================================================================
 -- DIMENSION: dim_student (Student Master Dimension)
 -- Core student dimension linking to persona, propuesta, faculty, and enrollment info
+-- dwh:cluster_by alumno_id
+-- dwh:index alumno_id
 -- ============================================================================
 
 CREATE OR REPLACE TABLE silver.dim_student AS
@@ -39,4 +41,5 @@ SELECT
 
 FROM bronze.students s
 LEFT JOIN silver.dim_facultad f ON s.see_institucion = f.facultad_nombre
-WHERE s.alumno IS NOT NULL;
+WHERE s.alumno IS NOT NULL
+  AND s.dwh_deleted IS NOT TRUE;
@@ -24,4 +24,5 @@ SELECT
     1 AS enrollment_count
 
 FROM bronze.course_inscriptions ci
-WHERE ci.alumno IS NOT NULL;
+WHERE ci.alumno IS NOT NULL
+    /* dwh:incremental ci._dlt_load_id source=bronze.course_inscriptions */;
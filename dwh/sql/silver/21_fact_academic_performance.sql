@@ -7,6 +7,7 @@
 CREATE OR REPLACE TABLE silver.fact_academic_performance AS
 SELECT
     -- Keys
+    ha.dwh_pk,
     ha.alumno AS alumno_id,
     ha.elemento AS elemento_id,
     ha.anio_academico::INTEGER AS anio_academico,
@@ -45,4 +46,5 @@ SELECT
     1 AS evaluation_count
 
 FROM bronze.historia_academica ha
-WHERE ha.alumno IS NOT NULL;
+WHERE ha.alumno IS NOT NULL
+    /* dwh:incremental ha._dlt_load_id source=bronze.historia_academica unique_key=dwh_pk */;
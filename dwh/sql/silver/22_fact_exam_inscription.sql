@@ -24,4 +24,5 @@ SELECT
     1 AS exam_inscription_count
 
 FROM bronze.exam_inscriptions ei
-WHERE ei.alumno IS NOT NULL;
+WHERE ei.alumno IS NOT NULL
+    /* dwh:incremental ei._dlt_load_id source=bronze.exam_inscriptions */;
@@ -24,4 +24,5 @@ SELECT
     END AS riesgo_asistencia_flag
 
 FROM bronze.attendance
-WHERE alumno IS NOT NULL;
+WHERE alumno IS NOT NULL
+  AND dwh_deleted IS NOT TRUE;
@@ -17,4 +17,5 @@ SELECT
     1 AS reinscription_count
 
 FROM bronze.reinscripciones
-WHERE alumno IS NOT NULL;
+WHERE alumno IS NOT NULL
+    /* dwh:incremental _dlt_load_id source=bronze.reinscripciones */;
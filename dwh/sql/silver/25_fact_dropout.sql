@@ -20,4 +20,5 @@ SELECT
     1 AS dropout_flag
 
 FROM bronze.perdida_regularidades pr
-WHERE pr.alumno IS NOT NULL;
+WHERE pr.alumno IS NOT NULL
+    /* dwh:incremental pr._dlt_load_id source=bronze.perdida_regularidades */;
@@ -0,0 +1,51 @@
+"""Tests for `dwh.pipelines._sql_runner` on a throwaway DuckDB file."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import duckdb
+
+from dwh.pipelines._sql_runner import run_sql_dir
+
+
+MODEL = """-- dwh:cluster_by k
+CREATE OR REPLACE TABLE silver.t AS
+SELECT b.k, b.v
+FROM bronze.t b
+WHERE b.k IS NOT NULL
+  /* dwh:incremental b._dlt_load_id source=bronze.t unique_key=k */;
+"""
+
+
+def _load(db: Path, load_id: str, rows: list[tuple[int, int]]) -> None:
+	with duckdb.connect(str(db)) as con:
+		con.execute("CREATE SCHEMA IF NOT EXISTS bronze")
+		con.execute("CREATE TABLE IF NOT EXISTS bronze.t (k INTEGER, v INTEGER, _dlt_load_id VARCHAR)")
+		con.executemany("INSERT INTO bronze.t VALUES (?, ?, ?)", [(k, v, load_id) for k, v in rows])
+
+
+def _rows(db: Path) -> list[tuple[int, int]]:
+	with duckdb.connect(str(db), read_only=True) as con:
+		return con.execute("SELECT k, v FROM silver.t ORDER BY k").fetchall()
+
+
+def test_clustered_incremental_merge(tmp_path: Path) -> None:
+	# The load id column is added inside the model's SELECT, where the `b` alias is
+	# in scope, before the clustering wrapper sorts the rows.
+	db = tmp_path / "dwh.duckdb"
+	sql_dir = tmp_path / "silver"
+	sql_dir.mkdir()
+	(sql_dir / "01_t.sql").write_text(MODEL, encoding="utf-8")
+
+	_load(db, "999.5", [(2, 20), (1, 10)])
+	run_sql_dir(duckdb_path=db, sql_dir=sql_dir, schema="silver")
+	assert _rows(db) == [(1, 10), (2, 20)]
+
+	_load(db, "1000.1", [(2, 21), (3, 30)])
+	_load(db, "1000.2", [(3, 31)])
+	run_sql_dir(duckdb_path=db, sql_dir=sql_dir, schema="silver")
+	assert _rows(db) == [(1, 10), (2, 21), (3, 31)]
+	with duckdb.connect(str(db), read_only=True) as con:
+		mark = con.execute("SELECT high_water_mark FROM meta.incremental_state WHERE model = 'silver.t'").fetchone()[0]
+	assert str(mark) == "1000.200000000"